@@ -1,13 +1,23 @@
 from __future__ import annotations
 
 import json
+import threading
+import time
+from contextlib import contextmanager
 from typing import Any, Iterator
 
-from .config import get_setting
+from .config import get_int_setting, get_setting
 from .data import load_seed_data
 
 DATABASE_URL = get_setting("DATABASE_URL", "") or ""
 
+DB_POOL_MIN_SIZE = get_int_setting("DB_POOL_MIN_SIZE", 1)
+DB_POOL_MAX_SIZE = get_int_setting("DB_POOL_MAX_SIZE", 10)
+DB_POOL_TIMEOUT_SECONDS = get_int_setting("DB_POOL_TIMEOUT_SECONDS", 10)
+DB_POOL_MAX_IDLE_SECONDS = get_int_setting("DB_POOL_MAX_IDLE_SECONDS", 300)
+# Connections idle for longer than this are pinged with ``SELECT 1`` on checkout.
+DB_POOL_CHECK_AFTER_SECONDS = get_int_setting("DB_POOL_CHECK_AFTER_SECONDS", 30)
+
 
 class DBConnection:
     backend = "postgres"
@@ -32,9 +42,287 @@ class DBConnection:
     def commit(self) -> None:
         self._conn.commit()
 
+    def rollback(self) -> None:
+        self._conn.rollback()
+
     def close(self) -> None:
         self._conn.close()
 
+    @property
+    def closed(self) -> bool:
+        return bool(getattr(self._conn, "closed", False))
+
+    @property
+    def broken(self) -> bool:
+        return bool(getattr(self._conn, "broken", False))
+
+    @property
+    def in_transaction(self) -> bool:
+        info = getattr(self._conn, "info", None)
+        status = getattr(info, "transaction_status", None)
+        # psycopg TransactionStatus.IDLE == 0; anything else means work is pending.
+        return status is not None and int(status) != 0
+
+
+class PoolTimeout(RuntimeError):
+    """Raised when no pooled connection becomes available within the timeout."""
+
+
+class ConnectionPool:
+    """Process-wide pool of ``DBConnection`` objects.
+
+    Connections are opened lazily up to ``max_size`` and handed back by
+    ``putconn``.  On checkout a connection is discarded if psycopg reports it
+    closed/broken, and pinged with ``SELECT 1`` when it has been idle for more
+    than ``check_after_seconds``.  ``fill()`` pre-opens ``min_size``
+    connections; idle connections beyond ``min_size`` are closed once they
+    exceed ``max_idle_seconds``.
+    """
+
+    def __init__(
+        self,
+        factory: Any,
+        *,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout_seconds: float = 10.0,
+        max_idle_seconds: float = 300.0,
+        check_after_seconds: float = 30.0,
+    ):
+        self._factory = factory
+        self.max_size = max(1, int(max_size))
+        self.min_size = max(0, min(int(min_size), self.max_size))
+        self.timeout_seconds = float(timeout_seconds)
+        self.max_idle_seconds = float(max_idle_seconds)
+        self.check_after_seconds = float(check_after_seconds)
+
+        self._cond = threading.Condition()
+        # Idle connections as (conn, returned_at) — most recently returned last.
+        self._idle: list[tuple[DBConnection, float]] = []
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+
+        self._requests = 0
+        self._requests_waited = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+        self._timeouts = 0
+        self._connections_opened = 0
+        self._connections_discarded = 0
+        self._health_check_failures = 0
+
+    # -- checkout / return -------------------------------------------------
+
+    def getconn(self) -> DBConnection:
+        started = time.monotonic()
+        deadline = started + self.timeout_seconds
+        waited = False
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            self._requests += 1
+            while True:
+                self._expire_idle_locked()
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn, returned_at = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(
+                        f"No database connection available within {self.timeout_seconds:g}s "
+                        f"(pool max_size={self.max_size})"
+                    )
+                waited = True
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+            if waited:
+                wait_time = time.monotonic() - started
+                self._requests_waited += 1
+                self._wait_time_total += wait_time
+                self._wait_time_max = max(self._wait_time_max, wait_time)
+
+        if conn is not None and self._is_healthy(conn, returned_at):
+            return conn
+        if conn is not None:
+            self._discard(conn, reopen_slot=True)
+        return self._open_reserved()
+
+    def putconn(self, conn: DBConnection) -> None:
+        healthy = not (conn.closed or conn.broken)
+        if healthy and conn.in_transaction:
+            # Request handlers that error out before commit() leave an open
+            # transaction; never hand that state to the next borrower.
+            try:
+                conn.rollback()
+            except Exception:
+                healthy = False
+
+        with self._cond:
+            if healthy and not self._closed:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+                return
+        self._discard(conn, reopen_slot=False)
+
+    def fill(self) -> None:
+        """Open idle connections until the pool holds ``min_size``.
+
+        Called at startup so the first requests after boot don't each pay
+        the connect/TLS/auth handshake.
+        """
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            conn = self._open_reserved()
+            with self._cond:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[DBConnection]:
+        conn = self.getconn()
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    # -- metrics ------------------------------------------------------------
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            in_use = self._size - len(self._idle)
+            return {
+                "minSize": self.min_size,
+                "maxSize": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "inUse": in_use,
+                "waiting": self._waiting,
+                "saturation": round(in_use / self.max_size, 3),
+                "requests": self._requests,
+                "requestsWaited": self._requests_waited,
+                "waitTimeTotalMs": round(self._wait_time_total * 1000, 1),
+                "waitTimeMaxMs": round(self._wait_time_max * 1000, 1),
+                "timeouts": self._timeouts,
+                "connectionsOpened": self._connections_opened,
+                "connectionsDiscarded": self._connections_discarded,
+                "healthCheckFailures": self._health_check_failures,
+            }
+
+    # -- internals ----------------------------------------------------------
+
+    def _open_reserved(self) -> DBConnection:
+        """Open a connection for a slot already counted in ``_size``."""
+        try:
+            conn = self._factory()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._connections_opened += 1
+        return conn
+
+    def _is_healthy(self, conn: DBConnection, returned_at: float | None) -> bool:
+        if conn.closed or conn.broken:
+            return False
+        if returned_at is None or time.monotonic() - returned_at < self.check_after_seconds:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            conn.rollback()
+            return True
+        except Exception:
+            with self._cond:
+                self._health_check_failures += 1
+            return False
+
+    def _discard(self, conn: DBConnection, *, reopen_slot: bool) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._connections_discarded += 1
+            if not reopen_slot:
+                self._size -= 1
+                self._cond.notify()
+
+    def _expire_idle_locked(self) -> None:
+        if self.max_idle_seconds <= 0:
+            return
+        now = time.monotonic()
+        # Oldest idle connections sit at the front of the list.
+        while self._idle and self._size > self.min_size:
+            conn, returned_at = self._idle[0]
+            if now - returned_at < self.max_idle_seconds:
+                break
+            self._idle.pop(0)
+            self._size -= 1
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    _connect,
+                    min_size=DB_POOL_MIN_SIZE,
+                    max_size=DB_POOL_MAX_SIZE,
+                    timeout_seconds=DB_POOL_TIMEOUT_SECONDS,
+                    max_idle_seconds=DB_POOL_MAX_IDLE_SECONDS,
+                    check_after_seconds=DB_POOL_CHECK_AFTER_SECONDS,
+                )
+    return _pool
+
+
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def pool_stats() -> dict[str, Any] | None:
+    pool = _pool
+    return pool.stats() if pool is not None else None
+
 
 def _connect() -> DBConnection:
     db_url = DATABASE_URL
@@ -57,11 +345,8 @@ def _connect() -> DBConnection:
 
 
 def get_db() -> Iterator[DBConnection]:
-    conn = _connect()
-    try:
+    with get_pool().connection() as conn:
         yield conn
-    finally:
-        conn.close()
 
 
 def init_db() -> None:
@@ -83,6 +368,16 @@ def init_db() -> None:
     finally:
         conn.close()
 
+    # Reseeds and backfills above rewrite recipes in place; make sure this
+    # process never keeps serving a snapshot taken before them.
+    from .services.nutrient_calculator import invalidate_ingredient_cache  # lazy import
+    from .services.recipe_catalog import invalidate_recipe_catalog  # lazy import
+    from .services.solver.inputs import invalidate_solver_input_cache  # lazy import
+
+    invalidate_recipe_catalog()
+    invalidate_ingredient_cache()
+    invalidate_solver_input_cache()
+
 
 def _executescript(conn: DBConnection, script: str) -> None:
     for statement in script.split(";"):
@@ -172,6 +467,7 @@ def _init_schema(conn: DBConnection) -> None:
           day_index INTEGER NOT NULL,
           meal_type TEXT NOT NULL,
           dish_id TEXT NOT NULL,
+          recipe_id TEXT,
           servings DOUBLE PRECISION NOT NULL DEFAULT 1,
           custom_ingredients TEXT,
           entry_order INTEGER NOT NULL DEFAULT 0
@@ -238,9 +534,24 @@ def _init_schema(conn: DBConnection) -> None:
           notes TEXT,
           created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
         );
+
+        CREATE TABLE IF NOT EXISTS solver_jobs (
+          id TEXT PRIMARY KEY,
+          user_id TEXT NOT NULL,
+          kind TEXT NOT NULL,
+          week_start TEXT,
+          status TEXT NOT NULL DEFAULT 'queued',
+          progress DOUBLE PRECISION NOT NULL DEFAULT 0,
+          objective DOUBLE PRECISION,
+          result TEXT,
+          error TEXT,
+          created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+          started_at TIMESTAMPTZ,
+          finished_at TIMESTAMPTZ,
+          updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        );
         """,
     )
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_health_metrics_user_date ON health_metrics(user_id, date)")
 
 
 def _has_column(conn: DBConnection, table: str, column: str) -> bool:
@@ -348,6 +659,23 @@ def _migrate_schema(conn: DBConnection) -> None:
     _add_column_if_missing(conn, "meal_plans", "servings", "DOUBLE PRECISION NOT NULL DEFAULT 1")
     _add_column_if_missing(conn, "meal_plans", "custom_ingredients", "TEXT")
     _add_column_if_missing(conn, "meal_plans", "entry_order", "INTEGER NOT NULL DEFAULT 0")
+    _add_column_if_missing(conn, "meal_plans", "recipe_id", "TEXT")
+    # dish_id is either the recipe id or the same id with an "r" prefix.
+    # Resolve it once here so reads can join on r.id = mp.recipe_id.
+    conn.execute(
+        """
+        UPDATE meal_plans mp SET recipe_id = r.id
+        FROM recipes r
+        WHERE mp.recipe_id IS NULL AND r.id = mp.dish_id
+        """
+    )
+    conn.execute(
+        """
+        UPDATE meal_plans mp SET recipe_id = r.id
+        FROM recipes r
+        WHERE mp.recipe_id IS NULL AND left(mp.dish_id, 1) = 'r' AND r.id = substr(mp.dish_id, 2)
+        """
+    )
     if _has_column(conn, "meal_plans", "duration_days"):
         conn.execute("UPDATE meal_plans SET duration_days = 7 WHERE duration_days IS NULL")
         conn.execute("ALTER TABLE meal_plans ALTER COLUMN duration_days SET DEFAULT 7")
@@ -424,8 +752,6 @@ def _migrate_schema(conn: DBConnection) -> None:
                 FOREIGN KEY (caretaker_id) REFERENCES caretakers(id)
                 """
             )
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_family_members_user ON family_members(user_id)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_family_members_caretaker ON family_members(caretaker_id)")
         # Backfill legacy diners previously stored in users into family_members.
         if _has_column(conn, "users", "caretaker_id"):
             conn.execute(
@@ -465,7 +791,6 @@ def _migrate_schema(conn: DBConnection) -> None:
               UNIQUE(user_id, nutrient_key)
             )
         """)
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_nutrient_thresholds_user ON nutrient_thresholds(user_id)")
 
     # -- health_metrics table --
     if not _table_exists(conn, "health_metrics"):
@@ -486,13 +811,6 @@ def _migrate_schema(conn: DBConnection) -> None:
               created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
             )
         """)
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_health_metrics_user_date ON health_metrics(user_id, date)")
-
-    conn.execute("DROP INDEX IF EXISTS idx_meal_plans_user")
-    conn.execute(
-        "CREATE INDEX IF NOT EXISTS idx_meal_plans_user "
-        "ON meal_plans(user_id, week_start, day_index, meal_type)"
-    )
 
     _add_column_if_missing(conn, "users", "name", "TEXT NOT NULL DEFAULT 'Diner'")
     _add_column_if_missing(conn, "users", "age", "INTEGER")
@@ -596,6 +914,40 @@ def _migrate_schema(conn: DBConnection) -> None:
     _add_column_if_missing(conn, "recipes", "is_sweet", "BOOLEAN NOT NULL DEFAULT FALSE")
     _add_column_if_missing(conn, "recipes", "is_salty", "BOOLEAN NOT NULL DEFAULT FALSE")
 
+    # Clients stop polling a job soon after it finishes; finished jobs are kept
+    # for a week so late polls still find them, then pruned here at startup.
+    conn.execute("DELETE FROM solver_jobs WHERE finished_at < NOW() - INTERVAL '7 days'")
+
+    ensure_indexes(conn)
+
+
+# Secondary indexes for the hot read paths, as (name, table, definition).
+# ensure_indexes() creates any that are missing; to change one, give it a new
+# name and add the old name to _RETIRED_INDEXES.
+MANAGED_INDEXES: tuple[tuple[str, str, str], ...] = (
+    # Week reads, slot lookups and entry_order appends all filter on this prefix.
+    ("idx_meal_plans_user_week_slot", "meal_plans", "(user_id, week_start, day_index, meal_type, entry_order)"),
+    # Admin survey query: plans created in the last 7 days.
+    ("idx_meal_plans_created_at", "meal_plans", "(created_at)"),
+    ("idx_family_members_user", "family_members", "(user_id)"),
+    ("idx_family_members_caretaker", "family_members", "(caretaker_id)"),
+    # Diner lookups compare id::text with the "fm:N" suffix.
+    ("idx_family_members_id_text", "family_members", "((id::text))"),
+    # Favourites list is ordered newest first.
+    ("idx_favourites_user_created", "favourites", "(user_id, created_at DESC)"),
+    ("idx_nutrient_thresholds_user", "nutrient_thresholds", "(user_id)"),
+    ("idx_health_metrics_user_date", "health_metrics", "(user_id, date)"),
+)
+
+_RETIRED_INDEXES = ("idx_meal_plans_user",)
+
+
+def ensure_indexes(conn: DBConnection) -> None:
+    for name in _RETIRED_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    for name, table, definition in MANAGED_INDEXES:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} {definition}")
+
 
 def _read_meta(conn: DBConnection, key: str) -> str | None:
     row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
@@ -6,15 +6,26 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.requests import Request
 from fastapi.responses import JSONResponse
 
-from .db import init_db
+from .db import PoolTimeout, close_pool, get_pool, init_db
 from .routers import admin, auth, caretakers, dishes, favourites, health, health_metrics, mealplan, shopping_list, thresholds, users
 from .security import verify_access_token
+from .services.recipe_catalog import get_recipe_catalog
+from .services.solver.process_pool import shutdown_solver_pool, start_solver_pool
+from .services.solver_admission import SolverBusy
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     init_db()
+    pool = get_pool()
+    pool.fill()
+    # Build the in-memory recipe catalog before serving traffic.
+    with pool.connection() as conn:
+        get_recipe_catalog(conn)
+    start_solver_pool()
     yield
+    shutdown_solver_pool()
+    close_pool()
 
 
 app = FastAPI(title="MealWise FastAPI Backend", lifespan=lifespan)
@@ -69,3 +80,17 @@ app.include_router(health_metrics.router, prefix="/api")
 @app.exception_handler(FastAPIHTTPException)
 async def http_exception_handler(_: Request, exc: FastAPIHTTPException) -> JSONResponse:
     return JSONResponse(status_code=exc.status_code, content={"error": str(exc.detail)})
+
+
+@app.exception_handler(PoolTimeout)
+async def pool_timeout_handler(_: Request, exc: PoolTimeout) -> JSONResponse:
+    return JSONResponse(status_code=503, content={"error": str(exc)}, headers={"Retry-After": "1"})
+
+
+@app.exception_handler(SolverBusy)
+async def solver_busy_handler(_: Request, exc: SolverBusy) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"error": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
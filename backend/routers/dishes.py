@@ -7,17 +7,17 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from ..constants import NUTRIENT_KEYS
 from ..db import get_db
 from ..security import get_user_tier
-from ..services.nutrient_calculator import (
-    get_day_nutrients,
-    get_dish_nutrients,
-    load_ingredient_cache,
-)
+from ..services.dish_scoring import DishScoreTable
+from ..services.eligibility import EligibilityIndex
+from ..services.nutrient_calculator import load_ingredient_cache
 from ..services.profile_loader import load_user_profile
-from ..services.recommendation_engine import filter_dishes, get_warnings, score_dish
+from ..services.recipe_catalog import RecipeCatalog, get_recipe_catalog
 from ..utils import get_current_week_start, parse_ingredients_map, parse_json, parse_float, parse_servings_yield
 
 router = APIRouter(prefix="/dishes", tags=["dishes"])
 
+FREE_TIER_RECOMMENDATIONS = 5
+
 
 def _norm_text(value: str) -> str:
     return " ".join((value or "").lower().replace("_", " ").split())
@@ -148,6 +148,38 @@ def _dish_payload(row: dict[str, Any]) -> dict:
     }
 
 
+def _catalog_dish_rows(catalog: RecipeCatalog) -> tuple[dict[str, Any], ...]:
+    """Dish rows for every recipe, built once per catalog snapshot."""
+    return catalog.derive(
+        "dishes.dish_rows",
+        lambda c: tuple(_recipe_to_dish_row(r) for r in c.rows),
+    )
+
+
+def _catalog_dish_eligibility(catalog: RecipeCatalog) -> EligibilityIndex:
+    return catalog.derive("dishes.eligibility", lambda c: EligibilityIndex(_catalog_dish_rows(c)))
+
+
+def _catalog_dish_scores(catalog: RecipeCatalog) -> DishScoreTable:
+    return catalog.derive("dishes.score_table", lambda c: DishScoreTable(_catalog_dish_rows(c)))
+
+
+def _decode_cursor(catalog: RecipeCatalog, cursor: str) -> tuple[int, int]:
+    """``"<total>:<dish id>"`` -> the ``(total, position)`` to page after."""
+    total, _, dish_id = cursor.partition(":")
+    pos = catalog.position(dish_id)
+    if pos is None or not total.lstrip("-").isdigit():
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return int(total), pos
+
+
+def _catalog_dish_payloads(catalog: RecipeCatalog) -> tuple[dict, ...]:
+    return catalog.derive(
+        "dishes.dish_payloads",
+        lambda c: tuple(_dish_payload(row) for row in _catalog_dish_rows(c)),
+    )
+
+
 def _load_user_profile(conn: Any, user_id: str) -> dict[str, Any] | None:
     """Thin wrapper around the shared profile_loader for backward compat."""
     profile = load_user_profile(conn, user_id)
@@ -162,9 +194,7 @@ def _load_user_profile(conn: Any, user_id: str) -> dict[str, Any] | None:
 
 @router.get("")
 def get_all_dishes(conn: Any = Depends(get_db)) -> list[dict]:
-    recipe_rows = conn.execute("SELECT * FROM recipes").fetchall()
-    rows = [_recipe_to_dish_row(r) for r in recipe_rows]
-    return [_dish_payload(row) for row in rows]
+    return list(_catalog_dish_payloads(get_recipe_catalog(conn)))
 
 
 @router.get("/recommend/{user_id}")
@@ -182,8 +212,16 @@ def recommend_dishes(
     dietValue: str | None = Query(default=None),
     subCategory: str | None = Query(default=None),
     allergenValues: str | None = Query(default=None),
+    limit: int | None = Query(default=None, ge=1, le=500),
+    cursor: str | None = Query(default=None),
     conn: Any = Depends(get_db),
 ) -> dict:
+    """Score the dishes that pass the filters, best first.
+
+    Free-tier users get the top ``FREE_TIER_RECOMMENDATIONS``.  Paid users
+    get everything, or pages of ``limit`` dishes: pass the returned
+    ``nextCursor`` as ``cursor`` for the next page.
+    """
     ws = weekStart or get_current_week_start()
 
     user_profile = _load_user_profile(conn, user_id)
@@ -198,15 +236,16 @@ def recommend_dishes(
     if allergenValues and allergenValues.strip():
         user_profile["allergies"] = [a.strip().lower() for a in allergenValues.split(",") if a.strip()]
 
-    recipe_rows = conn.execute("SELECT * FROM recipes").fetchall()
-    all_dishes = [_recipe_to_dish_row(r) for r in recipe_rows]
+    catalog = get_recipe_catalog(conn)
+    all_dishes = _catalog_dish_rows(catalog)
+    eligibility = _catalog_dish_eligibility(catalog)
 
     day_entries = conn.execute(
         """
         SELECT mp.*, r.ingredients,
                r.calories, r.protein, r.total_carbs AS carbs, r.fat, r.fiber, r.sodium, r.cholesterol, r.sugar
         FROM meal_plans mp
-        JOIN recipes r ON (r.id::text = mp.dish_id OR ('r' || r.id::text) = mp.dish_id)
+        JOIN recipes r ON r.id = mp.recipe_id
         WHERE mp.user_id = ? AND mp.week_start = ? AND mp.day_index = ?
         """,
         (user_id, ws, day),
@@ -218,72 +257,67 @@ def recommend_dishes(
 
     ingredient_cache = load_ingredient_cache(conn)
 
-    filtered = filter_dishes(
-        all_dishes,
-        user_profile,
-        mealType,
-        ingredient_cache,
-        filter_meal_type=filterMealType != "false",
-        filter_diet=filterDiet != "false",
-        filter_allergies=filterAllergies != "false",
-        filter_conditions=filterConditions != "false",
-        sub_category=subCategory or None,
+    filter_options = {
+        "filter_diet": filterDiet != "false",
+        "filter_allergies": filterAllergies != "false",
+        "filter_conditions": filterConditions != "false",
+        "sub_category": subCategory or None,
+    }
+    positions = eligibility.positions(
+        user_profile, mealType, filter_meal_type=filterMealType != "false", **filter_options,
     )
 
-    results = filtered
     if search and search.strip():
-        results = [d for d in filtered if _matches_search(d, search)]
-
-        if not results and filterMealType != "false":
-            broader = filter_dishes(
-                all_dishes,
-                user_profile,
-                mealType,
-                ingredient_cache,
-                filter_meal_type=False,
-                filter_diet=filterDiet != "false",
-                filter_allergies=filterAllergies != "false",
-                filter_conditions=filterConditions != "false",
-                sub_category=subCategory or None,
-            )
-            results = [d for d in broader if _matches_search(d, search)]
+        matches = [pos for pos in positions if _matches_search(all_dishes[pos], search)]
+
+        if not matches and filterMealType != "false":
+            broader = eligibility.positions(user_profile, mealType, filter_meal_type=False, **filter_options)
+            matches = [pos for pos in broader if _matches_search(all_dishes[pos], search)]
+        positions = matches
 
     # Load favourites for scoring boost
     fav_rows = conn.execute("SELECT dish_id FROM favourites WHERE user_id = ?", (user_id,)).fetchall()
     favourite_ids = {str(row["dish_id"]) for row in fav_rows}
 
-    scored = []
-    for dish in results:
-        ingredients = parse_json(dish["ingredients"], {})
-        row_nutrients = {k: float(dish[k] or 0) for k in NUTRIENT_KEYS}
-        nutrients = get_dish_nutrients(ingredients, ingredient_cache, dish_nutrients=row_nutrients)
-        score = score_dish(dish, user_profile["conditions"], day_entries, mealType, all_week_entries, ingredient_cache, favourite_ids=favourite_ids)
-        warnings = get_warnings(nutrients, user_profile["conditions"], dish)
-        scored.append(
-            {
-                "dish": _dish_payload(dish),
-                "score": score,
-                "warnings": warnings,
-                "nutrients": nutrients,
-            }
-        )
-
-    scored.sort(key=lambda item: item["score"]["total"], reverse=True)
-    day_nutrients = get_day_nutrients(day_entries, ingredient_cache)
-
-    tier = get_user_tier(request)
-    if tier != "paid":
-        scored = scored[:5]
+    score_table = _catalog_dish_scores(catalog)
+    scores = score_table.score(
+        positions, user_profile["conditions"], day_entries, mealType, all_week_entries, ingredient_cache,
+        favourite_ids=favourite_ids,
+    )
 
-    return {"scored": scored, "dayNutrients": day_nutrients, "tier": tier}
+    tier = get_user_tier(request, conn)
+    after = None
+    if tier != "paid":
+        limit = FREE_TIER_RECOMMENDATIONS
+    elif cursor:
+        after = _decode_cursor(catalog, cursor)
+
+    # One extra dish tells whether there is a next page.
+    ranked = score_table.rank(scores, limit + 1 if limit else None, after)
+    has_more = limit is not None and len(ranked) > limit
+    ranked = ranked[:limit]
+    page = scores.positions[ranked]
+    warnings = score_table.warnings(page, user_profile["conditions"])
+    scored = [
+        {
+            "dish": _dish_payload(all_dishes[pos]),
+            "score": scores.score(i),
+            "warnings": warnings[n],
+            "nutrients": score_table.nutrients_at(pos),
+        }
+        for n, (i, pos) in enumerate(zip(ranked, page))
+    ]
+
+    next_cursor = None
+    if tier == "paid" and has_more:
+        next_cursor = f"{scored[-1]['score']['total']}:{all_dishes[page[-1]]['id']}"
+
+    return {"scored": scored, "dayNutrients": scores.day_nutrients, "tier": tier, "nextCursor": next_cursor}
 
 
 @router.get("/{dish_id}")
 def get_dish_detail(dish_id: str, conn: Any = Depends(get_db)) -> dict:
-    recipe = conn.execute(
-        "SELECT * FROM recipes WHERE id::text = ? OR ('r' || id::text) = ?",
-        (dish_id, dish_id),
-    ).fetchone()
+    recipe = get_recipe_catalog(conn).get_row(dish_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Dish not found")
 
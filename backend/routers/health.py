@@ -1,5 +1,11 @@
 ﻿from fastapi import APIRouter
 
+from ..db import pool_stats
+from ..services.recipe_catalog import recipe_catalog_stats
+from ..services.solver.inputs import solver_input_cache_stats
+from ..services.solver.process_pool import solver_pool_stats
+from ..services.solver_admission import solver_admission_stats
+from ..services.solver_jobs import solver_job_stats
 from ..utils import iso_now
 
 router = APIRouter(prefix="/health", tags=["health"])
@@ -9,3 +15,15 @@ router = APIRouter(prefix="/health", tags=["health"])
 def health() -> dict[str, str]:
     return {"status": "ok", "timestamp": iso_now()}
 
+
+@router.get("/metrics")
+def metrics() -> dict:
+    return {
+        "dbPool": pool_stats(),
+        "recipeCatalog": recipe_catalog_stats(),
+        "solverAdmission": solver_admission_stats(),
+        "solverInputCache": solver_input_cache_stats(),
+        "solverJobs": solver_job_stats(),
+        "solverPool": solver_pool_stats(),
+        "timestamp": iso_now(),
+    }
@@ -1,13 +1,14 @@
 from typing import Any
 import json
+import time
 from datetime import date, timedelta
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.encoders import jsonable_encoder
 
 from ..constants import CONDITION_RULES, NUTRIENT_KEYS, RDA
 from ..data import recommend_targets
-from ..db import get_db
+from ..db import get_db, get_pool
 from ..schemas import (
     AddMealPlanBody,
     AutofillBody,
@@ -16,22 +17,35 @@ from ..schemas import (
     GenerateMealPlanBody,
     GeneratePlanBody,
 )
-from ..security import require_paid_tier
+from ..security import get_user_tier, require_paid_tier
 from ..services.solver import (
     DEFAULT_MEAL_CALORIE_RATIO,
     FixedMealAssignment,
+    InfeasiblePlanError,
     MEALS as SOLVER_MEALS,
+    MealGenerationResult,
+    PlanConflict,
+    PreparedMealGeneration,
     SolverConfig,
-    generate_meal_plan_for_week,
+    load_solver_inputs_from_db,
     normalize_recipe,
     plan_result_to_entries,
+    prepare_meal_plan_generation,
+    rank_swaps,
+    solve_prepared_generation,
+    _compute_recency_penalties,
 )
 from ..services.nutrient_calculator import (
     get_day_nutrients,
     get_dish_nutrients,
+    get_entry_nutrients,
     get_week_nutrients,
     load_ingredient_cache,
 )
+from ..services.recipe_catalog import get_recipe_catalog
+from ..services.solver.horizon import MAX_HORIZON_WEEKS
+from ..services.solver_admission import get_solver_admission
+from ..services.solver_jobs import get_solver_job, submit_solver_job
 from ..utils import get_current_week_start, parse_float, parse_ingredients_map, parse_json, parse_servings_yield
 
 router = APIRouter(prefix="/mealplan", tags=["mealplan"])
@@ -57,6 +71,12 @@ def _max_dishes_for_meal(resolved: int | dict, meal: str) -> int:
     return resolved
 
 
+def _recipe_id_for_dish(conn: Any, dish_id: Any) -> str | None:
+    """Map a plan ``dish_id`` (``"12"`` or ``"r12"``) to its ``recipes.id``."""
+    dish = get_recipe_catalog(conn).get_dish(dish_id)
+    return dish.id if dish is not None else None
+
+
 def _user_rda(user: dict[str, Any] | None) -> dict[str, float]:
     rda = dict(RDA)
     if not user:
@@ -185,8 +205,8 @@ def _persist_generated_meal_plan(
     for row in item_rows:
         inserted = conn.execute(
             """
-            INSERT INTO meal_plans (user_id, week_start, day_index, meal_type, dish_id, servings, custom_ingredients, entry_order)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            INSERT INTO meal_plans (user_id, week_start, day_index, meal_type, dish_id, recipe_id, servings, custom_ingredients, entry_order)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             RETURNING id, user_id, week_start, day_index, meal_type, dish_id, servings, custom_ingredients, entry_order
             """,
             (
@@ -195,6 +215,7 @@ def _persist_generated_meal_plan(
                 row["day_index"],
                 row["meal_type"],
                 row["dish_id"],
+                _recipe_id_for_dish(conn, row["dish_id"]),
                 row["servings"],
                 row["custom_ingredients"],
                 row["entry_order"],
@@ -216,12 +237,12 @@ def get_meal_plan(
 
     rows = conn.execute(
         """
-        SELECT mp.*, r.id AS recipe_id, r.name AS recipe_name, r.ingredients AS recipe_ingredients,
+        SELECT mp.*, r.name AS recipe_name, r.ingredients AS recipe_ingredients,
                r.category, r.keywords, r.cuisine, r.servings AS recipe_servings,
                r.calories, r.protein, r.total_carbs AS carbs, r.fat,
                r.fiber, r.sodium, r.cholesterol, r.sugar, r.image_url
         FROM meal_plans mp
-        JOIN recipes r ON (r.id::text = mp.dish_id OR ('r' || r.id::text) = mp.dish_id)
+        JOIN recipes r ON r.id = mp.recipe_id
         WHERE mp.user_id = ? AND mp.week_start = ?
         ORDER BY mp.day_index, mp.meal_type, mp.entry_order
         """,
@@ -308,8 +329,8 @@ def add_dish_to_plan(
 
     conn.execute(
         """
-        INSERT INTO meal_plans (user_id, week_start, day_index, meal_type, dish_id, servings, custom_ingredients, entry_order)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        INSERT INTO meal_plans (user_id, week_start, day_index, meal_type, dish_id, recipe_id, servings, custom_ingredients, entry_order)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
         (
             user_id,
@@ -317,6 +338,7 @@ def add_dish_to_plan(
             body.dayIndex,
             body.mealType,
             body.dishId,
+            _recipe_id_for_dish(conn, body.dishId),
             body.servings,
             json.dumps(body.customIngredients) if body.customIngredients else None,
             next_order,
@@ -349,6 +371,107 @@ def update_entry_servings(
     return {"success": True, "servings": servings}
 
 
+@router.get("/{user_id}/entry/{entry_id}/swap")
+def swap_entry_options(
+    user_id: str,
+    entry_id: int,
+    limit: int = Query(default=10, ge=1, le=50),
+    conn: Any = Depends(get_db),
+) -> dict:
+    """Rank replacements for one plan entry, keeping the rest of the week.
+
+    Scores every eligible dish and serving count for the entry's slot
+    against the day's totals, variety and recency (no CP-SAT solve).
+    Nothing is saved; the client applies a pick through ``/add`` with
+    ``entryId``.
+    """
+    started = time.perf_counter()
+    entry = conn.execute(
+        "SELECT week_start, day_index, meal_type FROM meal_plans WHERE id = ? AND user_id = ?",
+        (entry_id, user_id),
+    ).fetchone()
+    if not entry:
+        raise HTTPException(status_code=404, detail="Meal plan entry not found")
+    ws = str(entry["week_start"])
+    day_index = int(entry["day_index"])
+    meal_type = str(entry["meal_type"])
+
+    week_rows = conn.execute(
+        """
+        SELECT mp.*, r.ingredients, r.servings AS recipe_servings,
+               r.calories, r.protein, r.total_carbs AS carbs, r.fat, r.fiber, r.sodium, r.cholesterol, r.sugar
+        FROM meal_plans mp
+        JOIN recipes r ON r.id = mp.recipe_id
+        WHERE mp.user_id = ? AND mp.week_start = ?
+        """,
+        (user_id, ws),
+    ).fetchall()
+    current_row = next((row for row in week_rows if row["id"] == entry_id), None)
+    others = [row for row in week_rows if row["id"] != entry_id]
+
+    try:
+        inputs = load_solver_inputs_from_db(conn, user_id, validate_candidates=False)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    config = inputs.config or SolverConfig()
+    recency_penalties = _compute_recency_penalties(conn, user_id, ws)
+    if recency_penalties:
+        from dataclasses import replace
+        config = replace(config, recency_penalties=recency_penalties)
+
+    ingredient_cache = load_ingredient_cache(conn)
+    week_plan = [
+        FixedMealAssignment(
+            day_index=int(row["day_index"]),
+            meal_type=str(row["meal_type"]),
+            recipe_id=str(row["recipe_id"]),
+            servings=parse_float(row["servings"], 1.0),
+        )
+        for row in others
+    ]
+    current = None
+    if current_row is not None:
+        current = FixedMealAssignment(
+            day_index=day_index,
+            meal_type=meal_type,
+            recipe_id=str(current_row["recipe_id"]),
+            servings=parse_float(current_row["servings"], 1.0),
+        )
+    suggestions = rank_swaps(
+        recipes=inputs.recipes,
+        targets=inputs.targets,
+        config=config,
+        day_index=day_index,
+        meal_type=meal_type,
+        week_plan=week_plan,
+        base_totals=get_day_nutrients([row for row in others if row["day_index"] == day_index], ingredient_cache),
+        current=current,
+        current_nutrients=get_entry_nutrients(current_row, ingredient_cache) if current_row is not None else None,
+        limit=limit,
+    )
+    print(
+        f"[swap] user_id={user_id} entry_id={entry_id} day_index={day_index} meal_type={meal_type} "
+        f"suggestions={len(suggestions)} ms={(time.perf_counter() - started) * 1000:.1f}"
+    )
+    return {
+        "success": True,
+        "entryId": entry_id,
+        "weekStart": ws,
+        "dayIndex": day_index,
+        "mealType": meal_type,
+        "suggestions": [
+            {
+                "dishId": suggestion.recipe_id,
+                "dishName": suggestion.name,
+                "servings": suggestion.servings,
+                "scoreDelta": suggestion.score_delta,
+                "nutrients": suggestion.nutrients,
+            }
+            for suggestion in suggestions
+        ],
+    }
+
+
 @router.delete("/{user_id}/clear")
 def clear_week_meal_plan(
     user_id: str,
@@ -423,7 +546,7 @@ def get_weekly_nutrients(
         SELECT mp.*, r.ingredients, r.servings AS recipe_servings,
                r.calories, r.protein, r.total_carbs AS carbs, r.fat, r.fiber, r.sodium, r.cholesterol, r.sugar
         FROM meal_plans mp
-        JOIN recipes r ON (r.id::text = mp.dish_id OR ('r' || r.id::text) = mp.dish_id)
+        JOIN recipes r ON r.id = mp.recipe_id
         WHERE mp.user_id = ? AND mp.week_start = ?
         ORDER BY mp.day_index
         """,
@@ -476,7 +599,7 @@ def get_daily_nutrients(
         SELECT mp.*, r.ingredients, r.servings AS recipe_servings,
                r.calories, r.protein, r.total_carbs AS carbs, r.fat, r.fiber, r.sodium, r.cholesterol, r.sugar
         FROM meal_plans mp
-        JOIN recipes r ON (r.id::text = mp.dish_id OR ('r' || r.id::text) = mp.dish_id)
+        JOIN recipes r ON r.id = mp.recipe_id
         WHERE mp.user_id = ? AND mp.week_start = ? AND mp.day_index = ?
         """,
         (user_id, ws, day_index),
@@ -506,6 +629,19 @@ def _is_slot_locked(week_start: str, day_index: int, meal_type: str) -> bool:
     return False
 
 
+def _locked_open_slots(
+    week_start: str,
+    occupied: dict[tuple[int, str], list[dict[str, Any]]],
+) -> set[tuple[int, str]]:
+    """Empty slots autofill may not write to; the solver leaves them out."""
+    return {
+        (day_index, meal_type)
+        for day_index in range(7)
+        for meal_type in AUTOFILL_MEAL_TYPES
+        if not occupied.get((day_index, meal_type)) and _is_slot_locked(week_start, day_index, meal_type)
+    }
+
+
 def _build_autofill_fixed_assignments(
     existing: list[dict[str, Any]],
 ) -> tuple[list[FixedMealAssignment], dict[tuple[int, str], list[dict[str, Any]]]]:
@@ -794,7 +930,7 @@ def validate_autofill_plan(
         SELECT mp.*, r.name, r.category, r.keywords, r.ingredients,
                r.calories, r.protein, r.total_carbs AS carbs, r.fat, r.fiber, r.sodium, r.cholesterol, r.sugar
         FROM meal_plans mp
-        JOIN recipes r ON (r.id::text = mp.dish_id OR ('r' || r.id::text) = mp.dish_id)
+        JOIN recipes r ON r.id = mp.recipe_id
         WHERE mp.user_id = ? AND mp.week_start = ?
         ORDER BY mp.day_index, mp.meal_type, mp.entry_order
         """,
@@ -811,13 +947,63 @@ def validate_autofill_plan(
     )
 
 
-@router.post("/{user_id}/autofill")
-def autofill_plan(
+_CONFLICT_TITLES = {
+    "daily_caps": "Daily caps cannot all be met",
+    "slot_count": "Slot cannot be filled within the limits",
+    "fixed_dish": "Existing dish conflicts with the limits",
+}
+
+
+def _conflict_violation(conflict: PlanConflict) -> AutofillConstraintViolation:
+    """An infeasibility conflict from the solver as an autofill violation."""
+    if conflict.code == "daily_cap":
+        nutrient = conflict.nutrients[0]
+        code = f"daily_{nutrient}_cap_exceeded"
+        title = f"Daily {nutrient} cap cannot be met"
+    else:
+        code = f"infeasible_{conflict.code}"
+        title = _CONFLICT_TITLES.get(conflict.code, "Constraints cannot be met")
+    message = conflict.describe()
+    return _autofill_violation(
+        code=code,
+        title=title,
+        message=message[0].upper() + message[1:] + ".",
+        day_index=conflict.day_index,
+        meal_type=conflict.meal_type,
+        recipe_ids=list(conflict.recipe_ids),
+        actual=conflict.actual,
+        limit=conflict.limit,
+    )
+
+
+def _autofill_solver_error(exc: Exception, user_id: str, week_start: str) -> HTTPException:
+    detail = str(exc)
+    if isinstance(exc, ValueError):
+        print(f"[autofill] solver_value_error user_id={user_id} week_start={week_start} detail={detail}")
+        status = 404 if "not found" in detail.lower() else 400
+        return HTTPException(status_code=status, detail=detail)
+    print(f"[autofill] solver_runtime_error user_id={user_id} week_start={week_start} detail={detail}")
+    if isinstance(exc, InfeasiblePlanError) and exc.conflicts:
+        return HTTPException(
+            status_code=422,
+            detail={
+                "error": detail,
+                "violations": jsonable_encoder([_conflict_violation(c) for c in exc.conflicts]),
+            },
+        )
+    return HTTPException(status_code=422, detail=detail)
+
+
+def _prepare_autofill(
+    conn: Any,
     user_id: str,
     body: AutofillBody,
-    _: str = Depends(require_paid_tier),
-    conn: Any = Depends(get_db),
-) -> dict:
+) -> tuple[PreparedMealGeneration, dict[str, Any]] | None:
+    """Validate an autofill request and load its solver inputs.
+
+    Returns None when the user does not exist; raises HTTPException for
+    invalid requests.
+    """
     if not body.weekStart:
         raise HTTPException(status_code=400, detail="weekStart is required for autofill")
     ws = body.weekStart
@@ -828,14 +1014,14 @@ def autofill_plan(
 
     user_profile = _load_profile_for_plan(conn, user_id)
     if not user_profile:
-        return {"success": False, "added": 0, "error": "User not found"}
+        return None
 
     existing = conn.execute(
         """
         SELECT mp.*, r.name, r.category, r.keywords, r.ingredients,
                r.calories, r.protein, r.total_carbs AS carbs, r.fat, r.fiber, r.sodium, r.cholesterol, r.sugar
         FROM meal_plans mp
-        JOIN recipes r ON (r.id::text = mp.dish_id OR ('r' || r.id::text) = mp.dish_id)
+        JOIN recipes r ON r.id = mp.recipe_id
         WHERE mp.user_id = ? AND mp.week_start = ?
         ORDER BY mp.day_index, mp.meal_type, mp.entry_order
         """,
@@ -868,7 +1054,7 @@ def autofill_plan(
             f"maxCarbs:{settings.maxCarbs},maxFat:{settings.maxFat}"
         )
         meal_ratio = settings.mealCalorieRatio or DEFAULT_MEAL_CALORIE_RATIO
-        generated = generate_meal_plan_for_week(
+        prepared = prepare_meal_plan_generation(
             conn,
             patient_id=user_id,
             week_start=ws,
@@ -890,34 +1076,52 @@ def autofill_plan(
             ),
             fixed_assignments=fixed_assignments,
             targets_override=targets_override,
+            closed_slots=_locked_open_slots(ws, occupied),
         )
-        print(
-            f"[autofill] solver_success user_id={user_id} week_start={ws} "
-            f"objective={generated.selected_plan.objective_value:.2f}"
-        )
-    except ValueError as exc:
-        detail = str(exc)
-        print(f"[autofill] solver_value_error user_id={user_id} week_start={ws} detail={detail}")
-        status = 404 if "not found" in detail.lower() else 400
-        raise HTTPException(status_code=status, detail=detail) from exc
-    except RuntimeError as exc:
-        print(f"[autofill] solver_runtime_error user_id={user_id} week_start={ws} detail={exc}")
-        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    except (ValueError, RuntimeError) as exc:
+        raise _autofill_solver_error(exc, user_id, ws) from exc
+
+    return prepared, {"week_start": ws, "settings": settings, "occupied": occupied}
+
 
+def _solve_autofill(
+    prepared: PreparedMealGeneration,
+    on_solution: Any = None,
+) -> MealGenerationResult:
+    ws = prepared.week_start or ""
+    try:
+        generated = solve_prepared_generation(prepared, on_solution=on_solution)
+    except (ValueError, RuntimeError) as exc:
+        raise _autofill_solver_error(exc, prepared.patient_id, ws) from exc
+    print(
+        f"[autofill] solver_success user_id={prepared.patient_id} week_start={ws} "
+        f"objective={generated.selected_plan.objective_value:.2f} "
+        f"stop_reason={generated.selected_plan.stop_reason}"
+    )
+    return generated
+
+
+def _write_autofill_plan(
+    conn: Any,
+    user_id: str,
+    run: dict[str, Any],
+    generated: MealGenerationResult,
+) -> dict:
+    ws = run["week_start"]
     item_rows = _build_autofill_insert_rows(
         generated=generated,
         user_id=user_id,
         week_start=ws,
-        occupied=occupied,
-        settings=settings,
+        occupied=run["occupied"],
+        settings=run["settings"],
     )
 
     saved_rows = []
     for row in item_rows:
         inserted = conn.execute(
             """
-            INSERT INTO meal_plans (user_id, week_start, day_index, meal_type, dish_id, servings, custom_ingredients, entry_order)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            INSERT INTO meal_plans (user_id, week_start, day_index, meal_type, dish_id, recipe_id, servings, custom_ingredients, entry_order)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             RETURNING id, user_id, week_start, day_index, meal_type, dish_id, servings, custom_ingredients, entry_order
             """,
             (
@@ -926,6 +1130,7 @@ def autofill_plan(
                 row["day_index"],
                 row["meal_type"],
                 row["dish_id"],
+                _recipe_id_for_dish(conn, row["dish_id"]),
                 row["servings"],
                 row["custom_ingredients"],
                 row["entry_order"],
@@ -939,28 +1144,86 @@ def autofill_plan(
     return {"success": True, "added": len(saved_rows)}
 
 
-@router.post("/{user_id}/generate")
-def generate_plan(
+@router.post("/{user_id}/autofill")
+def autofill_plan(user_id: str, body: AutofillBody, request: Request) -> dict:
+    # Connections are borrowed only for the reads and the write, so requests
+    # queued in the admission controller never pin pooled connections.
+    with get_pool().connection() as conn:
+        tier = require_paid_tier(request, conn)
+        ticket = get_solver_admission().reserve(tier)
+        try:
+            prepared_run = _prepare_autofill(conn, user_id, body)
+        except BaseException:
+            ticket.release()
+            raise
+    if prepared_run is None:
+        ticket.release()
+        return {"success": False, "added": 0, "error": "User not found"}
+    prepared, run = prepared_run
+    try:
+        ticket.wait()
+        generated = _solve_autofill(prepared)
+    finally:
+        ticket.release()
+    with get_pool().connection() as conn:
+        return _write_autofill_plan(conn, user_id, run, generated)
+
+
+@router.post("/{user_id}/autofill/jobs", status_code=202)
+def submit_autofill_job(
     user_id: str,
-    body: GeneratePlanBody,
+    body: AutofillBody,
+    tier: str = Depends(require_paid_tier),
     conn: Any = Depends(get_db),
 ) -> dict:
+    ticket = get_solver_admission().reserve(tier)
+    try:
+        prepared_run = _prepare_autofill(conn, user_id, body)
+        if prepared_run is None:
+            ticket.release()
+            return {"success": False, "added": 0, "error": "User not found"}
+        prepared, run = prepared_run
+        job_id = submit_solver_job(
+            conn,
+            kind="autofill",
+            user_id=user_id,
+            week_start=run["week_start"],
+            ticket=ticket,
+            solve=lambda on_solution: _solve_autofill(prepared, on_solution),
+            finish=lambda job_conn, generated: _write_autofill_plan(job_conn, user_id, run, generated),
+        )
+    except BaseException:
+        ticket.release()
+        raise
+    return {"success": True, "jobId": job_id, "status": "queued"}
+
+
+def _prepare_generate(
+    conn: Any,
+    user_id: str,
+    body: GeneratePlanBody,
+    tier: str | None = None,
+) -> tuple[PreparedMealGeneration, dict[str, Any]]:
     ws = body.weekStart or get_current_week_start()
     target_day = body.dayIndex  # None = all days, int = single day
 
-    num_days = 1 if target_day is not None else min(body.numDays, 7)
+    # Longer plans are solved week by week (rolling horizon), up to six weeks.
+    num_days = 1 if target_day is not None else max(1, min(body.numDays, 7 * MAX_HORIZON_WEEKS))
+    # Free-tier single days use the greedy planner instead of CP-SAT.
+    engine = "greedy" if target_day is not None and tier == "free" else "cp_sat"
 
     resolved_dishes = _resolve_max_dishes(body.maxDishesPerSlot)
     config = SolverConfig(
         num_days=num_days,
         time_limit_seconds=min(body.timeLimitSeconds, 120) if target_day is None else 5,
         max_recipes_per_meal=resolved_dishes,
+        max_solutions=body.maxSolutions,
     )
 
     print(
         f"[generate] user_id={user_id} week_start={ws} target_day={target_day} "
         f"num_days={num_days} maxDishesPerSlot={body.maxDishesPerSlot} "
-        f"resolved={resolved_dishes} time_limit={config.time_limit_seconds}s"
+        f"resolved={resolved_dishes} time_limit={config.time_limit_seconds}s engine={engine}"
     )
 
     # User-set nutrient limits override the profile-derived targets
@@ -969,50 +1232,76 @@ def generate_plan(
         targets_override = {k: float(v) for k, v in body.nutrientLimits.items() if v}
         print(f"[generate] nutrient_limits_override={targets_override}")
 
-    try:
-        result = generate_meal_plan_for_week(
-            conn,
-            patient_id=user_id,
-            week_start=ws,
-            config=config,
-            fixed_assignments=None,
-            exclude_recipe_ids=None,
-            targets_override=targets_override,
-        )
-        print(
-            f"[generate] success entries={len(result.entries)} "
-            f"objective={result.selected_plan.objective_value:.2f}"
-        )
-    except (ValueError, RuntimeError) as exc:
-        print(f"[generate] solver_error: {exc}")
-        return {"success": False, "error": str(exc)}
+    prepared = prepare_meal_plan_generation(
+        conn,
+        patient_id=user_id,
+        week_start=ws,
+        config=config,
+        fixed_assignments=None,
+        exclude_recipe_ids=None,
+        targets_override=targets_override,
+        hint_first_day=target_day or 0,
+        engine=engine,
+    )
+    return prepared, {"week_start": ws, "target_day": target_day, "num_days": num_days}
+
+
+def _solve_generate(
+    prepared: PreparedMealGeneration,
+    on_solution: Any = None,
+) -> MealGenerationResult:
+    result = solve_prepared_generation(prepared, on_solution=on_solution)
+    print(
+        f"[generate] success entries={len(result.entries)} "
+        f"objective={result.selected_plan.objective_value:.2f} "
+        f"stop_reason={result.selected_plan.stop_reason}"
+    )
+    return result
+
 
-    if target_day is not None:
+def _write_generated_plan(
+    conn: Any,
+    user_id: str,
+    run: dict[str, Any],
+    result: MealGenerationResult,
+) -> dict:
+    ws = run["week_start"]
+    target_day = run["target_day"]
+    num_days = run["num_days"]
+
+    # Day ``d`` of a multi-week plan is day ``d % 7`` of week ``d // 7``.
+    def week_slot(day: int) -> tuple[str, int]:
+        if target_day is not None:
+            return ws, target_day
+        return (date.fromisoformat(ws) + timedelta(weeks=day // 7)).isoformat(), day % 7
+
+    for day in range(num_days):
+        slot_ws, day_index = week_slot(day)
         for meal_type in SOLVER_MEALS:
-            if _is_slot_locked(ws, target_day, meal_type):
+            if _is_slot_locked(slot_ws, day_index, meal_type):
                 continue
             conn.execute(
                 "DELETE FROM meal_plans WHERE user_id = ? AND week_start = ? AND day_index = ? AND meal_type = ?",
-                (user_id, ws, target_day, meal_type),
+                (user_id, slot_ws, day_index, meal_type),
             )
-    else:
-        for day_index in range(num_days):
-            for meal_type in SOLVER_MEALS:
-                if _is_slot_locked(ws, day_index, meal_type):
-                    continue
-                conn.execute(
-                    "DELETE FROM meal_plans WHERE user_id = ? AND week_start = ? AND day_index = ? AND meal_type = ?",
-                    (user_id, ws, day_index, meal_type),
-                )
 
     entries_written = 0
     for entry in result.entries:
-        actual_day = (target_day if target_day is not None else entry.day_index)
-        if _is_slot_locked(ws, actual_day, entry.meal_type):
+        slot_ws, day_index = week_slot(entry.day_index)
+        if _is_slot_locked(slot_ws, day_index, entry.meal_type):
             continue
         conn.execute(
-            "INSERT INTO meal_plans (user_id, week_start, day_index, meal_type, dish_id, servings, entry_order) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (user_id, ws, actual_day, entry.meal_type, entry.recipe_id, entry.servings, entry.entry_order),
+            "INSERT INTO meal_plans (user_id, week_start, day_index, meal_type, dish_id, recipe_id, servings, entry_order) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                user_id,
+                slot_ws,
+                day_index,
+                entry.meal_type,
+                entry.recipe_id,
+                _recipe_id_for_dish(conn, entry.recipe_id),
+                entry.servings,
+                entry.entry_order,
+            ),
         )
         entries_written += 1
 
@@ -1021,5 +1310,104 @@ def generate_plan(
     return {
         "success": True,
         "entriesWritten": entries_written,
-        "totalSlots": config.num_days * len(SOLVER_MEALS),
+        "totalSlots": num_days * len(SOLVER_MEALS),
+        "weekStarts": sorted({week_slot(day)[0] for day in range(num_days)}),
+        "objective": result.selected_plan.objective_value,
+        "alternatives": [
+            _plan_alternative(plan, ws, target_day) for plan in result.plans if plan is not result.selected_plan
+        ],
     }
+
+
+def _plan_alternative(plan: Any, week_start: str, target_day: int | None) -> dict[str, Any]:
+    """An unsaved alternative plan in the shape the client adds entries with."""
+    return {
+        "objective": plan.objective_value,
+        "entries": [
+            {
+                "weekStart": week_start,
+                "dayIndex": target_day if target_day is not None else entry.day_index,
+                "mealType": entry.meal_type,
+                "dishId": entry.recipe_id,
+                "servings": entry.servings,
+                "entryOrder": entry.entry_order,
+            }
+            for entry in plan_result_to_entries(plan, week_start=week_start)
+        ],
+    }
+
+
+@router.post("/{user_id}/generate")
+def generate_plan(user_id: str, body: GeneratePlanBody, request: Request) -> dict:
+    # Same connection handling as autofill_plan: none is held while waiting
+    # for admission or solving.
+    with get_pool().connection() as conn:
+        tier = get_user_tier(request, conn)
+        ticket = get_solver_admission().reserve(tier)
+        try:
+            prepared, run = _prepare_generate(conn, user_id, body, tier)
+        except (ValueError, RuntimeError) as exc:
+            ticket.release()
+            print(f"[generate] solver_error: {exc}")
+            return {"success": False, "error": str(exc)}
+        except BaseException:
+            ticket.release()
+            raise
+    try:
+        ticket.wait()
+        result = _solve_generate(prepared)
+    except (ValueError, RuntimeError) as exc:
+        print(f"[generate] solver_error: {exc}")
+        return {"success": False, "error": str(exc)}
+    finally:
+        ticket.release()
+
+    with get_pool().connection() as conn:
+        return _write_generated_plan(conn, user_id, run, result)
+
+
+def _solve_generate_job(prepared: PreparedMealGeneration, on_solution: Any) -> MealGenerationResult:
+    try:
+        return _solve_generate(prepared, on_solution)
+    except (ValueError, RuntimeError) as exc:
+        print(f"[generate] solver_error: {exc}")
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+
+@router.post("/{user_id}/generate/jobs", status_code=202)
+def submit_generate_job(
+    user_id: str,
+    body: GeneratePlanBody,
+    tier: str = Depends(get_user_tier),
+    conn: Any = Depends(get_db),
+) -> dict:
+    ticket = get_solver_admission().reserve(tier)
+    try:
+        try:
+            prepared, run = _prepare_generate(conn, user_id, body, tier)
+        except (ValueError, RuntimeError) as exc:
+            print(f"[generate] solver_error: {exc}")
+            ticket.release()
+            return {"success": False, "error": str(exc)}
+
+        job_id = submit_solver_job(
+            conn,
+            kind="generate",
+            user_id=user_id,
+            week_start=run["week_start"],
+            ticket=ticket,
+            solve=lambda on_solution: _solve_generate_job(prepared, on_solution),
+            finish=lambda job_conn, result: _write_generated_plan(job_conn, user_id, run, result),
+        )
+    except BaseException:
+        ticket.release()
+        raise
+    return {"success": True, "jobId": job_id, "status": "queued"}
+
+
+@router.get("/jobs/{job_id}")
+def get_plan_job(job_id: str, conn: Any = Depends(get_db)) -> dict:
+    job = get_solver_job(conn, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
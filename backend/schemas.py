@@ -120,8 +120,9 @@ class UpdateTierBody(BaseModel):
 
 class GeneratePlanBody(BaseModel):
     weekStart: str | None = None
-    numDays: int = 7
+    numDays: int = 7  # above 7 plans consecutive weeks (up to 42 days)
     timeLimitSeconds: int = 10
     dayIndex: int | None = None  # generate for a single day only
     maxDishesPerSlot: int | dict[str, int] = 1
     nutrientLimits: dict[str, float] | None = None  # user-set daily limits
+    maxSolutions: int = Field(default=1, ge=1, le=3)  # alternatives returned, not saved
@@ -10,6 +10,7 @@ from typing import Any
 from fastapi import Depends, HTTPException, Request
 
 from .config import get_int_setting, get_setting
+from .db import get_db
 
 
 JWT_ALG = "HS256"
@@ -90,31 +91,26 @@ def verify_access_token(token: str) -> dict[str, Any]:
     return payload
 
 
-def get_user_tier(request: Request) -> str:
+def get_user_tier(request: Request, conn: Any = Depends(get_db)) -> str:
     """Return the subscription tier for the authenticated user.
 
-    Queries the DB on every call so the tier is never stale.
-    Uses a lazy import to avoid circular dependency with db.py.
+    Queries the DB on every call so the tier is never stale.  Takes the
+    request's own connection (FastAPI caches ``get_db`` per request) so the
+    lookup never borrows a second pooled connection.
     """
     auth = getattr(request.state, "auth", None)
     if not auth:
         return "free"
-    from .db import _connect  # lazy import
-
-    conn = _connect()
-    try:
-        row = conn.execute(
-            "SELECT subscription_tier FROM caretakers WHERE auth_user_id = ?",
-            (auth["sub"],),
-        ).fetchone()
-        return row["subscription_tier"] if row else "free"
-    finally:
-        conn.close()
+    row = conn.execute(
+        "SELECT subscription_tier FROM caretakers WHERE auth_user_id = ?",
+        (auth["sub"],),
+    ).fetchone()
+    return row["subscription_tier"] if row else "free"
 
 
-def require_paid_tier(request: Request) -> str:
+def require_paid_tier(request: Request, conn: Any = Depends(get_db)) -> str:
     """FastAPI dependency that raises 403 if the user is on the free tier."""
-    tier = get_user_tier(request)
+    tier = get_user_tier(request, conn)
     if tier != "paid":
         raise HTTPException(
             status_code=403,
@@ -0,0 +1,213 @@
+"""Batch version of ``recommendation_engine.score_dish``.
+
+``score_dish`` works on one dish and recomputes the day totals, parses
+``meal_types`` and counts week repeats on every call.  A ``DishScoreTable``
+holds the per-dish inputs of a fixed dish list as arrays: per-serving
+nutrients (from ``get_row_nutrients``), condition-label scores and warning
+flags, and meal types.  ``score`` then computes day totals and week repeat
+counts once and evaluates the health, nutrient and preference scores of
+all candidates as array operations, in the same order of float operations
+as ``score_dish`` so the totals are identical.  ``rank`` picks the top
+dishes, or the page after a cursor, so callers only build payloads for
+what they return.
+
+The table is built once per catalog snapshot through ``RecipeCatalog.derive``.
+"""
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Sequence
+
+import numpy as np
+
+from ..constants import CONDITION_CONFIG, CONDITION_RULES, NUTRIENT_KEYS, RDA
+from ..utils import parse_json
+from .nutrient_calculator import IngredientTable, get_day_nutrients, get_row_nutrients
+from .recommendation_engine import _dish_get, condition_category_score
+
+
+@dataclass(frozen=True)
+class BatchScores:
+    """Scores of ``positions``, in ``score_dish``'s keys and order, and
+    the day totals they were scored against."""
+
+    positions: np.ndarray
+    total: np.ndarray
+    health: np.ndarray
+    nutrient: np.ndarray
+    pref: np.ndarray
+    day_nutrients: dict[str, float]
+
+    def score(self, i: int) -> dict[str, int]:
+        return {
+            "total": int(self.total[i]),
+            "healthScore": int(self.health[i]),
+            "nutrientScore": int(self.nutrient[i]),
+            "prefScore": int(self.pref[i]),
+        }
+
+
+class DishScoreTable:
+    """Scoring inputs for one fixed list of dish rows or ``DishCandidate``s."""
+
+    def __init__(self, dishes: Sequence[Any]) -> None:
+        self.size = len(dishes)
+        ids = [str(_dish_get(dish, "id") or "") for dish in dishes]
+        self.ids = ids
+        self._positions: dict[str, list[int]] = {}
+        for pos, dish_id in enumerate(ids):
+            alt = f"r{dish_id}" if not dish_id.startswith("r") else dish_id[1:]
+            self._positions.setdefault(dish_id, []).append(pos)
+            self._positions.setdefault(alt, []).append(pos)
+
+        rows = [get_row_nutrients(dish) for dish in dishes]
+        self.nutrients = np.array(
+            [[row[key] for key in NUTRIENT_KEYS] for row in rows], dtype=np.float64,
+        ).reshape(self.size, len(NUTRIENT_KEYS))
+        self.nutrients.flags.writeable = False
+
+        self._labels: dict[str, list[Any]] = {}
+        self._label_scores: dict[str, np.ndarray] = {}
+        self._label_warnings: dict[str, np.ndarray] = {}
+        for cfg in CONDITION_CONFIG.values():
+            column = cfg["category_column"]
+            labels = [_dish_get(dish, column) for dish in dishes]
+            texts = [(label or "").strip().lower() for label in labels]
+            self._labels[column] = labels
+            self._label_scores[column] = np.array([condition_category_score(v) for v in labels], dtype=np.float64)
+            self._label_warnings[column] = np.array(["avoid" in t or "caution" in t for t in texts], dtype=bool)
+
+        self._meal_types = []
+        for dish in dishes:
+            raw = _dish_get(dish, "meal_types") or _dish_get(dish, "mealTypes")
+            meal_types = parse_json(raw, []) if isinstance(raw, (str, bytes)) else (raw or [])
+            self._meal_types.append(frozenset(meal_types))
+        self._meal_masks: dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def _column(self, key: str) -> np.ndarray:
+        return self.nutrients[:, NUTRIENT_KEYS.index(key)]
+
+    def _meal_mask(self, meal_type: str) -> np.ndarray:
+        mask = self._meal_masks.get(meal_type)
+        if mask is None:
+            mask = np.array([meal_type in types for types in self._meal_types], dtype=bool)
+            with self._lock:
+                self._meal_masks[meal_type] = mask
+        return mask
+
+    def score(
+        self,
+        positions: np.ndarray,
+        user_conditions: list[str],
+        day_entries: list[dict[str, Any]],
+        meal_type: str,
+        all_week_entries: list[dict[str, Any]],
+        ingredient_cache: IngredientTable,
+        favourite_ids: set[str] | None = None,
+    ) -> BatchScores:
+        """``score_dish`` for the dishes at ``positions``."""
+        positions = np.asarray(positions, dtype=np.intp)
+        count = len(positions)
+        dn = {key: self._column(key)[positions] for key in NUTRIENT_KEYS}
+        day_n = get_day_nutrients(day_entries, ingredient_cache)
+
+        health = np.full(count, 60.0)
+        for condition in user_conditions:
+            cfg = CONDITION_CONFIG.get(condition)
+            if cfg:
+                health += self._label_scores[cfg["category_column"]][positions]
+
+            rule = CONDITION_RULES.get(condition)
+            if not rule:
+                continue
+            for nutrient, limit in rule["limit"].items():
+                ratio = dn[nutrient] / limit if limit else np.zeros(count)
+                health -= np.where(ratio > 1.2, 24, np.where(ratio > 0.8, 10, 0))
+        health = np.maximum(0, np.minimum(70, health))
+
+        remaining = {k: max(0, RDA[k] - day_n[k]) for k in NUTRIENT_KEYS}
+
+        nutrient_score = np.zeros(count)
+        for key in ["protein", "fiber", "calories"]:
+            if remaining[key] > 0:
+                nutrient_score += np.minimum(1, dn[key] / (remaining[key] * 0.4)) * 7
+
+        for key in ["sodium", "cholesterol", "sugar"]:
+            headroom = remaining[key]
+            fits = (dn[key] <= headroom) if headroom > 0 else np.zeros(count, dtype=bool)
+            nutrient_score += np.where(fits, 3, np.where(dn[key] > headroom * 1.2, -2, 0))
+
+        nutrient_score = np.maximum(0, np.minimum(30, nutrient_score))
+
+        counts = np.zeros(self.size)
+        for dish_id, n in Counter(str(entry["dish_id"]) for entry in all_week_entries).items():
+            counts[self._positions.get(dish_id, [])] += n
+        pref = np.maximum(0, 5 - counts[positions] * 2)
+        pref += np.where(self._meal_mask(meal_type)[positions], 5, 1)
+        if favourite_ids:
+            pref += np.array([self.ids[pos] in favourite_ids for pos in positions], dtype=bool) * 10
+
+        total = np.rint(np.maximum(0, np.minimum(110, health + nutrient_score + pref)))
+        return BatchScores(
+            positions=positions,
+            total=total.astype(np.int64),
+            health=np.rint(health).astype(np.int64),
+            nutrient=np.rint(nutrient_score).astype(np.int64),
+            pref=np.rint(pref).astype(np.int64),
+            day_nutrients=day_n,
+        )
+
+    def rank(
+        self,
+        scores: BatchScores,
+        limit: int | None = None,
+        after: tuple[int, int] | None = None,
+    ) -> np.ndarray:
+        """Indices into ``scores`` by descending total, ties in position order
+        (the order of a stable sort of the scored list).
+
+        ``after`` is a ``(total, position)`` cursor: only dishes ranked below
+        it are returned.  With ``limit`` only the first ``limit`` are
+        selected, by partition rather than a full sort.
+        """
+        keys = -scores.total * self.size + scores.positions
+        selected = np.arange(len(keys))
+        if after is not None:
+            total, pos = after
+            selected = selected[keys > -total * self.size + pos]
+        if limit is not None and limit < len(selected):
+            selected = selected[np.argpartition(keys[selected], limit - 1)[:limit]]
+        return selected[np.argsort(keys[selected])]
+
+    def nutrients_at(self, pos: int) -> dict[str, float]:
+        return {key: float(value) for key, value in zip(NUTRIENT_KEYS, self.nutrients[pos])}
+
+    def warnings(self, positions: np.ndarray, conditions: list[str]) -> list[list[str]]:
+        """``get_warnings`` for the dishes at ``positions``, using the
+        table's per-serving nutrients."""
+        positions = np.asarray(positions, dtype=np.intp)
+        flags = []
+        for condition in conditions:
+            cfg = CONDITION_CONFIG.get(condition)
+            if cfg:
+                column = cfg["category_column"]
+                flags.append((self._label_warnings[column][positions], condition, column))
+            rule = CONDITION_RULES.get(condition)
+            if rule:
+                over = np.zeros(len(positions), dtype=bool)
+                for nutrient, limit in rule["limit"].items():
+                    over |= self._column(nutrient)[positions] > limit
+                flags.append((over, rule["warnLabel"], None))
+
+        result = []
+        for i, pos in enumerate(positions):
+            warnings = [
+                f"{label}: {self._labels[column][pos]}" if column else label
+                for mask, label, column in flags
+                if mask[i]
+            ]
+            result.append(list(dict.fromkeys(warnings)))
+        return result
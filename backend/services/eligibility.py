@@ -0,0 +1,147 @@
+"""Precomputed filter masks over the recipe catalog.
+
+``filter_dishes`` parses every dish's JSON columns and runs the allergy,
+diet, meal-type and condition checks on each call.  Over the catalog those
+checks only depend on a handful of profile values, so an
+``EligibilityIndex`` evaluates them once per dish list and keeps one
+boolean mask (one byte per recipe, aligned with the list) per value:
+
+- per meal type, diet and condition, built up front;
+- per allergy term (ingredient names and tagged allergies), so a free-text
+  allergy is the OR of the terms it matches;
+- per allergy and sub-category string, computed on first use.
+
+Filtering a profile is then an AND over a few masks.  The index is built
+per catalog snapshot through ``RecipeCatalog.derive`` and gives exactly
+the result of ``filter_dishes`` on the same list.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Sequence
+
+import numpy as np
+
+from ..constants import CONDITION_CONFIG, CONDITION_RULES
+from .nutrient_calculator import get_row_nutrients
+from .recipe_catalog import RecipeCatalog
+from .recommendation_engine import (
+    _MEAL_TYPE_CATEGORY_MAP,
+    _allergy_matches,
+    _allergy_terms,
+    _category_matches_meal_type,
+    _condition_blocks,
+    _diet_allows,
+    _dish_filter_fields,
+    _profile_allergies,
+    _profile_diet,
+)
+
+_DIETS = ("vegetarian", "vegan", "pescatarian", "halal")
+
+# Lazily computed allergy / sub-category masks kept per index.
+_MAX_LAZY_MASKS = 1024
+
+
+class EligibilityIndex:
+    """Filter masks for one fixed list of dish rows or ``DishCandidate``s."""
+
+    def __init__(self, dishes: Sequence[Any]) -> None:
+        count = len(dishes)
+        self.size = count
+        fields = [_dish_filter_fields(dish) for dish in dishes]
+        self._categories = [category.lower() for *_, category in fields]
+
+        self._meal_types = {
+            meal: np.array([_category_matches_meal_type(c, meal) for *_, c in fields], dtype=bool)
+            for meal in _MEAL_TYPE_CATEGORY_MAP
+        }
+        self._diets = {
+            diet: np.array([
+                _diet_allows(diet, tags, diet_label, ingredients)
+                for ingredients, tags, _, diet_label, _ in fields
+            ], dtype=bool)
+            for diet in _DIETS
+        }
+        nutrients = [get_row_nutrients(dish) for dish in dishes]
+        self._conditions = {
+            condition: np.array([
+                not _condition_blocks(dish, condition, n) for dish, n in zip(dishes, nutrients)
+            ], dtype=bool)
+            for condition in set(CONDITION_CONFIG) | set(CONDITION_RULES)
+        }
+
+        positions: dict[str, list[int]] = {}
+        for pos, (ingredients, _, dish_allergies, _, _) in enumerate(fields):
+            for term in _allergy_terms(ingredients, dish_allergies):
+                positions.setdefault(term, []).append(pos)
+        self._allergy_terms = {term: np.array(sorted(set(p)), dtype=np.intp) for term, p in positions.items()}
+
+        self._all = np.ones(count, dtype=bool)
+        self._all.flags.writeable = False
+        self._lazy: dict[tuple[str, str], np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def _lazy_mask(self, kind: str, value: str) -> np.ndarray:
+        mask = self._lazy.get((kind, value))
+        if mask is not None:
+            return mask
+        if kind == "allergy":
+            mask = np.ones(self.size, dtype=bool)
+            for term, positions in self._allergy_terms.items():
+                if _allergy_matches(value, term):
+                    mask[positions] = False
+        else:
+            mask = np.array([value in category for category in self._categories], dtype=bool)
+        with self._lock:
+            if len(self._lazy) < _MAX_LAZY_MASKS:
+                self._lazy[(kind, value)] = mask
+        return mask
+
+    def mask(
+        self,
+        user_profile: dict[str, Any],
+        meal_type: str,
+        *,
+        filter_meal_type: bool = True,
+        filter_diet: bool = True,
+        filter_allergies: bool = True,
+        filter_conditions: bool = True,
+        sub_category: str | None = None,
+    ) -> np.ndarray:
+        """Boolean mask of the dishes ``filter_dishes`` would keep."""
+        masks = []
+        if filter_allergies and user_profile.get("allergies"):
+            masks += [self._lazy_mask("allergy", allergy) for allergy in _profile_allergies(user_profile)]
+        diet = _profile_diet(user_profile) if filter_diet else None
+        if diet in self._diets:
+            masks.append(self._diets[diet])
+        if filter_meal_type and meal_type in self._meal_types:
+            masks.append(self._meal_types[meal_type])
+        if sub_category:
+            masks.append(self._lazy_mask("sub_category", sub_category.lower()))
+        if filter_conditions:
+            masks += [self._conditions[c] for c in user_profile.get("conditions") or () if c in self._conditions]
+
+        if not masks:
+            return self._all
+        if len(masks) == 1:
+            return masks[0]
+        return np.logical_and.reduce(masks)
+
+    def positions(self, user_profile: dict[str, Any], meal_type: str, **options: Any) -> np.ndarray:
+        """Positions of the kept dishes, in list order."""
+        return np.flatnonzero(self.mask(user_profile, meal_type, **options))
+
+    def filter(self, dishes: Sequence[Any], user_profile: dict[str, Any], meal_type: str, **options: Any) -> list[Any]:
+        """``filter_dishes`` over ``dishes``, which must line up with the
+        list the index was built from (e.g. the same dishes with
+        ``is_favourite`` set)."""
+        if len(dishes) != self.size:
+            raise ValueError(f"dish list has {len(dishes)} entries, index covers {self.size}")
+        return [dishes[pos] for pos in self.positions(user_profile, meal_type, **options)]
+
+
+def catalog_eligibility(catalog: RecipeCatalog) -> EligibilityIndex:
+    """Index over ``catalog.dishes``, built once per snapshot."""
+    return catalog.derive("eligibility.dishes", lambda c: EligibilityIndex(c.dishes))
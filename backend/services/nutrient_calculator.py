@@ -1,44 +1,112 @@
 from __future__ import annotations
 
-from typing import Any
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping
+
+import numpy as np
 
 from ..constants import NUTRIENT_KEYS, RDA
 from ..utils import parse_float, parse_json, parse_servings_yield
+from .recipe_catalog import CATALOG_VERSION_CHECK_SECONDS, read_dataset_version
+
+_INGREDIENT_COLUMNS = (
+    "calories",
+    "protein_g",
+    "carbs_g",
+    "fat_g",
+    "fiber_g",
+    "sodium_mg",
+    "cholesterol_mg",
+    "sugar_g",
+)
 
 
 def _blank_nutrients() -> dict[str, float]:
     return {k: 0.0 for k in NUTRIENT_KEYS}
 
 
-def load_ingredient_cache(conn: Any) -> dict[str, list[float]]:
-    rows = conn.execute("SELECT * FROM ingredients").fetchall()
-    cache: dict[str, list[float]] = {}
-    for row in rows:
-        cache[row["id"]] = [
-            row["calories"],
-            row["protein_g"],
-            row["carbs_g"],
-            row["fat_g"],
-            row["fiber_g"],
-            row["sodium_mg"],
-            row["cholesterol_mg"],
-            row["sugar_g"],
-        ]
-    return cache
+@dataclass(frozen=True, eq=False)
+class IngredientTable:
+    """Read-only snapshot of the ingredients table.
+
+    ``values`` holds per-100 g nutrients in ``NUTRIENT_KEYS`` order, one row
+    per ingredient; ``index`` maps an ingredient id to its row.
+    """
+
+    version: str
+    index: Mapping[str, int]
+    values: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def get(self, ingredient: str) -> np.ndarray | None:
+        pos = self.index.get(ingredient)
+        return self.values[pos] if pos is not None else None
+
+
+def build_ingredient_table(version: str, rows: list[Any]) -> IngredientTable:
+    index = MappingProxyType({row["id"]: pos for pos, row in enumerate(rows)})
+    values = np.array(
+        [[row[col] for col in _INGREDIENT_COLUMNS] for row in rows], dtype=np.float64
+    ).reshape(len(rows), len(_INGREDIENT_COLUMNS))
+    values.flags.writeable = False
+    return IngredientTable(version=version, index=index, values=values)
+
+
+_ingredient_table: IngredientTable | None = None
+_ingredient_checked_at = 0.0
+_ingredient_lock = threading.Lock()
+
+
+def load_ingredient_cache(conn: Any) -> IngredientTable:
+    """Return the shared ingredient table, reloading it if the dataset changed."""
+    global _ingredient_table, _ingredient_checked_at
+
+    table = _ingredient_table
+    if table is not None and time.monotonic() - _ingredient_checked_at < CATALOG_VERSION_CHECK_SECONDS:
+        return table
+
+    version = read_dataset_version(conn)
+    if table is not None and table.version == version:
+        _ingredient_checked_at = time.monotonic()
+        return table
+
+    with _ingredient_lock:
+        table = _ingredient_table
+        if table is None or table.version != version:
+            rows = conn.execute("SELECT * FROM ingredients").fetchall()
+            table = build_ingredient_table(version, rows)
+            _ingredient_table = table
+            print(f"[ingredients] loaded version={version!r} ingredients={len(table)}")
+        _ingredient_checked_at = time.monotonic()
+    return table
+
+
+def invalidate_ingredient_cache() -> None:
+    global _ingredient_table
+    with _ingredient_lock:
+        _ingredient_table = None
 
 
 def get_nutrients_from_ingredients(
-    ingredients_obj: dict[str, float], ingredient_cache: dict[str, list[float]]
+    ingredients_obj: dict[str, float], ingredient_cache: IngredientTable
 ) -> dict[str, float]:
-    nutrients = _blank_nutrients()
+    positions: list[int] = []
+    amounts: list[float] = []
     for ingredient, amount_g in ingredients_obj.items():
-        nd = ingredient_cache.get(ingredient)
-        if not nd:
+        pos = ingredient_cache.index.get(ingredient)
+        if pos is None:
             continue
-        scale = float(amount_g) / 100.0
-        for i, key in enumerate(NUTRIENT_KEYS):
-            nutrients[key] += nd[i] * scale
-    return {k: round(v, 1) for k, v in nutrients.items()}
+        positions.append(pos)
+        amounts.append(float(amount_g))
+    if not positions:
+        return _blank_nutrients()
+    totals = np.asarray(amounts) @ ingredient_cache.values[positions] / 100.0
+    return {key: round(float(v), 1) for key, v in zip(NUTRIENT_KEYS, totals)}
 
 
 def get_row_nutrients(row: Any, servings: float = 1.0) -> dict[str, float]:
@@ -80,7 +148,7 @@ def get_row_nutrients(row: Any, servings: float = 1.0) -> dict[str, float]:
 
 def get_dish_nutrients(
     dish_ingredients: dict[str, float] | str,
-    ingredient_cache: dict[str, list[float]],
+    ingredient_cache: IngredientTable,
     servings: float = 1.0,
     custom_ingredients: dict[str, float] | str | None = None,
     dish_nutrients: dict[str, float] | None = None,
@@ -100,7 +168,7 @@ def get_dish_nutrients(
 
 def get_entry_nutrients(
     entry: dict[str, Any],
-    ingredient_cache: dict[str, list[float]],
+    ingredient_cache: IngredientTable,
 ) -> dict[str, float]:
     ingredients = entry["ingredients"] if isinstance(entry, dict) else entry.get("ingredients")
     custom_ingredients = (
@@ -123,7 +191,7 @@ def get_entry_nutrients(
 
 def get_day_nutrients(
     entries: list[dict[str, Any]],
-    ingredient_cache: dict[str, list[float]],
+    ingredient_cache: IngredientTable,
 ) -> dict[str, float]:
     totals = _blank_nutrients()
     for entry in entries:
@@ -135,7 +203,7 @@ def get_day_nutrients(
 
 def get_week_nutrients(
     entries: list[dict[str, Any]],
-    ingredient_cache: dict[str, list[float]],
+    ingredient_cache: IngredientTable,
 ) -> dict[str, float]:
     return get_day_nutrients(entries, ingredient_cache)
 
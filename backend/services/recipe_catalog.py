@@ -0,0 +1,178 @@
+"""Process-wide, read-only recipe catalog.
+
+The recipes table only changes when ``init_db`` reseeds it, which also bumps
+the ``dataset_version`` meta value.  Request handlers therefore share one
+in-memory snapshot keyed by that version instead of running
+``SELECT * FROM recipes`` and rebuilding every row on each call.
+
+A snapshot is never mutated after it is built.  When the version changes a
+new ``RecipeCatalog`` is built off to the side and swapped in with a single
+reference assignment, so concurrent readers always see a complete catalog.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Mapping
+
+import numpy as np
+
+from ..config import get_int_setting
+from ..constants import NUTRIENT_KEYS
+from ..utils import parse_servings_yield
+from .dish_candidate import DishCandidate, build_dish_candidate
+
+# How long a request may reuse the current snapshot before re-reading
+# ``meta.dataset_version``.  0 checks the version on every call.
+CATALOG_VERSION_CHECK_SECONDS = get_int_setting("CATALOG_VERSION_CHECK_SECONDS", 30)
+
+
+@dataclass(frozen=True, eq=False)
+class RecipeCatalog:
+    """Immutable snapshot of the recipes table.
+
+    ``rows`` are read-only views of the raw recipe rows and ``dishes`` the
+    matching ``DishCandidate`` records (``is_favourite`` is always False
+    here; callers mark favourites per user).  ``nutrients`` is a read-only
+    ``(len(dishes), len(NUTRIENT_KEYS))`` matrix of per-serving values in
+    ``NUTRIENT_KEYS`` order, aligned with ``dishes``.  Callers that need a
+    mutable row (e.g. to build a response) must copy it with ``dict(row)``.
+    """
+
+    version: str
+    rows: tuple[Mapping[str, Any], ...]
+    dishes: tuple[DishCandidate, ...]
+    index: Mapping[str, int]
+    nutrients: np.ndarray
+    servings_yield: np.ndarray
+    _derived: dict[str, Any] = field(default_factory=dict, repr=False)
+    _derived_lock: threading.RLock = field(default_factory=threading.RLock, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.dishes)
+
+    def position(self, recipe_id: Any) -> int | None:
+        """Return the row position for a recipe id (``"12"`` or ``"r12"``)."""
+        rid = str(recipe_id or "")
+        pos = self.index.get(rid)
+        if pos is None and rid.startswith("r"):
+            pos = self.index.get(rid[1:])
+        return pos
+
+    def get_row(self, recipe_id: Any) -> Mapping[str, Any] | None:
+        pos = self.position(recipe_id)
+        return self.rows[pos] if pos is not None else None
+
+    def get_dish(self, recipe_id: Any) -> DishCandidate | None:
+        pos = self.position(recipe_id)
+        return self.dishes[pos] if pos is not None else None
+
+    def nutrient_column(self, key: str) -> np.ndarray:
+        return self.nutrients[:, NUTRIENT_KEYS.index(key)]
+
+    def derive(self, name: str, builder: Callable[[RecipeCatalog], Any]) -> Any:
+        """Return a view computed once per snapshot.
+
+        Lets callers cache their own projections of the catalog (e.g. API
+        payloads) without a separate invalidation path: a new snapshot
+        starts with an empty cache.
+        """
+        try:
+            return self._derived[name]
+        except KeyError:
+            pass
+        with self._derived_lock:
+            if name not in self._derived:
+                self._derived[name] = builder(self)
+            return self._derived[name]
+
+
+def build_recipe_catalog(version: str, recipe_rows: list[Any]) -> RecipeCatalog:
+    rows = tuple(MappingProxyType(dict(row)) for row in recipe_rows)
+    dishes = tuple(build_dish_candidate(row) for row in rows)
+    index = MappingProxyType({dish.id: pos for pos, dish in enumerate(dishes)})
+
+    nutrients = np.array(
+        [[getattr(dish, key) for key in NUTRIENT_KEYS] for dish in dishes],
+        dtype=np.float64,
+    ).reshape(len(dishes), len(NUTRIENT_KEYS))
+    nutrients.flags.writeable = False
+    servings_yield = np.array(
+        [parse_servings_yield(row.get("servings")) for row in rows], dtype=np.int32
+    )
+    servings_yield.flags.writeable = False
+
+    return RecipeCatalog(
+        version=version,
+        rows=rows,
+        dishes=dishes,
+        index=index,
+        nutrients=nutrients,
+        servings_yield=servings_yield,
+    )
+
+
+_catalog: RecipeCatalog | None = None
+_checked_at = 0.0
+_lock = threading.Lock()
+_loads = 0
+_last_load_seconds = 0.0
+_loaded_at: float | None = None
+
+
+def read_dataset_version(conn: Any) -> str:
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", ("dataset_version",)).fetchone()
+    return str(row["value"]) if row else ""
+
+
+def get_recipe_catalog(conn: Any) -> RecipeCatalog:
+    """Return the current catalog snapshot, (re)loading it if the dataset changed."""
+    global _catalog, _checked_at, _loads, _last_load_seconds, _loaded_at
+
+    catalog = _catalog
+    if catalog is not None and time.monotonic() - _checked_at < CATALOG_VERSION_CHECK_SECONDS:
+        return catalog
+
+    version = read_dataset_version(conn)
+    if catalog is not None and catalog.version == version:
+        _checked_at = time.monotonic()
+        return catalog
+
+    with _lock:
+        catalog = _catalog
+        if catalog is None or catalog.version != version:
+            started = time.monotonic()
+            recipe_rows = conn.execute("SELECT * FROM recipes").fetchall()
+            catalog = build_recipe_catalog(version, recipe_rows)
+            _catalog = catalog
+            _loads += 1
+            _last_load_seconds = time.monotonic() - started
+            _loaded_at = time.time()
+            print(
+                f"[catalog] loaded version={version!r} recipes={len(catalog)} "
+                f"seconds={_last_load_seconds:.2f}"
+            )
+        _checked_at = time.monotonic()
+    return catalog
+
+
+def invalidate_recipe_catalog() -> None:
+    """Drop the current snapshot so the next ``get_recipe_catalog`` reloads."""
+    global _catalog
+    with _lock:
+        _catalog = None
+
+
+def recipe_catalog_stats() -> dict[str, Any] | None:
+    catalog = _catalog
+    if catalog is None:
+        return None
+    return {
+        "version": catalog.version,
+        "recipes": len(catalog),
+        "loads": _loads,
+        "lastLoadMs": round(_last_load_seconds * 1000, 1),
+        "loadedAt": _loaded_at,
+    }
@@ -4,7 +4,12 @@ from typing import Any
 
 from ..constants import CONDITION_CONFIG, CONDITION_RULES, NUTRIENT_KEYS, RDA
 from ..utils import parse_json
-from .nutrient_calculator import get_day_nutrients, get_entry_nutrients, get_row_nutrients
+from .nutrient_calculator import (
+    IngredientTable,
+    get_day_nutrients,
+    get_entry_nutrients,
+    get_row_nutrients,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -71,7 +76,7 @@ def score_dish(
     day_entries: list[dict[str, Any]],
     meal_type: str,
     all_week_entries: list[dict[str, Any]],
-    ingredient_cache: dict[str, list[float]],
+    ingredient_cache: IngredientTable,
     favourite_ids: set[str] | None = None,
 ) -> dict[str, int]:
     dish_id = str(_dish_get(dish, "id") or "")
@@ -155,11 +160,87 @@ def _category_matches_meal_type(category: str, meal_type: str) -> bool:
     return any(kw in cat_lower for kw in allowed)
 
 
+_PESCATARIAN_EXCLUDED = ("beef", "pork", "chicken", "lamb", "turkey", "duck", "veal")
+_HALAL_EXCLUDED = ("pork", "ham", "bacon", "lard", "prosciutto", "pancetta", "chorizo")
+
+
+def _dish_filter_fields(dish: Any) -> tuple[dict[str, float], list[str], list[str], str, str]:
+    """Ingredients, tags, allergies, diet label and category of a dish row
+    or ``DishCandidate``, with JSON columns parsed."""
+    raw_ingredients = _dish_get(dish, "ingredients", {})
+    ingredients: dict[str, float] = (
+        parse_json(raw_ingredients, {}) if isinstance(raw_ingredients, (str, bytes))
+        else (raw_ingredients or {})
+    )
+    raw_tags = _dish_get(dish, "tags", [])
+    tags: list[str] = (
+        parse_json(raw_tags, []) if isinstance(raw_tags, (str, bytes))
+        else list(raw_tags or [])
+    )
+    raw_allergies = _dish_get(dish, "allergies", [])
+    dish_allergies: list[str] = (
+        parse_json(raw_allergies, []) if isinstance(raw_allergies, (str, bytes))
+        else list(raw_allergies or [])
+    )
+    diet_label = str(_dish_get(dish, "diet_label", "none") or "none")
+    category = str(_dish_get(dish, "category", "") or "")
+    return ingredients, tags, dish_allergies, diet_label, category
+
+
+def _allergy_terms(ingredients: dict[str, float], dish_allergies: list[str]) -> list[str]:
+    """Values an allergy is matched against: ingredient names and tagged allergies."""
+    return [ing.strip().lower() for ing in ingredients.keys()] + [a.strip().lower() for a in dish_allergies]
+
+
+def _allergy_matches(allergy: str, term: str) -> bool:
+    return allergy in term or term in allergy
+
+
+def _profile_allergies(user_profile: dict[str, Any]) -> list[str]:
+    return [a.strip().lower() for a in user_profile.get("allergies", []) if str(a).strip()]
+
+
+def _profile_diet(user_profile: dict[str, Any]) -> str | None:
+    """The diet to filter by, or None when the profile has none."""
+    if user_profile.get("diet") == "none":
+        return None
+    return (user_profile.get("diet") or "none").strip().lower()
+
+
+def _diet_allows(diet: str, tags: list[str], diet_label: str, ingredients: dict[str, float]) -> bool:
+    dish_diet = diet_label.strip().lower()
+    if diet == "vegetarian" and "vegetarian" not in tags and dish_diet not in {"vegetarian", "vegan"}:
+        return False
+    if diet == "vegan" and "vegan" not in tags and dish_diet != "vegan":
+        return False
+
+    ing_keys_lower = " ".join(k.lower() for k in ingredients.keys())
+    if diet == "pescatarian" and any(x in ing_keys_lower for x in _PESCATARIAN_EXCLUDED):
+        return False
+    if diet == "halal" and any(x in ing_keys_lower for x in _HALAL_EXCLUDED):
+        return False
+    return True
+
+
+def _condition_blocks(dish: Any, condition: str, nutrients: dict[str, float]) -> bool:
+    """True when ``condition`` rules the dish out: an "avoid" label, or a
+    nutrient over twice its per-meal limit.  "Caution" dishes are kept."""
+    cfg = CONDITION_CONFIG.get(condition)
+    if cfg:
+        category_text = str(_dish_get(dish, cfg["category_column"]) or "").strip().lower()
+        if "avoid" in category_text:
+            return True
+    rule = CONDITION_RULES.get(condition)
+    if not rule:
+        return False
+    return any(nutrients.get(nutrient, 0) > limit * 2.0 for nutrient, limit in rule["limit"].items())
+
+
 def filter_dishes(
     dishes: list[Any],
     user_profile: dict[str, Any],
     meal_type: str,
-    ingredient_cache: dict[str, list[float]],
+    ingredient_cache: IngredientTable,
     *,
     filter_meal_type: bool = True,
     filter_diet: bool = True,
@@ -172,64 +253,26 @@ def filter_dishes(
     Accepts both legacy dict rows (from ``dishes.py``) and the new
     ``DishCandidate`` objects (from ``solver/inputs.py``).  Field access is
     normalised through ``_dish_get`` so both shapes work transparently.
+    For the whole catalog, ``eligibility.EligibilityIndex`` gives the same
+    result from precomputed masks.
     """
     filtered: list[Any] = []
+    allergies = _profile_allergies(user_profile) if filter_allergies and user_profile.get("allergies") else []
+    diet = _profile_diet(user_profile) if filter_diet else None
+    conditions = list(user_profile.get("conditions") or []) if filter_conditions else []
 
     for dish in dishes:
-        # --- Resolve fields (dict or DishCandidate) ---
-        raw_ingredients = _dish_get(dish, "ingredients", {})
-        ingredients: dict[str, float] = (
-            parse_json(raw_ingredients, {}) if isinstance(raw_ingredients, (str, bytes))
-            else (raw_ingredients or {})
-        )
-        raw_tags = _dish_get(dish, "tags", [])
-        tags: list[str] = (
-            parse_json(raw_tags, []) if isinstance(raw_tags, (str, bytes))
-            else list(raw_tags or [])
-        )
-        raw_allergies = _dish_get(dish, "allergies", [])
-        dish_allergies: list[str] = (
-            parse_json(raw_allergies, []) if isinstance(raw_allergies, (str, bytes))
-            else list(raw_allergies or [])
-        )
-        diet_label = str(_dish_get(dish, "diet_label", "none") or "none")
-        category = str(_dish_get(dish, "category", "") or "")
+        ingredients, tags, dish_allergies, diet_label, category = _dish_filter_fields(dish)
 
         # --- Allergy filter ---
-        if filter_allergies and user_profile.get("allergies"):
-            allergies = [a.strip().lower() for a in user_profile.get("allergies", []) if str(a).strip()]
-            ingredient_hits = [ing.strip().lower() for ing in ingredients.keys()]
-            tagged_hits = [a.strip().lower() for a in dish_allergies]
-
-            def _allergy_match(allergy: str, value: str) -> bool:
-                return allergy in value or value in allergy
-
-            blocked = any(
-                _allergy_match(allergy, value)
-                for allergy in allergies
-                for value in [*ingredient_hits, *tagged_hits]
-            )
-            if blocked:
+        if allergies:
+            terms = _allergy_terms(ingredients, dish_allergies)
+            if any(_allergy_matches(allergy, term) for allergy in allergies for term in terms):
                 continue
 
         # --- Diet filter ---
-        if filter_diet and user_profile.get("diet") != "none":
-            diet = (user_profile.get("diet") or "none").strip().lower()
-            dish_diet = diet_label.strip().lower()
-            if diet == "vegetarian" and "vegetarian" not in tags and dish_diet not in {"vegetarian", "vegan"}:
-                continue
-            if diet == "vegan" and "vegan" not in tags and dish_diet != "vegan":
-                continue
-
-            ing_keys_lower = " ".join(k.lower() for k in ingredients.keys())
-            if diet == "pescatarian" and any(
-                x in ing_keys_lower for x in ["beef", "pork", "chicken", "lamb", "turkey", "duck", "veal"]
-            ):
-                continue
-            if diet == "halal" and any(
-                x in ing_keys_lower for x in ["pork", "ham", "bacon", "lard", "prosciutto", "pancetta", "chorizo"]
-            ):
-                continue
+        if diet is not None and not _diet_allows(diet, tags, diet_label, ingredients):
+            continue
 
         # --- Meal-type filter ---
         if filter_meal_type and not _category_matches_meal_type(category, meal_type):
@@ -239,36 +282,10 @@ def filter_dishes(
             continue
 
         # --- Condition filter ---
-        if filter_conditions and user_profile.get("conditions"):
-            blocked = False
-            for condition in user_profile["conditions"]:
-                cfg = CONDITION_CONFIG.get(condition)
-                if not cfg:
-                    continue
-                category_col = cfg["category_column"]
-                category_text = str(_dish_get(dish, category_col) or "").strip().lower()
-                if "avoid" in category_text:
-                    blocked = True
-                    break
-            if blocked:
-                continue
-
+        if conditions:
             nutrients = get_row_nutrients(dish)
-            if get_warnings(nutrients, user_profile["conditions"], dish):
-                # Keep "caution" dishes; only drop severe nutrient offenders.
-                severe = False
-                for condition in user_profile["conditions"]:
-                    rule = CONDITION_RULES.get(condition)
-                    if not rule:
-                        continue
-                    for nutrient, limit in rule["limit"].items():
-                        if nutrients.get(nutrient, 0) > limit * 2.0:
-                            severe = True
-                            break
-                    if severe:
-                        break
-                if severe:
-                    continue
+            if any(_condition_blocks(dish, condition, nutrients) for condition in conditions):
+                continue
 
         filtered.append(dish)
 
@@ -279,7 +296,7 @@ def get_entry_warnings(
     entry: dict[str, Any],
     dish_ingredients: str | dict[str, float],
     conditions: list[str],
-    ingredient_cache: dict[str, list[float]],
+    ingredient_cache: IngredientTable,
 ) -> list[str]:
     nutrients = get_entry_nutrients(entry, ingredient_cache)
     return get_warnings(nutrients, conditions)
@@ -39,7 +39,7 @@ def get_shopping_list(
         """
         SELECT mp.day_index, mp.meal_type, mp.servings, mp.custom_ingredients, r.ingredients
         FROM meal_plans mp
-        JOIN recipes r ON (r.id::text = mp.dish_id OR ('r' || r.id::text) = mp.dish_id)
+        JOIN recipes r ON r.id = mp.recipe_id
         WHERE mp.user_id = ? AND mp.week_start = ?
         """,
         (user_id, ws),
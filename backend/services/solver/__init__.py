@@ -2,47 +2,65 @@ from .core import (
     build_candidate_pools,
     generate_meal_plan_for_week,
     plan_result_to_entries,
+    prepare_meal_plan_generation,
     solve_meal_plan,
+    solve_prepared_generation,
     summarize_plan,
     _compute_recency_penalties,
 )
+from .decompose import solve_decomposed
+from .greedy import greedy_meal_plan
 from .inputs import load_solver_inputs_from_db
 from .models import (
     DEFAULT_MEAL_CALORIE_RATIO,
     DEFAULT_MEAL_SATIETY_RATIO,
     FixedMealAssignment,
     GeneratedMealPlanEntry,
+    InfeasiblePlanError,
     MEALS,
     MAX_RECIPES_PER_MEAL,
     MealGenerationResult,
+    PlanConflict,
     PlanResult,
     PlannedRecipe,
+    PreparedMealGeneration,
     SolverConfig,
     SolverInputBundle,
     SolverInputDiagnostics,
     SolverRecipe,
+    SwapSuggestion,
     normalize_recipe,
 )
+from .swap import rank_swaps
 
 __all__ = [
     "DEFAULT_MEAL_CALORIE_RATIO",
     "DEFAULT_MEAL_SATIETY_RATIO",
     "FixedMealAssignment",
     "GeneratedMealPlanEntry",
+    "InfeasiblePlanError",
     "MEALS",
     "MAX_RECIPES_PER_MEAL",
     "MealGenerationResult",
+    "PlanConflict",
     "PlanResult",
     "PlannedRecipe",
+    "PreparedMealGeneration",
     "SolverConfig",
     "SolverInputBundle",
     "SolverInputDiagnostics",
     "SolverRecipe",
+    "SwapSuggestion",
     "build_candidate_pools",
     "generate_meal_plan_for_week",
+    "greedy_meal_plan",
     "load_solver_inputs_from_db",
     "normalize_recipe",
     "plan_result_to_entries",
+    "prepare_meal_plan_generation",
+    "rank_swaps",
+    "solve_decomposed",
     "solve_meal_plan",
+    "solve_prepared_generation",
     "summarize_plan",
 ]
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
-from typing import Any
+import threading
+import time
+from typing import Any, Callable, Iterable
 
 from ...utils import parse_float
 from .inputs import load_solver_inputs_from_db
+from .process_pool import solve_in_pool
+from .pruning import pool_budget, prune_pool
 from .models import (
     FixedMealAssignment,
     MAX_RECIPES_PER_MEAL,
@@ -11,9 +15,11 @@ from .models import (
     MEALS,
     MIN_SERVINGS_PER_SELECTED,
     GeneratedMealPlanEntry,
+    InfeasiblePlanError,
     MealGenerationResult,
     PlanResult,
     PlannedRecipe,
+    PreparedMealGeneration,
     SolverConfig,
     SolverInputBundle,
     SolverRecipe,
@@ -32,39 +38,98 @@ def _import_cp_model():
     return cp_model
 
 
-MAX_CANDIDATES_PER_POOL = 80
+# Called with (objective, elapsed fraction of the time limit) on every
+# improving solution.
+SolutionCallback = Callable[[float, float], None]
 
 
-def _cap_pool(recipes: list[SolverRecipe], cap: int) -> list[SolverRecipe]:
-    """Trim a candidate pool to *cap* recipes.
+class _StopPolicy:
+    """Anytime stop rules for one CP-SAT search.
 
-    Keeps a balanced mix: favourites first, then a random sample of main
-    courses and non-main courses so the solver always has both available.
+    The solution callback stops the search once the relative gap to the best
+    bound drops to ``config.stop_relative_gap``; a watchdog thread stops it
+    after ``config.stop_stall_seconds`` without a solution that improves the
+    objective by at least ``config.stop_min_improvement`` (relative).  The
+    solver's own time limit is the hard wall-clock cap.
     """
-    if len(recipes) <= cap:
-        return recipes
-    import random as _rng
-
-    favs = [r for r in recipes if r.is_favourite]
-    main = [r for r in recipes if r.is_main_course and not r.is_favourite]
-    rest = [r for r in recipes if not r.is_main_course and not r.is_favourite]
-    _rng.shuffle(main)
-    _rng.shuffle(rest)
-
-    # Reserve half the remaining budget for mains, half for sides/others
-    budget = cap - len(favs)
-    main_budget = min(len(main), budget // 2)
-    rest_budget = min(len(rest), budget - main_budget)
-    # If one category didn't fill its half, give the remainder to the other
-    if main_budget < budget // 2:
-        rest_budget = min(len(rest), budget - main_budget)
-    elif rest_budget < budget - main_budget:
-        main_budget = min(len(main), budget - rest_budget)
-
-    return favs + main[:main_budget] + rest[:rest_budget]
-
-
-def build_candidate_pools(recipes: list[SolverRecipe]) -> dict[str, list[SolverRecipe]]:
+
+    def __init__(self, solver: Any, config: SolverConfig) -> None:
+        self.solver = solver
+        self.gap_limit = max(0.0, float(config.stop_relative_gap))
+        self.stall_seconds = max(0.0, float(config.stop_stall_seconds))
+        self.min_improvement = max(0.0, float(config.stop_min_improvement))
+        self.reason: str | None = None
+        self.solutions = 0
+        self.best: float | None = None
+        self.last_improvement = time.monotonic()
+        self._done = threading.Event()
+
+    def on_solution(self, objective: float, bound: float) -> bool:
+        """Record an improving solution; return True to stop the search."""
+        self.solutions += 1
+        if self.best is None or self.best - objective >= self.min_improvement * max(1.0, abs(self.best)):
+            self.last_improvement = time.monotonic()
+            self.best = objective
+        if self.gap_limit > 0 and abs(objective - bound) <= self.gap_limit * max(1.0, abs(objective)):
+            self.reason = "gap"
+            return True
+        return False
+
+    def _watch(self) -> None:
+        while not self._done.wait(0.1):
+            if self.solutions and time.monotonic() - self.last_improvement >= self.stall_seconds:
+                self.reason = "stall"
+                self.solver.StopSearch()
+                return
+
+    def __enter__(self) -> _StopPolicy:
+        if self.stall_seconds > 0:
+            threading.Thread(target=self._watch, name="solver-stall-watch", daemon=True).start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._done.set()
+
+
+def _make_solution_callback(
+    cp_model_mod: Any,
+    policy: _StopPolicy,
+    on_solution: SolutionCallback | None,
+    time_limit: float,
+    on_record: Callable[[Any], None] | None = None,
+) -> Any:
+    class _Callback(cp_model_mod.CpSolverSolutionCallback):
+        def on_solution_callback(self) -> None:
+            if on_record is not None:
+                on_record(self)
+            if policy.on_solution(self.ObjectiveValue(), self.BestObjectiveBound()):
+                self.StopSearch()
+            if on_solution is None:
+                return
+            try:
+                on_solution(self.ObjectiveValue(), min(1.0, self.WallTime() / max(time_limit, 1e-6)))
+            except Exception as exc:  # never let reporting abort the search
+                print(f"[solver] solution_callback_error: {exc}")
+
+    return _Callback()
+
+
+def _slot_targets(
+    meal: str,
+    targets: dict[str, float] | None,
+    config: SolverConfig | None,
+) -> dict[str, float] | None:
+    """Per-dish share of the daily targets for a meal pool."""
+    if not targets or config is None:
+        return None
+    # Lunch and dinner share a pool; aim between their shares.
+    meals = ("lunch", "dinner") if meal in ("lunch", "dinner") else (meal,)
+    share = sum(config.meal_calorie_ratio.get(m, 0) / config.get_max_recipes(m) for m in meals) / len(meals)
+    return {k: parse_float(targets.get(k), 0.0) * share for k in ("calories", "protein", "carbs")}
+
+
+def _split_pools(recipes: list[SolverRecipe]) -> tuple[list[SolverRecipe], list[SolverRecipe]]:
+    """Unpruned breakfast and lunch/dinner pools."""
     breakfast = [r for r in recipes if "breakfast" in r.meal_types]
     lunch_dinner = [r for r in recipes if "lunch" in r.meal_types or "dinner" in r.meal_types]
 
@@ -72,8 +137,25 @@ def build_candidate_pools(recipes: list[SolverRecipe]) -> dict[str, list[SolverR
         breakfast = lunch_dinner[:20]
     if not lunch_dinner:
         raise ValueError("No lunch/dinner candidates available for the solver.")
+    return breakfast, lunch_dinner
+
 
-    lunch_dinner = _cap_pool(lunch_dinner, MAX_CANDIDATES_PER_POOL)
+def build_candidate_pools(
+    recipes: list[SolverRecipe],
+    *,
+    config: SolverConfig | None = None,
+    targets: dict[str, float] | None = None,
+    keep_ids: set[str] | frozenset[str] = frozenset(),
+) -> dict[str, list[SolverRecipe]]:
+    """Split recipes into meal pools, each pruned to the solve's budget."""
+    breakfast, lunch_dinner = _split_pools(recipes)
+    cap = pool_budget(config)
+    breakfast = prune_pool(
+        breakfast, cap, config=config, slot_targets=_slot_targets("breakfast", targets, config), keep_ids=keep_ids,
+    )
+    lunch_dinner = prune_pool(
+        lunch_dinner, cap, config=config, slot_targets=_slot_targets("lunch", targets, config), keep_ids=keep_ids,
+    )
 
     return {
         "breakfast": breakfast,
@@ -82,17 +164,120 @@ def build_candidate_pools(recipes: list[SolverRecipe]) -> dict[str, list[SolverR
     }
 
 
-def _create_decision_variables(model: Any, candidates: dict[str, list[SolverRecipe]], num_days: int):
-    x: dict[tuple[int, str, str], Any] = {}
-    servings: dict[tuple[int, str, str], Any] = {}
-    for day in range(num_days):
+# Scaled nutrient coefficients precomputed per candidate pool.
+NUTRIENT_FIELDS = ("calories", "protein", "carbs", "fat", "fiber", "sodium", "sugar", "cholesterol")
+
+
+class _ModelVars:
+    """Decision variables plus the flat arrays the model is built from.
+
+    Only open slots get variables.  Fixed slots are folded into constants:
+    their nutrients into ``fixed_totals`` and their recipes into
+    ``fixed_use``.  Closed slots (e.g. locked past meals) stay empty.
+    ``x``/``servings`` are keyed by ``(day, meal, recipe_id)``; ``slot_x`` and
+    ``slot_servings`` hold the same variables per open ``(day, meal)`` in pool
+    order, matching the integer coefficient vectors in ``coeffs``.  Each
+    nutrient's daily total is one shared ``IntVar`` (see ``day_total``).
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        linear: Any,
+        candidates: dict[str, list[SolverRecipe]],
+        num_days: int,
+        fixed: dict[tuple[int, str], list[FixedMealAssignment]] | None = None,
+        closed: set[tuple[int, str]] | frozenset[tuple[int, str]] = frozenset(),
+    ) -> None:
+        self.model = model
+        self.linear = linear
+        self.candidates = candidates
+        self.num_days = num_days
+        self.fixed = fixed or {}
+        self.x: dict[tuple[int, str, str], Any] = {}
+        self.servings: dict[tuple[int, str, str], Any] = {}
+        self.slot_x: dict[tuple[int, str], list[Any]] = {}
+        self.slot_servings: dict[tuple[int, str], list[Any]] = {}
+        self._day_totals: dict[tuple[str, int], Any] = {}
+        self.recipes_by_id = {r.recipe_id: r for meal in MEALS for r in candidates[meal]}
+
+        # Lunch and dinner share one pool list; compute its vectors once.
+        by_pool: dict[int, dict[str, list[int]]] = {}
+        self.coeffs: dict[str, dict[str, list[int]]] = {}
         for meal in MEALS:
-            for recipe in candidates[meal]:
-                key = (day, meal, recipe.recipe_id)
-                suffix = f"d{day}_{meal}_{recipe.recipe_id}"
-                x[key] = model.NewBoolVar(f"x_{suffix}")
-                servings[key] = model.NewIntVar(0, MAX_SERVINGS_PER_RECIPE, f"s_{suffix}")
-    return x, servings
+            pool = candidates[meal]
+            if id(pool) not in by_pool:
+                by_pool[id(pool)] = {
+                    nutrient: [to_int(getattr(r, nutrient)) for r in pool] for nutrient in NUTRIENT_FIELDS
+                }
+            self.coeffs[meal] = by_pool[id(pool)]
+
+        self.fixed_totals: dict[tuple[str, int], int] = {}
+        self.fixed_use: dict[tuple[int, str], int] = {}
+        for (day, _meal), assignments in self.fixed.items():
+            for a in assignments:
+                recipe = self.recipes_by_id[a.recipe_id]
+                serving_count = int(round(a.servings))
+                for nutrient in NUTRIENT_FIELDS:
+                    key = (nutrient, day)
+                    self.fixed_totals[key] = self.fixed_totals.get(key, 0) + to_int(getattr(recipe, nutrient)) * serving_count
+                self.fixed_use[(day, a.recipe_id)] = self.fixed_use.get((day, a.recipe_id), 0) + 1
+
+        for day in range(num_days):
+            for meal in MEALS:
+                if (day, meal) in self.fixed or (day, meal) in closed:
+                    continue
+                xs: list[Any] = []
+                ss: list[Any] = []
+                for recipe in candidates[meal]:
+                    key = (day, meal, recipe.recipe_id)
+                    suffix = f"d{day}_{meal}_{recipe.recipe_id}"
+                    xs.append(model.NewBoolVar(f"x_{suffix}"))
+                    ss.append(model.NewIntVar(0, MAX_SERVINGS_PER_RECIPE, f"s_{suffix}"))
+                    self.x[key] = xs[-1]
+                    self.servings[key] = ss[-1]
+                self.slot_x[(day, meal)] = xs
+                self.slot_servings[(day, meal)] = ss
+
+    def day_total(self, nutrient: str, day: int) -> Any:
+        """Scaled total of ``nutrient`` on ``day``, created once per model."""
+        key = (nutrient, day)
+        total = self._day_totals.get(key)
+        if total is None:
+            total = self.model.NewIntVar(0, 10**9, f"day{day}_{nutrient}")
+            variables: list[Any] = []
+            coefficients: list[int] = []
+            for meal in MEALS:
+                if (day, meal) in self.slot_servings:
+                    variables.extend(self.slot_servings[(day, meal)])
+                    coefficients.extend(self.coeffs[meal][nutrient])
+            self.model.Add(
+                total == self.linear.WeightedSum(variables, coefficients) + self.fixed_totals.get(key, 0)
+            )
+            self._day_totals[key] = total
+        return total
+
+    def usage(self, rid: str, days: Iterable[int], meals: list[str]) -> tuple[list[Any], int]:
+        """Open pick variables and fixed pick count for ``rid`` over ``days``."""
+        open_x: list[Any] = []
+        fixed_count = 0
+        for day in days:
+            fixed_count += self.fixed_use.get((day, rid), 0)
+            open_x.extend(self.x[(day, m, rid)] for m in meals if (day, m, rid) in self.x)
+        return open_x, fixed_count
+
+
+def _create_decision_variables(
+    model: Any,
+    candidates: dict[str, list[SolverRecipe]],
+    num_days: int,
+    linear: Any = None,
+    fixed: dict[tuple[int, str], list[FixedMealAssignment]] | None = None,
+    closed: set[tuple[int, str]] | frozenset[tuple[int, str]] = frozenset(),
+) -> _ModelVars:
+    if linear is None:
+        linear = _import_cp_model().LinearExpr
+    return _ModelVars(model, linear, candidates, num_days, fixed, closed)
 
 
 def _normalize_fixed_assignments(
@@ -130,211 +315,183 @@ def _normalize_fixed_assignments(
     return normalized
 
 
+def _apply_hint(
+    model: Any,
+    mv: _ModelVars,
+    config: SolverConfig,
+    hint: dict[tuple[int, str], list[FixedMealAssignment]],
+) -> list[Any]:
+    """Add CP-SAT hints for hinted slots; return the hinted pick variables.
+
+    Only open slots have variables; fixed and closed slots are skipped.
+    Slots without a hint are left for the solver to choose freely.
+    """
+    hinted: list[Any] = []
+    for (day, meal), assignments in hint.items():
+        if (day, meal) not in mv.slot_x:
+            continue
+        picks = {a.recipe_id: int(round(a.servings)) for a in assignments[:config.get_max_recipes(meal)]}
+        for recipe, x_var, s_var in zip(mv.candidates[meal], mv.slot_x[(day, meal)], mv.slot_servings[(day, meal)]):
+            serving_count = picks.get(recipe.recipe_id, 0)
+            model.AddHint(x_var, 1 if serving_count else 0)
+            model.AddHint(s_var, serving_count)
+            if serving_count:
+                hinted.append(x_var)
+    return hinted
+
+
 def _apply_constraints(
     model: Any,
-    candidates: dict[str, list[SolverRecipe]],
-    x: dict, servings: dict,
+    mv: _ModelVars,
     targets: dict[str, float],
     config: SolverConfig,
-    fixed: dict[tuple[int, str], list[FixedMealAssignment]],
     hard_limit_keys: set[str] | None = None,
 ):
-    nutrient_getters = {
-        "calories": lambda r: r.calories,
-        "protein": lambda r: r.protein,
-        "carbs": lambda r: r.carbs,
-        "fat": lambda r: r.fat,
-        "fiber": lambda r: r.fiber,
-        "sodium": lambda r: r.sodium,
-        "sugar": lambda r: r.sugar,
-        "cholesterol": lambda r: r.cholesterol,
-    }
     hard_limit_keys = set(hard_limit_keys or ())
 
-    for day in range(config.num_days):
-        for meal in MEALS:
-            meal_recipes = candidates[meal]
-            assignments = fixed.get((day, meal))
-
-            if assignments:
-                fixed_ids = {a.recipe_id for a in assignments}
-                fixed_servings = {a.recipe_id: int(round(a.servings)) for a in assignments}
-                for recipe in meal_recipes:
-                    key = (day, meal, recipe.recipe_id)
-                    if recipe.recipe_id in fixed_ids:
-                        model.Add(x[key] == 1)
-                        model.Add(servings[key] == fixed_servings[recipe.recipe_id])
-                    else:
-                        model.Add(x[key] == 0)
-                        model.Add(servings[key] == 0)
-                model.Add(sum(x[(day, meal, r.recipe_id)] for r in meal_recipes) == len(assignments))
-            else:
-                for recipe in meal_recipes:
-                    key = (day, meal, recipe.recipe_id)
-                    model.Add(servings[key] <= MAX_SERVINGS_PER_RECIPE * x[key])
-                    model.Add(servings[key] >= MIN_SERVINGS_PER_SELECTED * x[key])
-                meal_max = config.get_max_recipes(meal)
-                model.Add(sum(x[(day, meal, r.recipe_id)] for r in meal_recipes) <= meal_max)
-                # When the user explicitly requests N dishes, enforce exactly N
-                # (not just "at least 1"). Fall back to >= 1 only for default (1).
-                meal_min = meal_max if meal_max <= len(meal_recipes) else min(1, len(meal_recipes))
-                model.Add(sum(x[(day, meal, r.recipe_id)] for r in meal_recipes) >= meal_min)
-
-                # Main course preference is handled in the objective (soft),
-                # not as a hard constraint, to avoid infeasibility.
+    for day, meal in mv.slot_x:
+        meal_recipes = mv.candidates[meal]
+        xs = mv.slot_x[(day, meal)]
+        for x_var, s_var in zip(xs, mv.slot_servings[(day, meal)]):
+            model.Add(s_var <= MAX_SERVINGS_PER_RECIPE * x_var)
+            model.Add(s_var >= MIN_SERVINGS_PER_SELECTED * x_var)
+        meal_max = config.get_max_recipes(meal)
+        # When the user explicitly requests N dishes, enforce exactly N
+        # (not just "at least 1"). Fall back to >= 1 only for default (1).
+        meal_min = meal_max if meal_max <= len(meal_recipes) else min(1, len(meal_recipes))
+        model.AddLinearConstraint(mv.linear.Sum(xs), meal_min, meal_max)
+
+        # Main course preference is handled in the objective (soft),
+        # not as a hard constraint, to avoid infeasibility.
 
+    for day in range(config.num_days):
         # Frontend overrides are intended as hard daily caps. Profile-derived
         # defaults remain soft objective targets unless explicitly overridden.
         for nutrient in hard_limit_keys:
-            getter = nutrient_getters.get(nutrient)
             daily_limit = to_int(targets.get(nutrient, 0))
-            if getter is None or daily_limit <= 0:
+            if nutrient not in NUTRIENT_FIELDS or daily_limit <= 0:
                 continue
-            day_total = model.NewIntVar(0, 10**9, f"hard_{nutrient}_d{day}")
-            model.Add(day_total == sum(
-                to_int(getter(r)) * servings[(day, meal, r.recipe_id)]
-                for meal in MEALS for r in candidates[meal]
-            ))
-            model.Add(day_total <= daily_limit)
+            model.Add(mv.day_total(nutrient, day) <= daily_limit)
 
 
 def _build_objective(
     model: Any,
-    candidates: dict[str, list[SolverRecipe]],
-    x: dict, servings: dict,
+    mv: _ModelVars,
     targets: dict[str, float],
     config: SolverConfig,
-    fixed: dict[tuple[int, str], list[FixedMealAssignment]],
 ) -> Any:
-    terms: list[Any] = []
-
+    """Build the objective as one weighted sum over flat term arrays."""
     import random
 
+    candidates = mv.candidates
+    variables: list[Any] = []
+    weights: list[int] = []
+
     # ── Priority 1: Nutrient targets (highest priority) ──
     # Aim to hit daily calorie, protein, carbs targets.
-    target_nutrient_getters = {
-        "calories": lambda r: r.calories,
-        "protein": lambda r: r.protein,
-        "carbs": lambda r: r.carbs,
-    }
-    for nutrient, getter in target_nutrient_getters.items():
+    for nutrient in ("calories", "protein", "carbs"):
         daily_target = to_int(targets[nutrient])
         if daily_target <= 0:
             continue
+        weight = max(1, int(round(1000 / daily_target))) * 1000
         for day in range(config.num_days):
-            day_total = model.NewIntVar(0, 10**9, f"day{day}_{nutrient}")
-            model.Add(day_total == sum(
-                to_int(getter(r)) * servings[(day, meal, r.recipe_id)]
-                for meal in MEALS for r in candidates[meal]
-            ))
             pos = model.NewIntVar(0, 10**9, f"dp_{nutrient}_d{day}")
             neg = model.NewIntVar(0, 10**9, f"dn_{nutrient}_d{day}")
-            model.Add(day_total - daily_target == pos - neg)
-            weight = max(1, int(round(1000 / daily_target)))
-            terms.append(weight * (pos + neg) * 1000)
+            model.Add(mv.day_total(nutrient, day) - daily_target == pos - neg)
+            variables += (pos, neg)
+            weights += (weight, weight)
 
     # ── Priority 2: Condition-safe nutrients (soft caps) ──
     # Fat, sodium, sugar — penalise exceeding condition limits.
     # All soft — the solver CAN exceed but strongly prefers not to.
-    limit_nutrient_getters = {
-        "fat":    lambda r: r.fat,
-        "sodium": lambda r: r.sodium,
-        "sugar":  lambda r: r.sugar,
-    }
-    for nutrient, getter in limit_nutrient_getters.items():
+    for nutrient in ("fat", "sodium", "sugar"):
         daily_limit = to_int(targets.get(nutrient, 0))
         if daily_limit <= 0:
             continue
         for day in range(config.num_days):
-            day_total = model.NewIntVar(0, 10**9, f"day{day}_{nutrient}")
-            model.Add(day_total == sum(
-                to_int(getter(r)) * servings[(day, meal, r.recipe_id)]
-                for meal in MEALS for r in candidates[meal]
-            ))
             over = model.NewIntVar(0, 10**9, f"over_{nutrient}_d{day}")
-            model.Add(day_total - daily_limit <= over)
-            terms.append(over * 5000)
+            model.Add(mv.day_total(nutrient, day) - daily_limit <= over)
+            variables.append(over)
+            weights.append(5000)
 
     # ── Priority 3: No same-dish-same-day + light variety ──
-    all_ids = list(dict.fromkeys(r.recipe_id for meal in MEALS for r in candidates[meal]))
-
-    # Same-day no-repeat (strongest variety signal)
-    for rid in all_ids:
+    meals_by_id: dict[str, list[str]] = {}
+    for meal in MEALS:
+        for r in candidates[meal]:
+            meals_by_id.setdefault(r.recipe_id, []).append(meal)
+
+    # Same-day no-repeat (strongest variety signal).  Fixed picks count as
+    # constants; a recipe that can fill at most one slot a day needs no term.
+    for rid, meals in meals_by_id.items():
         for day in range(config.num_days):
-            day_use = sum(x[(day, m, rid)] for m in MEALS if (day, m, rid) in x)
+            open_x, fixed_count = mv.usage(rid, (day,), meals)
+            if not open_x or len(open_x) + fixed_count < 2:
+                continue
             excess = model.NewIntVar(0, 5, f"sameday_{rid}_{day}")
-            model.Add(day_use - 1 <= excess)
-            terms.append(excess * 50000)
+            model.Add(mv.linear.Sum(open_x) + fixed_count - 1 <= excess)
+            variables.append(excess)
+            weights.append(50000)
 
     # Multi-day sliding window — only for multi-day solves, lighter weight
     if config.num_days >= 3:
-        for rid in all_ids:
+        for rid, meals in meals_by_id.items():
             for start in range(config.num_days - 1):
                 window = range(start, min(config.num_days, start + 2))
-                use_count = sum(
-                    x[(d, m, rid)] for d in window for m in MEALS if (d, m, rid) in x
-                )
+                open_x, fixed_count = mv.usage(rid, window, meals)
+                if not open_x or len(open_x) + fixed_count < 2:
+                    continue
                 excess = model.NewIntVar(0, 10, f"rpt_{rid}_{start}")
-                model.Add(use_count - 1 <= excess)
-                terms.append(excess * 10000)
+                model.Add(mv.linear.Sum(open_x) + fixed_count - 1 <= excess)
+                variables.append(excess)
+                weights.append(10000)
 
     # ── Priority 4: Preference weights + condition penalties ──
-    seen_weighted: set[str] = set()
-    for day in range(config.num_days):
-        for meal in MEALS:
-            for r in candidates[meal]:
-                if r.recipe_id not in seen_weighted:
-                    seen_weighted.add(r.recipe_id)
-                    if config.preference_weights:
-                        w = config.preference_weights.get(r.recipe_id, 0)
-                    else:
-                        w = random.randint(-5000, 5000)
-                        if r.is_favourite:
-                            w -= config.favourite_boost
-                    terms.append(w * x[(day, meal, r.recipe_id)])
-
-    if config.condition_penalties:
-        seen_penalized: set[str] = set()
-        for day in range(config.num_days):
-            for meal in MEALS:
-                for r in candidates[meal]:
-                    if r.recipe_id not in seen_penalized and r.recipe_id in config.condition_penalties:
-                        seen_penalized.add(r.recipe_id)
-                        terms.append(config.condition_penalties[r.recipe_id] * x[(day, meal, r.recipe_id)])
-
-    # Cross-week recency
-    if config.recency_penalties:
-        seen_recency: set[str] = set()
-        for day in range(config.num_days):
-            for meal in MEALS:
-                for r in candidates[meal]:
-                    if r.recipe_id not in seen_recency and r.recipe_id in config.recency_penalties:
-                        seen_recency.add(r.recipe_id)
-                        terms.append(config.recency_penalties[r.recipe_id] * x[(day, meal, r.recipe_id)])
+    # Each recipe's weight applies to its first slot (day 0, first meal
+    # offering it); when that slot is fixed or closed the term is a constant
+    # and is left out.
+    first_slot: dict[str, Any] = {}
+    for meal in MEALS:
+        for r in candidates[meal]:
+            first_slot.setdefault(r.recipe_id, mv.x.get((0, meal, r.recipe_id)))
+    for rid, x_var in first_slot.items():
+        if config.preference_weights:
+            w = config.preference_weights.get(rid, 0)
+        else:
+            w = random.randint(-5000, 5000)
+            if mv.recipes_by_id[rid].is_favourite:
+                w -= config.favourite_boost
+        if x_var is not None:
+            variables.append(x_var)
+            weights.append(w)
+
+    # Condition penalties, then cross-week recency.
+    for penalties in (config.condition_penalties, config.recency_penalties):
+        if not penalties:
+            continue
+        for rid, x_var in first_slot.items():
+            if x_var is not None and rid in penalties:
+                variables.append(x_var)
+                weights.append(penalties[rid])
 
     # ── Priority 5: Meal composition (light shaping) ──
     # Prefer 1 main course per multi-dish lunch/dinner
     for day in range(config.num_days):
         for meal in ("lunch", "dinner"):
-            if config.get_max_recipes(meal) >= 2:
-                main_ids = [r.recipe_id for r in candidates[meal] if r.is_main_course]
-                if main_ids:
-                    main_count = sum(x[(day, meal, rid)] for rid in main_ids)
+            if config.get_max_recipes(meal) >= 2 and (day, meal) in mv.slot_x:
+                mains = [x_var for r, x_var in zip(candidates[meal], mv.slot_x[(day, meal)]) if r.is_main_course]
+                if mains:
                     excess_main = model.NewIntVar(0, 10, f"excess_main_d{day}_{meal}")
-                    model.Add(main_count - 1 <= excess_main)
-                    terms.append(excess_main * 5000)
+                    model.Add(mv.linear.Sum(mains) - 1 <= excess_main)
+                    variables.append(excess_main)
+                    weights.append(5000)
 
     # ── Priority 6: Satiety bonus (lightest) ──
-    satiety_terms: list[Any] = []
-    for day in range(config.num_days):
-        for meal in MEALS:
-            for r in candidates[meal]:
-                satiety_terms.append(
-                    to_int(r.protein + r.fiber) * servings[(day, meal, r.recipe_id)]
-                )
-    terms.append(-sum(satiety_terms))
+    satiety = {meal: [-to_int(r.protein + r.fiber) for r in candidates[meal]] for meal in MEALS}
+    for (day, meal), slot_servings in mv.slot_servings.items():
+        variables.extend(slot_servings)
+        weights.extend(satiety[meal])
 
-    return sum(terms)
+    return mv.linear.WeightedSum(variables, weights)
 
 
 def solve_meal_plan(
@@ -345,7 +502,16 @@ def solve_meal_plan(
     config: SolverConfig | None = None,
     fixed_assignments: list[FixedMealAssignment] | None = None,
     hard_limit_keys: set[str] | None = None,
+    on_solution: SolutionCallback | None = None,
+    hint: list[FixedMealAssignment] | None = None,
+    closed_slots: set[tuple[int, str]] | None = None,
 ) -> list[PlanResult]:
+    """Solve a plan for ``config.num_days`` days.
+
+    Slots in ``fixed_assignments`` keep their dishes and ``closed_slots``
+    stay empty.  Neither gets decision variables; fixed dishes still count
+    towards day totals and variety.
+    """
     import random
 
     config = config or SolverConfig()
@@ -360,39 +526,263 @@ def solve_meal_plan(
     recipes = list(recipes)
     random.shuffle(recipes)
 
-    candidates = build_candidate_pools(recipes)
+    keep_ids = {str(a.recipe_id).removeprefix("r") for a in (*(fixed_assignments or ()), *(hint or ()))}
+    candidates = build_candidate_pools(recipes, config=config, targets=targets, keep_ids=keep_ids)
     fixed = _normalize_fixed_assignments(fixed_assignments, candidates, config.num_days)
+    # Occupied slots whose dishes are not solver candidates stay as they are.
+    closed = (
+        set(closed_slots or ())
+        | {(int(a.day_index), str(a.meal_type)) for a in (fixed_assignments or ())}
+    ) - set(fixed)
+
+    # Impossible hard caps fail here in milliseconds instead of after the
+    # whole time limit; the relaxed plan seeds the greedy hint below.
+    from .relaxation import relaxation_precheck
+
+    relaxed_hint = relaxation_precheck(
+        candidates, fixed, closed, targets, config, hard_limit_keys=hard_limit_keys or (),
+    )
 
     model = cp_model_mod.CpModel()
-    x, servings = _create_decision_variables(model, candidates, config.num_days)
-    _apply_constraints(
-        model,
-        candidates,
-        x,
-        servings,
-        targets,
-        config,
-        fixed,
-        hard_limit_keys,
+    mv = _create_decision_variables(
+        model, candidates, config.num_days, cp_model_mod.LinearExpr, fixed, closed,
     )
-    objective = _build_objective(model, candidates, x, servings, targets, config, fixed)
+    _apply_constraints(model, mv, targets, config, hard_limit_keys)
+    objective = _build_objective(model, mv, targets, config)
+    if hint:
+        hinted = _apply_hint(
+            model, mv, config,
+            _normalize_fixed_assignments(hint, candidates, config.num_days),
+        )
+        if hinted and config.stability_weight > 0:
+            objective += config.stability_weight * (len(hinted) - cp_model_mod.LinearExpr.Sum(hinted))
+    else:
+        # No stored plan: start the search from a quick greedy plan, built
+        # from scratch or on the rounded relaxation, whichever is better.
+        from .greedy import GREEDY_HINT_SECONDS, greedy_picks
+
+        seeds = [
+            greedy_picks(
+                candidates, fixed, closed, targets, config,
+                hard_limit_keys=hard_limit_keys or (),
+                hint=start,
+                time_budget=GREEDY_HINT_SECONDS,
+            )
+            for start in (None, relaxed_hint)
+        ]
+        seeded = min((seed for seed in seeds if seed is not None), key=lambda seed: seed[1], default=None)
+        if seeded is not None:
+            greedy_hint: dict[tuple[int, str], list[FixedMealAssignment]] = {}
+            for (day, meal, rid), serving_count in seeded[0].items():
+                greedy_hint.setdefault((day, meal), []).append(
+                    FixedMealAssignment(day_index=day, meal_type=meal, recipe_id=rid, servings=serving_count)
+                )
+            _apply_hint(model, mv, config, greedy_hint)
     model.Minimize(objective)
 
-    solver = cp_model_mod.CpSolver()
-    # Scale time limit with problem complexity
+    time_limit = _time_limit(config)
+    search_model = model
+    if config.two_stage:
+        # Stage one: servings follow the pick variables, so presolve folds
+        # them away and the search only chooses dishes.
+        search_model = model.clone()
+        for key, x_var in mv.x.items():
+            search_model.Add(mv.servings[key] == MIN_SERVINGS_PER_SELECTED * x_var)
+        tuning_seconds = max(1.0, time_limit * SERVINGS_STAGE_FRACTION)
+        time_limit = max(1.0, time_limit - tuning_seconds)
+
+    # With max_solutions > 1 every improving solution is kept as a possible
+    # alternative plan.
+    seen: list[tuple[float, dict[tuple[int, str, str], int]]] = []
+    record = None
+    if config.max_solutions > 1:
+        def record(callback: Any) -> None:
+            seen.append((callback.ObjectiveValue(), _picked_servings(callback.Value, mv)))
+
+    solver, status, stop_reason = _run_search(
+        cp_model_mod, search_model, config, time_limit, on_solution, record,
+    )
+    if status not in (cp_model_mod.OPTIMAL, cp_model_mod.FEASIBLE):
+        from .diagnosis import diagnose_infeasibility
+
+        conflicts = diagnose_infeasibility(
+            candidates, fixed, closed, targets, config, hard_limit_keys=hard_limit_keys or (),
+        )
+        if conflicts:
+            raise InfeasiblePlanError.from_conflicts(conflicts)
+        raise RuntimeError("No feasible meal plan found.")
+
+    best = _picked_servings(solver.Value, mv)
+    solutions = [(solver.ObjectiveValue(), best, stop_reason, solver.WallTime())]
+    if config.max_solutions > 1:
+        solutions += _diverse_alternatives(
+            cp_model_mod, search_model, mv, config, best, solver.ObjectiveValue(), seen, time_limit,
+        )
+    if config.two_stage:
+        solutions = [
+            _tune_servings(cp_model_mod, model, mv, config, solution, tuning_seconds)
+            for solution in solutions
+        ]
+    return [
+        _plan_result(
+            patient_id, targets, config, candidates, fixed, picked,
+            objective=objective,
+            stop_reason=reason,
+            solve_seconds=seconds,
+        )
+        for objective, picked, reason, seconds in solutions
+    ]
+
+
+def _time_limit(config: SolverConfig) -> float:
+    """Solve time limit, scaled with problem complexity."""
     base_time = config.time_limit_seconds
     total_dishes = sum(config.get_max_recipes(m) for m in MEALS)
     if total_dishes > 3:
         base_time = max(base_time, total_dishes * config.num_days * 2)
-    solver.parameters.max_time_in_seconds = min(base_time, 120)
-    solver.parameters.num_search_workers = 8
+    return min(base_time, config.max_time_seconds)
+
+
+def _run_search(
+    cp_model_mod: Any,
+    model: Any,
+    config: SolverConfig,
+    time_limit: float,
+    on_solution: SolutionCallback | None = None,
+    record: Callable[[Any], None] | None = None,
+) -> tuple[Any, Any, str]:
+    """Solve ``model`` under the stop policy; return (solver, status, stop reason)."""
+    import random
+
+    solver = cp_model_mod.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    solver.parameters.num_search_workers = max(1, config.num_search_workers)
     solver.parameters.random_seed = random.randint(0, 2**31 - 1)
 
-    status = solver.Solve(model)
+    with _StopPolicy(solver, config) as policy:
+        callback = _make_solution_callback(cp_model_mod, policy, on_solution, time_limit, record)
+        status = solver.Solve(model, callback)
+    if status == cp_model_mod.OPTIMAL:
+        stop_reason = "optimal"
+    else:
+        stop_reason = policy.reason or "time_limit"
+    if status in (cp_model_mod.OPTIMAL, cp_model_mod.FEASIBLE):
+        print(
+            f"[solver] stopped reason={stop_reason} seconds={solver.WallTime():.2f} "
+            f"objective={solver.ObjectiveValue():.0f} solutions={policy.solutions}"
+        )
+    return solver, status, stop_reason
+
+
+# Share of the time limit a two-stage solve keeps for tuning servings.
+SERVINGS_STAGE_FRACTION = 0.1
+
+
+def _tune_servings(
+    cp_model_mod: Any,
+    model: Any,
+    mv: _ModelVars,
+    config: SolverConfig,
+    solution: tuple[float, dict[tuple[int, str, str], int], str, float],
+    time_limit: float,
+) -> tuple[float, dict[tuple[int, str, str], int], str, float]:
+    """Stage two of a two-stage solve: best servings for a fixed dish pick.
+
+    With every pick variable fixed, presolve leaves only the servings of
+    the picked dishes.  The stage-one servings are always feasible, so a
+    failed search keeps them.
+    """
+    objective, picked, reason, seconds = solution
+    tuning = model.clone()
+    tuning.clear_hints()
+    for key, x_var in mv.x.items():
+        tuning.Add(x_var == (1 if key in picked else 0))
+        tuning.AddHint(mv.servings[key], picked.get(key, 0))
+    solver, status, _ = _run_search(cp_model_mod, tuning, config, time_limit)
     if status not in (cp_model_mod.OPTIMAL, cp_model_mod.FEASIBLE):
-        raise RuntimeError("No feasible meal plan found.")
+        return solution
+    return solver.ObjectiveValue(), _picked_servings(solver.Value, mv), reason, seconds + solver.WallTime()
+
+
+def _picked_servings(value: Callable[[Any], int], mv: _ModelVars) -> dict[tuple[int, str, str], int]:
+    """Servings of every picked open-slot recipe in a solution."""
+    return {key: int(value(mv.servings[key])) for key, x_var in mv.x.items() if value(x_var)}
+
+
+def _plan_distance(a: dict[tuple[int, str, str], int], b: dict[tuple[int, str, str], int]) -> int:
+    """Number of dish picks that differ between two solutions."""
+    return max(len(a.keys() - b.keys()), len(b.keys() - a.keys()))
 
+
+# Solutions from the main search may serve as alternatives when their
+# objective is within this fraction of the best plan's.
+POOL_OBJECTIVE_SLACK = 0.1
+
+
+def _diverse_alternatives(
+    cp_model_mod: Any,
+    model: Any,
+    mv: _ModelVars,
+    config: SolverConfig,
+    best: dict[tuple[int, str, str], int],
+    best_objective: float,
+    seen: list[tuple[float, dict[tuple[int, str, str], int]]],
+    time_limit: float,
+) -> list[tuple[float, dict[tuple[int, str, str], int], str, float]]:
+    """Up to ``max_solutions - 1`` plans differing from the best and each other.
+
+    Solutions found during the main search are tried first (best objective
+    first, within ``POOL_OBJECTIVE_SLACK`` of the best).  If too few are different enough, the model is re-solved with a
+    no-good cut against every plan so far, warm-started from the best plan,
+    using half the original time limit.
+    """
+    needed = config.max_solutions - 1
+    min_difference = max(1, config.min_solution_difference)
+    if not best or len(best) < min_difference:
+        return []
+
+    kept = [best]
+    alternatives: list[tuple[float, dict[tuple[int, str, str], int], str, float]] = []
+    worst_accepted = best_objective + POOL_OBJECTIVE_SLACK * max(1.0, abs(best_objective))
+    for objective, picked in sorted(seen, key=lambda item: item[0]):
+        if len(alternatives) >= needed or objective > worst_accepted:
+            break
+        if all(_plan_distance(picked, other) >= min_difference for other in kept):
+            kept.append(picked)
+            alternatives.append((objective, picked, "solution_pool", 0.0))
+
+    cut = 0
+    while len(alternatives) < needed:
+        for picked in kept[cut:]:
+            model.Add(mv.linear.Sum([mv.x[key] for key in picked]) <= len(picked) - min_difference)
+        cut = len(kept)
+        model.clear_hints()
+        for key, x_var in mv.x.items():
+            model.AddHint(x_var, 1 if key in best else 0)
+            model.AddHint(mv.servings[key], best.get(key, 0))
+        solver, status, stop_reason = _run_search(cp_model_mod, model, config, max(1.0, time_limit / 2))
+        if status not in (cp_model_mod.OPTIMAL, cp_model_mod.FEASIBLE):
+            break
+        picked = _picked_servings(solver.Value, mv)
+        kept.append(picked)
+        alternatives.append((solver.ObjectiveValue(), picked, stop_reason, solver.WallTime()))
+    return alternatives
+
+
+def _plan_result(
+    patient_id: str,
+    targets: dict[str, float],
+    config: SolverConfig,
+    candidates: dict[str, list[SolverRecipe]],
+    fixed: dict[tuple[int, str], list[FixedMealAssignment]],
+    picked: dict[tuple[int, str, str], int],
+    *,
+    objective: float,
+    stop_reason: str,
+    solve_seconds: float,
+) -> PlanResult:
     NUT_KEYS = ("calories", "protein", "carbs", "fat", "sodium", "sugar", "fiber")
+    recipes_by_id = {r.recipe_id: r for meal in MEALS for r in candidates[meal]}
     picks: dict[int, dict[str, list[PlannedRecipe]]] = {
         day: {meal: [] for meal in MEALS} for day in range(config.num_days)
     }
@@ -406,11 +796,15 @@ def solve_meal_plan(
         day_sat: dict[str, float] = {}
         for meal in MEALS:
             meal_sat = 0.0
-            for recipe in candidates[meal]:
-                key = (day, meal, recipe.recipe_id)
-                if int(solver.Value(x[key])) == 0:
-                    continue
-                sv = float(int(solver.Value(servings[key])))
+            if (day, meal) in fixed:
+                chosen = [(recipes_by_id[a.recipe_id], float(int(round(a.servings)))) for a in fixed[(day, meal)]]
+            else:
+                chosen = [
+                    (recipe, float(picked[(day, meal, recipe.recipe_id)]))
+                    for recipe in candidates[meal]
+                    if (day, meal, recipe.recipe_id) in picked
+                ]
+            for recipe, sv in chosen:
                 nut = {
                     "calories": round(recipe.calories * sv, 1),
                     "protein": round(recipe.protein * sv, 1),
@@ -439,12 +833,12 @@ def solve_meal_plan(
 
     totals_out = {k: round(v, 1) for k, v in totals_out.items()}
 
-    return [PlanResult(
+    return PlanResult(
         patient_id=patient_id,
         num_days=config.num_days,
-        objective_value=solver.ObjectiveValue(),
+        objective_value=objective,
         calorie_buffer_pct=config.calorie_buffer_pct,
-        recommended={k: float(targets[k]) for k in required},
+        recommended={k: float(targets[k]) for k in ("calories", "protein", "carbs", "fat")},
         meal_calorie_ratio=dict(config.meal_calorie_ratio),
         meal_satiety_ratio=dict(config.meal_satiety_ratio),
         daily_totals=daily_totals,
@@ -452,7 +846,9 @@ def solve_meal_plan(
         daily_satiety_total=daily_satiety_total,
         totals=totals_out,
         picks=picks,
-    )]
+        stop_reason=stop_reason,
+        solve_seconds=round(solve_seconds, 2),
+    )
 
 
 def plan_result_to_entries(
@@ -476,41 +872,108 @@ def plan_result_to_entries(
     return tuple(entries)
 
 
-def _compute_recency_penalties(
+def _recent_week_dishes(
     conn: Any,
     patient_id: str,
     current_week_start: str | None,
     lookback_weeks: int = 3,
-) -> dict[str, int]:
-    """Query dishes used in recent weeks and return recency penalties.
-
-    More recent usage → higher penalty.  Week-1 = 150k, Week-2 = 100k, Week-3 = 50k.
-    """
+) -> tuple[frozenset[str], ...]:
+    """Dish ids planned in each of the previous weeks, last week first."""
     if not current_week_start:
-        return {}
+        return ()
     from datetime import date, timedelta
 
     try:
         ws_date = date.fromisoformat(current_week_start)
     except (ValueError, TypeError):
-        return {}
+        return ()
 
-    penalties: dict[str, int] = {}
+    weeks: list[frozenset[str]] = []
     for weeks_ago in range(1, lookback_weeks + 1):
         past_ws = (ws_date - timedelta(weeks=weeks_ago)).isoformat()
         rows = conn.execute(
             "SELECT DISTINCT dish_id FROM meal_plans WHERE user_id = ? AND week_start = ?",
             (patient_id, past_ws),
         ).fetchall()
+        weeks.append(frozenset(str(row["dish_id"]).removeprefix("r") for row in rows))
+    return tuple(weeks)
+
+
+def _recency_penalties_from_history(recent_weeks: Iterable[Iterable[str]]) -> dict[str, int]:
+    """Recency penalties from per-week dish ids, last week first.
+
+    More recent usage → higher penalty.  Week-1 = 150k, Week-2 = 100k, Week-3 = 50k.
+    """
+    penalties: dict[str, int] = {}
+    for weeks_ago, dish_ids in enumerate(recent_weeks, start=1):
         # Closer weeks get a heavier penalty
         weight = int(150000 / weeks_ago)
-        for row in rows:
-            rid = str(row["dish_id"]).removeprefix("r")
+        for rid in dish_ids:
             penalties[rid] = penalties.get(rid, 0) + weight
     return penalties
 
 
-def generate_meal_plan_for_week(
+def _compute_recency_penalties(
+    conn: Any,
+    patient_id: str,
+    current_week_start: str | None,
+    lookback_weeks: int = 3,
+) -> dict[str, int]:
+    """Query dishes used in recent weeks and return recency penalties."""
+    return _recency_penalties_from_history(
+        _recent_week_dishes(conn, patient_id, current_week_start, lookback_weeks)
+    )
+
+
+def _load_plan_hint(
+    conn: Any,
+    patient_id: str,
+    week_start: str | None,
+    num_days: int,
+    first_day: int = 0,
+) -> tuple[FixedMealAssignment, ...]:
+    """Build a warm-start hint from the stored plan.
+
+    Each slot takes this week's dishes if it has any, otherwise last week's.
+    Solver day ``d`` maps to week day ``first_day + d``.
+    """
+    if not week_start:
+        return ()
+    from datetime import date, timedelta
+
+    try:
+        previous_week = (date.fromisoformat(week_start) - timedelta(weeks=1)).isoformat()
+    except (ValueError, TypeError):
+        return ()
+
+    rows = conn.execute(
+        """
+        SELECT week_start, day_index, meal_type, recipe_id, servings
+        FROM meal_plans
+        WHERE user_id = ? AND week_start IN (?, ?)
+          AND day_index >= ? AND day_index < ? AND recipe_id IS NOT NULL
+        ORDER BY day_index, meal_type, entry_order
+        """,
+        (patient_id, week_start, previous_week, first_day, first_day + num_days),
+    ).fetchall()
+
+    slots: dict[tuple[int, str], dict[str, list[FixedMealAssignment]]] = {}
+    for row in rows:
+        day_index = int(row["day_index"]) - first_day
+        slot = slots.setdefault((day_index, row["meal_type"]), {})
+        slot.setdefault(str(row["week_start"]), []).append(FixedMealAssignment(
+            day_index=day_index,
+            meal_type=row["meal_type"],
+            recipe_id=str(row["recipe_id"]),
+            servings=parse_float(row["servings"], 1.0),
+        ))
+    hint: list[FixedMealAssignment] = []
+    for by_week in slots.values():
+        hint.extend(by_week.get(week_start) or by_week.get(previous_week) or ())
+    return tuple(hint)
+
+
+def prepare_meal_plan_generation(
     conn: Any,
     *,
     patient_id: str,
@@ -519,13 +982,24 @@ def generate_meal_plan_for_week(
     fixed_assignments: list[FixedMealAssignment] | tuple[FixedMealAssignment, ...] | None = None,
     exclude_recipe_ids: set[str] | None = None,
     targets_override: dict[str, float] | None = None,
-) -> MealGenerationResult:
+    hint_first_day: int = 0,
+    closed_slots: set[tuple[int, str]] | None = None,
+    engine: str = "cp_sat",
+) -> PreparedMealGeneration:
+    """Load everything a solve needs from the database.
+
+    The warm-start hint comes from the stored plan for ``week_start`` (or the
+    week before); ``hint_first_day`` is the week day solver day 0 stands for.
+    ``closed_slots`` are left empty and get no solver variables.
+    ``engine`` picks the planner (see ``solve_prepared_generation``).
+    """
     inputs = load_solver_inputs_from_db(conn, patient_id)
     solver_targets = dict(targets_override or inputs.targets)
-    hard_limit_keys = set((targets_override or {}).keys())
+    hard_limit_keys = frozenset((targets_override or {}).keys())
 
     # Compute cross-week recency penalties
-    recency_penalties = _compute_recency_penalties(conn, patient_id, week_start)
+    recent_weeks = _recent_week_dishes(conn, patient_id, week_start)
+    recency_penalties = _recency_penalties_from_history(recent_weeks)
 
     # Merge preference weights from the profile-derived config with any
     # caller-supplied config overrides.  Caller config takes precedence for
@@ -552,26 +1026,118 @@ def generate_meal_plan_for_week(
         fixed_ids = {a.recipe_id for a in (fixed_assignments or [])}
         recipes = [r for r in recipes if r.recipe_id not in exclude_recipe_ids or r.recipe_id in fixed_ids]
 
-    plans = tuple(solve_meal_plan(
+    return PreparedMealGeneration(
         patient_id=inputs.patient_id,
+        week_start=week_start,
+        inputs=inputs,
         targets=solver_targets,
-        recipes=recipes,
-        config=effective_config,
-        fixed_assignments=fixed_assignments,
         hard_limit_keys=hard_limit_keys,
-    ))
+        config=effective_config,
+        recipes=tuple(recipes),
+        fixed_assignments=tuple(fixed_assignments) if fixed_assignments is not None else None,
+        closed_slots=frozenset(closed_slots or ()),
+        hint=_load_plan_hint(
+            conn,
+            patient_id,
+            week_start,
+            effective_config.num_days if effective_config else SolverConfig().num_days,
+            hint_first_day,
+        ),
+        engine=engine,
+        recent_weeks=recent_weeks,
+    )
+
+
+def solve_prepared_generation(
+    prepared: PreparedMealGeneration,
+    *,
+    on_solution: SolutionCallback | None = None,
+) -> MealGenerationResult:
+    """Run the solver on prepared inputs in the solver process pool.
+
+    With ``engine="greedy"`` the greedy planner runs inline instead; it also
+    stands in when CP-SAT finds no plan.  ``SolverConfig.decomposition``
+    selects one model per day (see ``decompose``).  Plans longer than a week are
+    solved week by week (see ``horizon``).  Does not touch the database.
+    """
+    from .horizon import WEEK_DAYS, solve_rolling_horizon
+
+    if prepared.config is not None and prepared.config.num_days > WEEK_DAYS:
+        return solve_rolling_horizon(prepared, on_solution=on_solution)
+    return _solve_prepared_window(prepared, on_solution=on_solution)
+
+
+def _solve_prepared_window(
+    prepared: PreparedMealGeneration,
+    *,
+    on_solution: SolutionCallback | None = None,
+) -> MealGenerationResult:
+    """One solve over all of ``prepared.config.num_days``."""
+    from .decompose import solve_decomposed
+    from .greedy import greedy_meal_plan
+
+    kwargs = dict(
+        patient_id=prepared.patient_id,
+        targets=prepared.targets,
+        recipes=list(prepared.recipes),
+        config=prepared.config,
+        fixed_assignments=list(prepared.fixed_assignments) if prepared.fixed_assignments is not None else None,
+        hard_limit_keys=set(prepared.hard_limit_keys),
+        on_solution=on_solution,
+        hint=list(prepared.hint) or None,
+        closed_slots=set(prepared.closed_slots),
+    )
+    if prepared.engine == "greedy":
+        plans = tuple(greedy_meal_plan(**kwargs))
+    else:
+        try:
+            if prepared.config is not None and prepared.config.decomposition == "per_day":
+                plans = tuple(solve_decomposed(**kwargs))
+            else:
+                plans = tuple(solve_in_pool(**kwargs))
+        except InfeasiblePlanError:
+            # Hard caps the greedy planner cannot meet either.
+            raise
+        except RuntimeError as exc:
+            print(f"[solver] fallback engine=greedy patient_id={prepared.patient_id} reason={exc}")
+            try:
+                plans = tuple(greedy_meal_plan(**kwargs))
+            except RuntimeError:
+                raise exc from None
     selected_plan = plans[0]
-    entries = plan_result_to_entries(selected_plan, week_start=week_start)
+    entries = plan_result_to_entries(selected_plan, week_start=prepared.week_start)
     return MealGenerationResult(
-        patient_id=inputs.patient_id,
-        week_start=week_start,
-        inputs=inputs,
+        patient_id=prepared.patient_id,
+        week_start=prepared.week_start,
+        inputs=prepared.inputs,
         plans=plans,
         selected_plan=selected_plan,
         entries=entries,
     )
 
 
+def generate_meal_plan_for_week(
+    conn: Any,
+    *,
+    patient_id: str,
+    week_start: str | None = None,
+    config: SolverConfig | None = None,
+    fixed_assignments: list[FixedMealAssignment] | tuple[FixedMealAssignment, ...] | None = None,
+    exclude_recipe_ids: set[str] | None = None,
+    targets_override: dict[str, float] | None = None,
+) -> MealGenerationResult:
+    prepared = prepare_meal_plan_generation(
+        conn,
+        patient_id=patient_id,
+        week_start=week_start,
+        config=config,
+        fixed_assignments=fixed_assignments,
+        exclude_recipe_ids=exclude_recipe_ids,
+        targets_override=targets_override,
+    )
+    return solve_prepared_generation(prepared)
+
+
 def summarize_plan(result: PlanResult) -> str:
     lines = [f"patient_id={result.patient_id}", f"days={result.num_days}"]
     for day in range(result.num_days):
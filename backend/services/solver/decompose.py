@@ -0,0 +1,195 @@
+"""Per-day decomposition of a multi-day solve.
+
+Days in the CP-SAT model are coupled only through the variety terms
+(same-day and two-day repeats); nutrient targets, caps and composition are
+all per day.  With ``SolverConfig.decomposition = "per_day"`` each day is
+solved as its own one-day model, in parallel through the solver process
+pool, and the stitched plan is then repaired with the greedy planner's
+repair pass (``greedy.repair_picks``), which swaps out cross-day repeats
+when that lowers the plan objective.
+
+Days cannot see each other's picks while they solve, so usage is shared up
+front as recency-style penalties with the model's two-day repeat weight:
+
+- dishes fixed on a neighbouring day are penalised;
+- the pool is split into two halves and each day leans towards the half
+  matching its parity, so neighbouring days mostly draw different dishes.
+"""
+from __future__ import annotations
+
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Any
+
+from ...utils import parse_float
+from .models import MEALS, FixedMealAssignment, PlanResult, SolverConfig, SolverRecipe
+
+# Two-day repeat weight in ``core._build_objective``.
+SHARED_USAGE_WEIGHT = 10000
+REPAIR_SECONDS = 0.5
+
+
+def _parallel_days() -> int:
+    """Days one decomposed solve may run at once.
+
+    A solve holds one admission slot, which stands for
+    ``SOLVER_PROCESSES // SOLVER_MAX_CONCURRENT`` worker processes; taking
+    more would let admitted solves crowd each other out of the pool.
+    """
+    from ..solver_admission import SOLVER_MAX_CONCURRENT
+    from .process_pool import SOLVER_PROCESSES
+
+    return max(1, SOLVER_PROCESSES // max(1, SOLVER_MAX_CONCURRENT))
+
+
+def _day_slice(
+    assignments: list[FixedMealAssignment] | None,
+    day: int,
+) -> list[FixedMealAssignment] | None:
+    if assignments is None:
+        return None
+    return [replace(a, day_index=0) for a in assignments if int(a.day_index) == day]
+
+
+def _shared_usage_penalties(
+    day: int,
+    num_days: int,
+    recipes: list[SolverRecipe],
+    fixed_assignments: list[FixedMealAssignment] | None,
+    base: dict[str, int],
+) -> dict[str, int]:
+    penalties = dict(base)
+    if num_days < 3:
+        return penalties
+    for a in fixed_assignments or ():
+        if abs(int(a.day_index) - day) == 1:
+            rid = str(a.recipe_id).removeprefix("r")
+            penalties[rid] = penalties.get(rid, 0) + SHARED_USAGE_WEIGHT
+    for index, recipe in enumerate(sorted(recipes, key=lambda r: r.recipe_id)):
+        if index % 2 != day % 2:
+            penalties[recipe.recipe_id] = penalties.get(recipe.recipe_id, 0) + SHARED_USAGE_WEIGHT
+    return penalties
+
+
+def solve_decomposed(
+    *,
+    patient_id: str,
+    targets: dict[str, float],
+    recipes: list[SolverRecipe],
+    config: SolverConfig | None = None,
+    fixed_assignments: list[FixedMealAssignment] | None = None,
+    hard_limit_keys: set[str] | None = None,
+    on_solution: Any = None,
+    hint: list[FixedMealAssignment] | None = None,
+    closed_slots: set[tuple[int, str]] | None = None,
+) -> list[PlanResult]:
+    """``solve_meal_plan`` with one model per day; returns a single plan.
+
+    Days are solved ``_parallel_days()`` at a time and share the
+    monolithic model's scaled time limit between them.
+    """
+    from .core import (
+        _normalize_fixed_assignments,
+        _plan_result,
+        _split_pools,
+        _time_limit,
+        build_candidate_pools,
+    )
+    from .greedy import repair_picks
+    from .relaxation import relaxation_precheck
+    from .process_pool import solve_in_pool
+
+    started = time.perf_counter()
+    config = config or SolverConfig()
+    missing = [k for k in ("calories", "protein", "carbs", "fat") if parse_float(targets.get(k), 0.0) <= 0]
+    if missing:
+        raise ValueError(f"Missing or invalid solver targets: {missing}")
+
+    num_days = config.num_days
+    parallel = _parallel_days()
+    day_seconds = max(1, int(_time_limit(config) / math.ceil(num_days / parallel)))
+    day_config = replace(
+        config,
+        num_days=1,
+        decomposition="monolithic",
+        max_solutions=1,
+        time_limit_seconds=day_seconds,
+        max_time_seconds=day_seconds,
+    )
+
+    # One shared pool, sized for a one-day model, keeps all days on the same
+    # recipes so the repair pass can move dishes between them.
+    keep_ids = {str(a.recipe_id).removeprefix("r") for a in (*(fixed_assignments or ()), *(hint or ()))}
+    pools = build_candidate_pools(list(recipes), config=day_config, targets=targets, keep_ids=keep_ids)
+    shared = list({r.recipe_id: r for meal in MEALS for r in pools[meal]}.values())
+
+    breakfast, lunch_dinner = _split_pools(shared)
+    candidates = {"breakfast": breakfast, "lunch": lunch_dinner, "dinner": lunch_dinner}
+    fixed = _normalize_fixed_assignments(fixed_assignments, candidates, num_days)
+    closed = (
+        set(closed_slots or ())
+        | {(int(a.day_index), str(a.meal_type)) for a in (fixed_assignments or ())}
+    ) - set(fixed)
+    # Report impossible caps with their real day indexes before splitting.
+    relaxation_precheck(candidates, fixed, closed, targets, config, hard_limit_keys=hard_limit_keys or ())
+    done: list[float] = []
+
+    def solve_day(day: int) -> PlanResult:
+        plan = solve_in_pool(
+            patient_id=patient_id,
+            targets=targets,
+            recipes=shared,
+            config=replace(
+                day_config,
+                recency_penalties=_shared_usage_penalties(
+                    day, num_days, shared, fixed_assignments, config.recency_penalties,
+                ),
+            ),
+            fixed_assignments=_day_slice(fixed_assignments, day),
+            hard_limit_keys=hard_limit_keys,
+            hint=_day_slice(hint, day) or None,
+            closed_slots={(0, meal) for d, meal in closed if d == day},
+        )[0]
+        done.append(plan.objective_value)
+        if on_solution is not None:
+            on_solution(sum(done), len(done) / num_days)
+        return plan
+
+    with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="solver-day") as executor:
+        day_plans = list(executor.map(solve_day, range(num_days)))
+    solved_at = time.perf_counter()
+
+    # Without breakfast recipes each day falls back to its own sample of
+    # lunch/dinner dishes; keep whatever the days picked.
+    breakfast_ids = {r.recipe_id for r in breakfast}
+    by_id = {r.recipe_id: r for r in shared}
+    breakfast += list({
+        pick.recipe_id: by_id[pick.recipe_id]
+        for plan in day_plans
+        for pick in plan.picks[0]["breakfast"]
+        if pick.recipe_id not in breakfast_ids
+    }.values())
+    picked = {
+        (day, meal, pick.recipe_id): int(pick.servings)
+        for day, plan in enumerate(day_plans)
+        for meal in MEALS
+        if (day, meal) not in fixed and (day, meal) not in closed
+        for pick in plan.picks[0][meal]
+    }
+    picked, objective = repair_picks(
+        candidates, fixed, closed, targets, config, picked,
+        hard_limit_keys=hard_limit_keys or (),
+        time_budget=REPAIR_SECONDS,
+    )
+    print(
+        f"[solver] per_day days={num_days} parallel={parallel} day_seconds={day_seconds} "
+        f"solve={solved_at - started:.2f}s repair={time.perf_counter() - solved_at:.2f}s objective={objective:.0f}"
+    )
+    return [_plan_result(
+        patient_id, targets, config, candidates, fixed, picked,
+        objective=objective,
+        stop_reason="per_day",
+        solve_seconds=time.perf_counter() - started,
+    )]
@@ -0,0 +1,125 @@
+"""Explain why the CP-SAT model has no solution.
+
+When the search fails, the hard constraints are rebuilt in a small model
+where each one is switched on by its own assumption literal:
+
+- each open slot's dish count (``slot_count``);
+- each fixed dish staying in its slot with its servings (``fixed_dish``);
+- each ``hard_limit_keys`` cap on each day (``daily_cap``).
+
+Fixed slots hold only their fixed dishes, as in the real model.  One
+single-threaded solve under all assumptions either finds a plan (the real
+search just ran out of time) or proves infeasibility, and CP-SAT then
+reports a small set of assumptions that together cannot hold.  Objective
+terms are left out, so this solve is short.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Iterable
+
+from .models import (
+    MAX_SERVINGS_PER_RECIPE,
+    MEALS,
+    MIN_SERVINGS_PER_SELECTED,
+    FixedMealAssignment,
+    PlanConflict,
+    SolverConfig,
+    SolverRecipe,
+    from_int,
+    to_int,
+)
+
+DIAGNOSIS_SECONDS = 5.0
+
+Slot = tuple[int, str]
+
+
+def diagnose_infeasibility(
+    candidates: dict[str, list[SolverRecipe]],
+    fixed: dict[Slot, list[FixedMealAssignment]],
+    closed: set[Slot] | frozenset[Slot],
+    targets: dict[str, float],
+    config: SolverConfig,
+    *,
+    hard_limit_keys: Iterable[str] = (),
+    time_limit: float = DIAGNOSIS_SECONDS,
+) -> list[PlanConflict] | None:
+    """Hard constraints that cannot all hold, or None when the model is
+    feasible or infeasibility is not proven within ``time_limit``."""
+    from .core import NUTRIENT_FIELDS, _import_cp_model
+
+    cp_model_mod = _import_cp_model()
+    started = time.perf_counter()
+    model = cp_model_mod.CpModel()
+    recipes_by_id = {r.recipe_id: r for meal in MEALS for r in candidates[meal]}
+    caps = {n: to_int(targets.get(n, 0)) for n in hard_limit_keys if n in NUTRIENT_FIELDS}
+    caps = {n: limit for n, limit in caps.items() if limit > 0}
+
+    literals: list[Any] = []
+    assumptions: dict[int, PlanConflict] = {}
+
+    def assumption(conflict: PlanConflict) -> Any:
+        literal = model.NewBoolVar(f"assume_{conflict.code}_{len(literals)}")
+        literals.append(literal)
+        assumptions[literal.Index()] = conflict
+        return literal
+
+    servings_by_day: dict[int, list[tuple[SolverRecipe, Any]]] = {day: [] for day in range(config.num_days)}
+    for day in range(config.num_days):
+        for meal in MEALS:
+            if (day, meal) in closed:
+                continue
+            slot_fixed = fixed.get((day, meal), [])
+            pool = [recipes_by_id[a.recipe_id] for a in slot_fixed] or candidates[meal]
+            if not pool:
+                continue
+            xs = []
+            for recipe in pool:
+                x_var = model.NewBoolVar("")
+                s_var = model.NewIntVar(0, MAX_SERVINGS_PER_RECIPE, "")
+                model.Add(s_var <= MAX_SERVINGS_PER_RECIPE * x_var)
+                model.Add(s_var >= MIN_SERVINGS_PER_SELECTED * x_var)
+                xs.append(x_var)
+                servings_by_day[day].append((recipe, s_var))
+                for a in slot_fixed:
+                    if a.recipe_id == recipe.recipe_id:
+                        literal = assumption(PlanConflict(
+                            code="fixed_dish",
+                            day_index=day,
+                            meal_type=meal,
+                            recipe_ids=(a.recipe_id,),
+                            actual=float(a.servings),
+                        ))
+                        model.Add(x_var == 1).OnlyEnforceIf(literal)
+                        model.Add(s_var == int(round(a.servings))).OnlyEnforceIf(literal)
+            if slot_fixed:
+                continue
+            meal_max = config.get_max_recipes(meal)
+            meal_min = meal_max if meal_max <= len(pool) else min(1, len(pool))
+            literal = assumption(PlanConflict(
+                code="slot_count", day_index=day, meal_type=meal, limit=float(meal_min),
+            ))
+            model.AddLinearConstraint(sum(xs), meal_min, meal_max).OnlyEnforceIf(literal)
+
+        for nutrient, limit in caps.items():
+            terms = [(to_int(getattr(recipe, nutrient)), s_var) for recipe, s_var in servings_by_day[day]]
+            literal = assumption(PlanConflict(
+                code="daily_cap", day_index=day, nutrients=(nutrient,), limit=from_int(limit),
+            ))
+            model.Add(sum(c * s_var for c, s_var in terms) <= limit).OnlyEnforceIf(literal)
+
+    model.AddAssumptions(literals)
+    solver = cp_model_mod.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    # Assumption cores are only reported by the single-threaded search.
+    solver.parameters.num_search_workers = 1
+    status = solver.Solve(model)
+    conflicts = None
+    if status == cp_model_mod.INFEASIBLE:
+        conflicts = [assumptions[index] for index in solver.SufficientAssumptionsForInfeasibility()]
+    print(
+        f"[solver] diagnosis status={solver.StatusName(status)} assumptions={len(assumptions)} "
+        f"conflicts={len(conflicts or ())} seconds={time.perf_counter() - started:.2f}"
+    )
+    return conflicts
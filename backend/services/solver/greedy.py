@@ -0,0 +1,387 @@
+"""Greedy + large-neighbourhood-search planner.
+
+A second engine beside the CP-SAT model in ``core``: it takes the same
+inputs, builds the same candidate pools and returns the same ``PlanResult``,
+but needs no OR-Tools and finishes within ``GREEDY_TIME_BUDGET_SECONDS``.
+It plans free-tier single days, stands in when CP-SAT finds no plan, and
+seeds CP-SAT with a warm-start hint when there is no stored plan.
+
+1. Construction fills open slots day by day with a pick from the best few
+   options of ``swap.rank_slot``.  Empty slots of the day count as their
+   meal's share of the daily targets, so early picks leave room for later
+   ones.
+2. LNS clears the open slots of a random day (plus one random slot
+   elsewhere), rebuilds them the same way, and keeps the result when the
+   plan objective improves, until the time budget runs out.
+3. A final pass swaps single dishes where that lowers the objective.
+
+The objective has the CP-SAT model's terms and weights, except that
+preference, condition and recency weights count for every pick rather than
+only on day 0.
+"""
+from __future__ import annotations
+
+import random
+import time
+from collections import Counter
+from typing import Any, Iterable
+
+import numpy as np
+
+from ...utils import parse_float
+from .models import (
+    MEALS,
+    FixedMealAssignment,
+    PlanResult,
+    SolverConfig,
+    SolverRecipe,
+    to_int,
+)
+from .swap import _NUTRIENTS, _recipe_weight, _slot_costs, rank_slot
+
+GREEDY_TIME_BUDGET_SECONDS = 0.15
+# Construction-only budget when the plan just seeds a CP-SAT hint.
+GREEDY_HINT_SECONDS = 0.05
+# Each construction step picks at random among this many best options.
+GREEDY_CHOICES = 3
+
+Slot = tuple[int, str]
+Picks = dict[Slot, list[tuple[SolverRecipe, int]]]
+
+
+class _Planner:
+    def __init__(
+        self,
+        candidates: dict[str, list[SolverRecipe]],
+        fixed: dict[Slot, list[FixedMealAssignment]],
+        closed: set[Slot] | frozenset[Slot],
+        targets: dict[str, float],
+        config: SolverConfig,
+        hard_limit_keys: Iterable[str],
+    ) -> None:
+        self.candidates = candidates
+        self.targets = targets
+        self.config = config
+        self.recipes_by_id = {r.recipe_id: r for meal in MEALS for r in candidates[meal]}
+        self.open_slots = [
+            (day, meal)
+            for day in range(config.num_days)
+            for meal in MEALS
+            if (day, meal) not in fixed and (day, meal) not in closed and candidates[meal]
+        ]
+        self.fixed_plan = [
+            FixedMealAssignment(day_index=day, meal_type=meal, recipe_id=a.recipe_id, servings=a.servings)
+            for (day, meal), assignments in fixed.items()
+            for a in assignments
+        ]
+        self.fixed_totals = np.zeros((config.num_days, len(_NUTRIENTS)))
+        for a in self.fixed_plan:
+            self.fixed_totals[a.day_index] += self._vector(self.recipes_by_id[a.recipe_id]) * int(round(a.servings))
+        self.caps = {
+            _NUTRIENTS.index(n): float(targets[n])
+            for n in hard_limit_keys
+            if n in _NUTRIENTS and parse_float(targets.get(n), 0.0) > 0
+        }
+
+    @staticmethod
+    def _vector(recipe: SolverRecipe) -> np.ndarray:
+        return np.array([getattr(recipe, n) for n in _NUTRIENTS], dtype=float)
+
+    def _dish_count(self, meal: str) -> int:
+        return min(self.config.get_max_recipes(meal), len(self.candidates[meal]))
+
+    def _share(self, meal: str) -> np.ndarray:
+        """Expected nutrients of one dish in an unfilled ``meal`` slot."""
+        share = np.zeros(len(_NUTRIENTS))
+        ratio = self.config.meal_calorie_ratio.get(meal, 0) / self._dish_count(meal)
+        for n in ("calories", "protein", "carbs"):
+            share[_NUTRIENTS.index(n)] = parse_float(self.targets.get(n), 0.0) * ratio
+        return share
+
+    def _week_plan(self, picks: Picks) -> list[FixedMealAssignment]:
+        return self.fixed_plan + [
+            FixedMealAssignment(day_index=day, meal_type=meal, recipe_id=r.recipe_id, servings=s)
+            for (day, meal), chosen in picks.items()
+            for r, s in chosen
+        ]
+
+    def _day_totals(self, picks: Picks, day: int) -> np.ndarray:
+        totals = self.fixed_totals[day].copy()
+        for meal in MEALS:
+            for recipe, servings in picks.get((day, meal), ()):
+                totals += self._vector(recipe) * servings
+        return totals
+
+    def fill(self, picks: Picks, slots: list[Slot], choices: int = GREEDY_CHOICES) -> bool:
+        """Fill ``slots`` in place; False when a hard cap leaves no option."""
+        pending = Counter()
+        for day, meal in slots:
+            pending[(day, meal)] = self._dish_count(meal) - len(picks.get((day, meal), ()))
+        for day, meal in slots:
+            chosen = picks.setdefault((day, meal), [])
+            while pending[(day, meal)] > 0:
+                pending[(day, meal)] -= 1
+                actual = self._day_totals(picks, day)
+                expected = actual.copy()
+                for (d, m), left in pending.items():
+                    if d == day and left > 0:
+                        expected += self._share(m) * left
+                options = rank_slot(
+                    pool=self.candidates[meal],
+                    recipes_by_id=self.recipes_by_id,
+                    targets=self.targets,
+                    config=self.config,
+                    day_index=day,
+                    meal_type=meal,
+                    week_plan=self._week_plan(picks),
+                    base_totals=dict(zip(_NUTRIENTS, expected)),
+                    limit=max(choices, 10),
+                )
+                options = [
+                    o for o in options
+                    if all(actual[i] + o.nutrients[_NUTRIENTS[i]] <= cap for i, cap in self.caps.items())
+                ][:choices]
+                if not options:
+                    return False
+                option = random.choice(options)
+                chosen.append((self.recipes_by_id[option.recipe_id], option.servings))
+        return True
+
+    def cost(self, picks: Picks) -> float:
+        """Plan objective in the CP-SAT model's scaled units."""
+        config = self.config
+        day_totals = np.array([self._day_totals(picks, day) for day in range(config.num_days)])
+        nutrient_cost, _ = _slot_costs(day_totals, np.zeros(len(_NUTRIENTS)), self.targets, ())
+        total = float(nutrient_cost.sum())
+
+        usage = [Counter() for _ in range(config.num_days)]
+        for a in self._week_plan(picks):
+            usage[a.day_index][a.recipe_id] += 1
+        for day_usage in usage:
+            total += 50000 * sum(max(0, c - 1) for c in day_usage.values())
+        if config.num_days >= 3:
+            for start in range(config.num_days - 1):
+                window = usage[start] + usage[start + 1]
+                total += 10000 * sum(max(0, c - 1) for c in window.values())
+
+        for (day, meal), chosen in picks.items():
+            for recipe, servings in chosen:
+                total += _recipe_weight(recipe.recipe_id, recipe.is_favourite, config)
+                total -= to_int(recipe.protein + recipe.fiber) * servings
+            if meal in ("lunch", "dinner") and config.get_max_recipes(meal) >= 2:
+                total += 5000 * max(0, sum(1 for r, _ in chosen if r.is_main_course) - 1)
+        return total
+
+    def repeat_slots(self, picks: Picks) -> list[Slot]:
+        """Open slots holding a dish that repeats within the day or, for
+        plans of three days or more, on a neighbouring day."""
+        usage = [Counter() for _ in range(self.config.num_days)]
+        for a in self._week_plan(picks):
+            usage[a.day_index][a.recipe_id] += 1
+        reach = 1 if self.config.num_days >= 3 else 0
+        repeated = []
+        for day, meal in self.open_slots:
+            for recipe, _ in picks.get((day, meal), ()):
+                rid = recipe.recipe_id
+                around = sum(
+                    usage[d][rid] for d in range(max(0, day - reach), min(self.config.num_days, day + reach + 1))
+                )
+                if around > 1:
+                    repeated.append((day, meal))
+                    break
+        return repeated
+
+    def polish(self, picks: Picks) -> None:
+        """One pass of single-dish swaps that lower the objective."""
+        for day, meal in self.open_slots:
+            chosen = picks[(day, meal)]
+            for index, (recipe, servings) in enumerate(chosen):
+                rest = chosen[:index] + chosen[index + 1:]
+                picks[(day, meal)] = rest
+                actual = self._day_totals(picks, day)
+                options = rank_slot(
+                    pool=self.candidates[meal],
+                    recipes_by_id=self.recipes_by_id,
+                    targets=self.targets,
+                    config=self.config,
+                    day_index=day,
+                    meal_type=meal,
+                    week_plan=self._week_plan(picks),
+                    base_totals=dict(zip(_NUTRIENTS, actual)),
+                    current=FixedMealAssignment(day, meal, recipe.recipe_id, servings),
+                    current_nutrients=dict(zip(_NUTRIENTS, self._vector(recipe) * servings)),
+                    limit=5,
+                )
+                best = next((
+                    o for o in options
+                    if all(actual[i] + o.nutrients[_NUTRIENTS[i]] <= cap for i, cap in self.caps.items())
+                ), None)
+                if best is not None and best.score_delta < 0:
+                    chosen[index] = (self.recipes_by_id[best.recipe_id], best.servings)
+                picks[(day, meal)] = chosen
+
+
+def greedy_picks(
+    candidates: dict[str, list[SolverRecipe]],
+    fixed: dict[Slot, list[FixedMealAssignment]],
+    closed: set[Slot] | frozenset[Slot],
+    targets: dict[str, float],
+    config: SolverConfig,
+    *,
+    hard_limit_keys: Iterable[str] = (),
+    hint: dict[Slot, list[FixedMealAssignment]] | None = None,
+    time_budget: float = GREEDY_TIME_BUDGET_SECONDS,
+) -> tuple[dict[tuple[int, str, str], int], float] | None:
+    """Plan the open slots; return ``(picked servings, objective)`` or None.
+
+    ``picked`` has the shape of a CP-SAT solution, keyed by
+    ``(day, meal, recipe_id)``.  Hinted dishes that are still candidates
+    seed their slots.  ``time_budget`` 0 skips the LNS and polish passes.
+    """
+    deadline = time.perf_counter() + time_budget
+    planner = _Planner(candidates, fixed, closed, targets, config, hard_limit_keys)
+
+    picks: Picks = {slot: [] for slot in planner.open_slots}
+    for slot in planner.open_slots:
+        pool_ids = {r.recipe_id for r in candidates[slot[1]]}
+        for a in (hint or {}).get(slot, [])[:planner._dish_count(slot[1])]:
+            if a.recipe_id in pool_ids:
+                picks[slot].append((planner.recipes_by_id[a.recipe_id], max(1, int(round(a.servings)))))
+    built_at = time.perf_counter()
+    if not planner.fill(picks, planner.open_slots):
+        return None
+    best_cost = planner.cost(picks)
+    # The polish pass costs about as much as construction; keep that much
+    # of the budget for it.
+    lns_deadline = deadline - (time.perf_counter() - built_at)
+
+    open_days = sorted({day for day, _ in planner.open_slots})
+    while open_days and time.perf_counter() < lns_deadline:
+        day = random.choice(open_days)
+        destroyed = [slot for slot in planner.open_slots if slot[0] == day]
+        extra = random.choice(planner.open_slots)
+        if extra not in destroyed:
+            destroyed.append(extra)
+        trial = {slot: list(chosen) for slot, chosen in picks.items()}
+        for slot in destroyed:
+            trial[slot] = []
+        if not planner.fill(trial, destroyed):
+            continue
+        trial_cost = planner.cost(trial)
+        if trial_cost < best_cost:
+            picks, best_cost = trial, trial_cost
+
+    if time_budget > 0:
+        planner.polish(picks)
+        best_cost = planner.cost(picks)
+
+    return _as_picked(picks), best_cost
+
+
+def _as_picked(picks: Picks) -> dict[tuple[int, str, str], int]:
+    return {
+        (day, meal, recipe.recipe_id): servings
+        for (day, meal), chosen in picks.items()
+        for recipe, servings in chosen
+    }
+
+
+def repair_picks(
+    candidates: dict[str, list[SolverRecipe]],
+    fixed: dict[Slot, list[FixedMealAssignment]],
+    closed: set[Slot] | frozenset[Slot],
+    targets: dict[str, float],
+    config: SolverConfig,
+    picked: dict[tuple[int, str, str], int],
+    *,
+    hard_limit_keys: Iterable[str] = (),
+    time_budget: float = GREEDY_TIME_BUDGET_SECONDS,
+) -> tuple[dict[tuple[int, str, str], int], float]:
+    """Remove repeats from a plan stitched together from separate solves.
+
+    A slot holding a repeated dish is cleared and refilled; the change is
+    kept when the plan objective improves.  This runs until no repeats are
+    left, repeated attempts fail or the time budget is spent; then the
+    polish pass runs.
+    """
+    deadline = time.perf_counter() + time_budget
+    planner = _Planner(candidates, fixed, closed, targets, config, hard_limit_keys)
+    picks: Picks = {slot: [] for slot in planner.open_slots}
+    for (day, meal, rid), servings in picked.items():
+        if (day, meal) in picks:
+            picks[(day, meal)].append((planner.recipes_by_id[rid], servings))
+    best_cost = planner.cost(picks)
+
+    failures = 0
+    while time.perf_counter() < deadline:
+        repeated = planner.repeat_slots(picks)
+        # Stop when no repeats are left or none could be fixed in a while.
+        if not repeated or failures > 3 * len(repeated):
+            break
+        slot = random.choice(repeated)
+        trial = {s: list(chosen) for s, chosen in picks.items()}
+        trial[slot] = []
+        trial_cost = planner.cost(trial) if planner.fill(trial, [slot]) else best_cost
+        if trial_cost < best_cost:
+            picks, best_cost = trial, trial_cost
+            failures = 0
+        else:
+            failures += 1
+
+    planner.polish(picks)
+    return _as_picked(picks), planner.cost(picks)
+
+
+def greedy_meal_plan(
+    *,
+    patient_id: str,
+    targets: dict[str, float],
+    recipes: list[SolverRecipe],
+    config: SolverConfig | None = None,
+    fixed_assignments: list[FixedMealAssignment] | None = None,
+    hard_limit_keys: set[str] | None = None,
+    on_solution: Any = None,
+    hint: list[FixedMealAssignment] | None = None,
+    closed_slots: set[tuple[int, str]] | None = None,
+    time_budget: float = GREEDY_TIME_BUDGET_SECONDS,
+) -> list[PlanResult]:
+    """``solve_meal_plan`` without CP-SAT; always returns a single plan.
+
+    ``time_budget`` covers pool building as well as the search.
+    """
+    from .core import _normalize_fixed_assignments, _plan_result, build_candidate_pools
+
+    started = time.perf_counter()
+    config = config or SolverConfig()
+    required = ("calories", "protein", "carbs", "fat")
+    missing = [k for k in required if parse_float(targets.get(k), 0.0) <= 0]
+    if missing:
+        raise ValueError(f"Missing or invalid solver targets: {missing}")
+
+    keep_ids = {str(a.recipe_id).removeprefix("r") for a in (*(fixed_assignments or ()), *(hint or ()))}
+    candidates = build_candidate_pools(list(recipes), config=config, targets=targets, keep_ids=keep_ids)
+    fixed = _normalize_fixed_assignments(fixed_assignments, candidates, config.num_days)
+    closed = (
+        set(closed_slots or ())
+        | {(int(a.day_index), str(a.meal_type)) for a in (fixed_assignments or ())}
+    ) - set(fixed)
+
+    result = greedy_picks(
+        candidates, fixed, closed, targets, config,
+        hard_limit_keys=hard_limit_keys or (),
+        hint=_normalize_fixed_assignments(hint, candidates, config.num_days) if hint else None,
+        time_budget=max(0.0, time_budget - (time.perf_counter() - started)),
+    )
+    if result is None:
+        raise RuntimeError("No feasible meal plan found.")
+    picked, objective = result
+    seconds = time.perf_counter() - started
+    if on_solution is not None:
+        on_solution(objective, 1.0)
+    print(f"[solver] greedy objective={objective:.0f} seconds={seconds:.3f}")
+    return [_plan_result(
+        patient_id, targets, config, candidates, fixed, picked,
+        objective=objective,
+        stop_reason="greedy",
+        solve_seconds=seconds,
+    )]
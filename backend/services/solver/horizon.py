@@ -0,0 +1,185 @@
+"""Rolling-horizon planning for plans longer than a week.
+
+One model over a whole month grows quickly and still misses the cross-week
+variety that ``_compute_recency_penalties`` only adds afterwards.  Instead
+each week is solved in a window of that week plus up to
+``HORIZON_LOOKAHEAD_DAYS`` of the next, only the first week is committed,
+and the planner moves on with:
+
+- recency: the committed week becomes "last week" for the next window's
+  recency penalties, shifting older weeks back;
+- nutrient deficits: the running shortfall (or surplus) against the daily
+  calorie, protein and carb targets is spread over the next week, capped at
+  ``DEFICIT_CARRY_CAP`` of each target.  Hard user limits are never raised.
+
+The whole horizon shares the time limit of one solve over all its days
+(``_time_limit``, at most ``max_time_seconds``): each window gets an equal
+share of what is left, so time a window saves by stopping early goes to
+the later ones.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import replace
+from datetime import date, timedelta
+from typing import Any
+
+from ...utils import parse_float
+from .models import (
+    MEALS,
+    MealGenerationResult,
+    PlanResult,
+    PreparedMealGeneration,
+    SolverConfig,
+)
+
+WEEK_DAYS = 7
+HORIZON_LOOKAHEAD_DAYS = 7
+MAX_HORIZON_WEEKS = 6
+DEFICIT_CARRY_CAP = 0.1
+_CARRIED_NUTRIENTS = ("calories", "protein", "carbs")
+_RECENCY_WEEKS = 3
+
+
+def _week_start(week_start: str | None, week: int) -> str | None:
+    if not week_start:
+        return None
+    try:
+        return (date.fromisoformat(week_start) + timedelta(weeks=week)).isoformat()
+    except (ValueError, TypeError):
+        return None
+
+
+def _first_days(plan: PlanResult, num_days: int) -> PlanResult:
+    """The first ``num_days`` days of a window's plan."""
+    days = range(num_days)
+    daily_totals = {day: plan.daily_totals[day] for day in days}
+    totals = {
+        key: round(sum(daily_totals[day].get(key, 0.0) for day in days), 1)
+        for key in plan.totals
+    }
+    return replace(
+        plan,
+        num_days=num_days,
+        daily_totals=daily_totals,
+        daily_satiety_by_meal={day: plan.daily_satiety_by_meal[day] for day in days},
+        daily_satiety_total={day: plan.daily_satiety_total[day] for day in days},
+        totals=totals,
+        picks={day: plan.picks[day] for day in days},
+    )
+
+
+def _concat_plans(weeks: list[PlanResult]) -> PlanResult:
+    """Join committed weeks into one plan; day indexes run across weeks."""
+    picks: dict[int, Any] = {}
+    daily_totals: dict[int, dict[str, float]] = {}
+    satiety_by_meal: dict[int, dict[str, float]] = {}
+    satiety_total: dict[int, float] = {}
+    offset = 0
+    for plan in weeks:
+        for day in range(plan.num_days):
+            picks[offset + day] = plan.picks[day]
+            daily_totals[offset + day] = plan.daily_totals[day]
+            satiety_by_meal[offset + day] = plan.daily_satiety_by_meal[day]
+            satiety_total[offset + day] = plan.daily_satiety_total[day]
+        offset += plan.num_days
+    first = weeks[0]
+    return replace(
+        first,
+        num_days=offset,
+        objective_value=sum(plan.objective_value for plan in weeks),
+        daily_totals=daily_totals,
+        daily_satiety_by_meal=satiety_by_meal,
+        daily_satiety_total=satiety_total,
+        totals={key: round(sum(plan.totals.get(key, 0.0) for plan in weeks), 1) for key in first.totals},
+        picks=picks,
+        stop_reason=",".join(plan.stop_reason for plan in weeks),
+        solve_seconds=round(sum(plan.solve_seconds for plan in weeks), 2),
+    )
+
+
+def solve_rolling_horizon(
+    prepared: PreparedMealGeneration,
+    *,
+    on_solution: Any = None,
+) -> MealGenerationResult:
+    """Plan ``prepared.config.num_days`` days (up to six weeks) week by week.
+
+    Fixed slots, closed slots and the warm-start hint apply to the first
+    week only.  Progress reported to ``on_solution`` covers the whole
+    horizon.
+    """
+    from .core import _recency_penalties_from_history, _solve_prepared_window, _time_limit, plan_result_to_entries
+
+    config = prepared.config or SolverConfig()
+    total_days = min(config.num_days, MAX_HORIZON_WEEKS * WEEK_DAYS)
+    num_weeks = -(-total_days // WEEK_DAYS)
+    deadline = time.perf_counter() + _time_limit(replace(config, num_days=total_days))
+    base_targets = dict(prepared.targets)
+    history = list(prepared.recent_weeks)
+    deficits = {key: 0.0 for key in _CARRIED_NUTRIENTS}
+    committed: list[PlanResult] = []
+
+    for week in range(num_weeks):
+        first_day = week * WEEK_DAYS
+        week_days = min(WEEK_DAYS, total_days - first_day)
+        window_days = min(week_days + HORIZON_LOOKAHEAD_DAYS, total_days - first_day)
+
+        targets = dict(base_targets)
+        for key, deficit in deficits.items():
+            base = parse_float(base_targets.get(key), 0.0)
+            if base <= 0 or key in prepared.hard_limit_keys:
+                continue
+            carry = max(-DEFICIT_CARRY_CAP * base, min(DEFICIT_CARRY_CAP * base, deficit / week_days))
+            targets[key] = base + carry
+
+        window_seconds = max(1, int((deadline - time.perf_counter()) / (num_weeks - week)))
+        progress = None
+        if on_solution is not None:
+            def progress(objective: float, fraction: float, week: int = week) -> None:
+                on_solution(objective, (week + fraction) / num_weeks)
+
+        window = _solve_prepared_window(
+            replace(
+                prepared,
+                week_start=_week_start(prepared.week_start, week),
+                targets=targets,
+                config=replace(
+                    config,
+                    num_days=window_days,
+                    max_solutions=1,
+                    time_limit_seconds=window_seconds,
+                    max_time_seconds=window_seconds,
+                    recency_penalties=_recency_penalties_from_history(history[:_RECENCY_WEEKS]),
+                ),
+                fixed_assignments=prepared.fixed_assignments if week == 0 else None,
+                closed_slots=prepared.closed_slots if week == 0 else frozenset(),
+                hint=prepared.hint if week == 0 else (),
+            ),
+            on_solution=progress,
+        )
+        plan = _first_days(window.selected_plan, week_days)
+        committed.append(plan)
+        print(
+            f"[horizon] week={week + 1}/{num_weeks} window_days={window_days} time_limit={window_seconds}s "
+            f"objective={plan.objective_value:.0f} stop_reason={plan.stop_reason}"
+        )
+
+        history.insert(0, frozenset(
+            pick.recipe_id for day in range(week_days) for meal in MEALS for pick in plan.picks[day][meal]
+        ))
+        for key in deficits:
+            deficits[key] += sum(
+                parse_float(base_targets.get(key), 0.0) - plan.daily_totals[day].get(key, 0.0)
+                for day in range(week_days)
+            )
+
+    selected_plan = _concat_plans(committed)
+    return MealGenerationResult(
+        patient_id=prepared.patient_id,
+        week_start=prepared.week_start,
+        inputs=prepared.inputs,
+        plans=(selected_plan,),
+        selected_plan=selected_plan,
+        entries=plan_result_to_entries(selected_plan, week_start=prepared.week_start),
+    )
@@ -1,14 +1,19 @@
 from __future__ import annotations
 
 import random
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
 from typing import Any
 
+from ...config import get_int_setting
 from ...constants import CONDITION_CONFIG, get_condition_targets
 from ...utils import parse_float
-from ..dish_candidate import DishCandidate, build_dish_candidate, is_condiment_like
-from ..nutrient_calculator import load_ingredient_cache
+from ..dish_candidate import DishCandidate, is_condiment_like
 from ..profile_loader import UserProfile, load_user_profile
-from ..recommendation_engine import condition_category_score, filter_dishes
+from ..eligibility import catalog_eligibility
+from ..recipe_catalog import RecipeCatalog, get_recipe_catalog
+from ..recommendation_engine import condition_category_score
 from .models import (
     MEALS,
     SolverConfig,
@@ -112,33 +117,42 @@ def _compute_condition_penalties(
 
 
 # ---------------------------------------------------------------------------
-# Main entry point
+# Filtered candidate cache
 # ---------------------------------------------------------------------------
 
-def load_solver_inputs_from_db(
-    conn: Any,
-    patient_id: str,
-    *,
-    validate_candidates: bool = True,
-) -> SolverInputBundle:
-    from .core import build_candidate_pools
+# Filtered candidate sets kept for repeat solves, least recently used
+# evicted first.  0 disables the cache.
+SOLVER_INPUT_CACHE_SIZE = get_int_setting("SOLVER_INPUT_CACHE_SIZE", 64)
 
-    profile = load_user_profile(conn, patient_id)
-    if not profile:
-        raise ValueError(f"Patient profile not found for {patient_id}")
 
-    ingredient_cache = load_ingredient_cache(conn)
-    recipe_rows = conn.execute("SELECT * FROM recipes").fetchall()
+@dataclass(frozen=True)
+class _FilteredCandidates:
+    """Everything ``load_solver_inputs_from_db`` derives from the catalog
+    for one filter profile and favourite set; never mutated once built."""
+
+    dishes: tuple[DishCandidate, ...]
+    recipes: tuple[SolverRecipe, ...]
+    total_recipes: int
+    prefilter_counts: dict[str, int]
+    postfilter_counts: dict[str, int]
+    allowed_recipe_ids: tuple[str, ...]
+    condition_penalties: dict[str, int]
+
+
+_filtered_cache: OrderedDict[tuple[Any, ...], _FilteredCandidates] = OrderedDict()
+_filtered_lock = threading.Lock()
+_filtered_hits = 0
+_filtered_misses = 0
 
-    # Load favourites upfront so we can mark them on DishCandidate immediately
-    favourite_rows = conn.execute(
-        "SELECT dish_id FROM favourites WHERE user_id = ?", (patient_id,)
-    ).fetchall()
-    favourite_ids: set[str] = {str(row["dish_id"]) for row in favourite_rows}
 
+def _build_filtered_candidates(
+    catalog: RecipeCatalog,
+    profile: UserProfile,
+    favourite_ids: frozenset[str],
+) -> _FilteredCandidates:
     all_dishes = [
-        build_dish_candidate(row, is_favourite=str(row["id"]) in favourite_ids)
-        for row in recipe_rows
+        replace(dish, is_favourite=True) if dish.id in favourite_ids else dish
+        for dish in catalog.dishes
     ]
 
     prefilter_counts = {
@@ -152,32 +166,20 @@ def load_solver_inputs_from_db(
         "allergies": profile.allergies,
     }
 
+    eligibility = catalog_eligibility(catalog)
     allowed_recipe_ids: set[str] = set()
     postfilter_counts: dict[str, int] = {}
     for meal in MEALS:
-        filtered = filter_dishes(
-            all_dishes,
-            filter_profile,
-            meal,
-            ingredient_cache,
-            filter_meal_type=True,
-            filter_diet=True,
-            filter_allergies=True,
-            filter_conditions=True,
-        )
+        filtered = eligibility.filter(all_dishes, filter_profile, meal)
         postfilter_counts[meal] = len(filtered)
         allowed_recipe_ids.update(dish.id for dish in filtered)
 
-    allowed_dishes = [
+    allowed_dishes = tuple(
         dish for dish in all_dishes
         if dish.id in allowed_recipe_ids and not is_condiment_like(dish)
-    ]
-
-    # Compute scorer-derived preference weights — replaces pure random perturbation
-    preference_weights = _compute_preference_weights(allowed_dishes, profile.conditions, favourite_ids)
-    condition_penalties = _compute_condition_penalties(allowed_dishes, profile.conditions)
+    )
 
-    filtered_recipes = tuple(normalize_recipe({
+    recipes = tuple(normalize_recipe({
         "id": dish.id,
         "name": dish.name,
         "url": dish.url,
@@ -196,6 +198,103 @@ def load_solver_inputs_from_db(
         "is_favourite": dish.is_favourite,
     }) for dish in allowed_dishes)
 
+    return _FilteredCandidates(
+        dishes=allowed_dishes,
+        recipes=recipes,
+        total_recipes=len(all_dishes),
+        prefilter_counts=prefilter_counts,
+        postfilter_counts=postfilter_counts,
+        allowed_recipe_ids=tuple(sorted(allowed_recipe_ids)),
+        condition_penalties=_compute_condition_penalties(list(allowed_dishes), profile.conditions),
+    )
+
+
+def _filtered_candidates(
+    catalog: RecipeCatalog,
+    profile: UserProfile,
+    favourite_ids: frozenset[str],
+) -> _FilteredCandidates:
+    """Cached ``_build_filtered_candidates``.
+
+    The key holds everything the result depends on - catalog version,
+    conditions, diet, allergies and favourites - so a changed profile,
+    favourite or dataset never hits a stale entry; those entries age out.
+    """
+    global _filtered_hits, _filtered_misses
+
+    key = (
+        catalog.version,
+        tuple(sorted(profile.conditions)),
+        profile.diet,
+        tuple(sorted(profile.allergies)),
+        favourite_ids,
+    )
+    with _filtered_lock:
+        cached = _filtered_cache.get(key)
+        if cached is not None:
+            _filtered_cache.move_to_end(key)
+            _filtered_hits += 1
+            return cached
+        _filtered_misses += 1
+
+    # Concurrent misses on one key build it twice; both results are equal.
+    built = _build_filtered_candidates(catalog, profile, favourite_ids)
+    with _filtered_lock:
+        if SOLVER_INPUT_CACHE_SIZE > 0:
+            for stale in [k for k in _filtered_cache if k[0] != catalog.version]:
+                del _filtered_cache[stale]
+            _filtered_cache[key] = built
+            while len(_filtered_cache) > SOLVER_INPUT_CACHE_SIZE:
+                _filtered_cache.popitem(last=False)
+    return built
+
+
+def invalidate_solver_input_cache() -> None:
+    """Drop every cached candidate set."""
+    with _filtered_lock:
+        _filtered_cache.clear()
+
+
+def solver_input_cache_stats() -> dict[str, int]:
+    with _filtered_lock:
+        return {
+            "entries": len(_filtered_cache),
+            "capacity": SOLVER_INPUT_CACHE_SIZE,
+            "hits": _filtered_hits,
+            "misses": _filtered_misses,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Main entry point
+# ---------------------------------------------------------------------------
+
+def load_solver_inputs_from_db(
+    conn: Any,
+    patient_id: str,
+    *,
+    validate_candidates: bool = True,
+) -> SolverInputBundle:
+    from .core import build_candidate_pools
+
+    profile = load_user_profile(conn, patient_id)
+    if not profile:
+        raise ValueError(f"Patient profile not found for {patient_id}")
+
+    catalog = get_recipe_catalog(conn)
+
+    favourite_rows = conn.execute(
+        "SELECT dish_id FROM favourites WHERE user_id = ?", (patient_id,)
+    ).fetchall()
+    favourite_ids = frozenset(str(row["dish_id"]) for row in favourite_rows)
+
+    filtered = _filtered_candidates(catalog, profile, favourite_ids)
+    filtered_recipes = filtered.recipes
+
+    # Preference weights carry per-solve noise, so they are not cached.
+    preference_weights = _compute_preference_weights(list(filtered.dishes), profile.conditions, favourite_ids)
+    condition_penalties = dict(filtered.condition_penalties)
+
     config = SolverConfig(
         preference_weights=preference_weights,
         condition_penalties=condition_penalties,
@@ -226,9 +325,9 @@ def load_solver_inputs_from_db(
             condition_penalties=condition_penalties,
         ),
         diagnostics=SolverInputDiagnostics(
-            total_recipes=len(all_dishes),
-            prefilter_counts=prefilter_counts,
-            postfilter_counts=postfilter_counts,
-            allowed_recipe_ids=tuple(sorted(allowed_recipe_ids)),
+            total_recipes=filtered.total_recipes,
+            prefilter_counts=dict(filtered.prefilter_counts),
+            postfilter_counts=dict(filtered.postfilter_counts),
+            allowed_recipe_ids=filtered.allowed_recipe_ids,
         ),
     )
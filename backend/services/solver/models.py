@@ -129,11 +129,27 @@ class SolverConfig:
     meal_satiety_ratio: dict[str, float] = field(default_factory=lambda: dict(DEFAULT_MEAL_SATIETY_RATIO))
     calorie_buffer_pct: float = DEFAULT_CALORIE_BUFFER_PCT
     max_solutions: int = 1
+    # Alternative plans must differ from the best plan and each other in at
+    # least this many dish picks.
+    min_solution_difference: int = 3
     main_course_min_servings: int = DEFAULT_MAIN_COURSE_MIN_SERVINGS
     main_course_max_servings: int = DEFAULT_MAIN_COURSE_MAX_SERVINGS
     time_limit_seconds: int = DEFAULT_SOLVER_TIME_LIMIT_SECONDS
+    # Anytime stop policy: stop once the relative gap to the best bound is at
+    # most ``stop_relative_gap``, or after ``stop_stall_seconds`` without an
+    # improvement of at least ``stop_min_improvement`` (relative); 0 disables
+    # a rule.  ``max_time_seconds`` caps the scaled time limit.  The stall
+    # rule is off by default: on the weekly benchmark it cost about 7% of
+    # objective, so callers enable it only where a worse plan is acceptable.
+    stop_relative_gap: float = 0.01
+    stop_stall_seconds: float = 0.0
+    stop_min_improvement: float = 0.001
+    max_time_seconds: int = 120
     max_recipes_per_meal: int | dict[str, int] = MAX_RECIPES_PER_MEAL
     per_meal_nutrient_caps: dict[str, float] = field(default_factory=dict)
+    # CP-SAT search threads for this solve; the process pool lowers it so
+    # concurrent solves share the machine's cores.
+    num_search_workers: int = 8
     favourite_boost: int = 50000
     # Pre-computed health-aware preference weights keyed by recipe_id.
     # Negative = preferred; positive = penalised.  Replaces the pure-random
@@ -146,6 +162,16 @@ class SolverConfig:
     # Cross-week recency penalties keyed by recipe_id.
     # Penalises dishes used in recent weeks so plans vary over time.
     recency_penalties: dict[str, int] = field(default_factory=dict)
+    # "monolithic" solves all days in one model; "per_day" solves each day
+    # separately in parallel and repairs cross-day repeats afterwards.
+    decomposition: str = "monolithic"
+    # Two-stage solve: pick dishes with servings held at
+    # MIN_SERVINGS_PER_SELECTED, then tune servings for the picked dishes only.
+    two_stage: bool = False
+    # Objective penalty per hinted dish the solver drops.  0 keeps the hint a
+    # pure warm start; a positive weight makes regenerated plans stay close
+    # to the hint.
+    stability_weight: int = 0
 
     def get_max_recipes(self, meal: str) -> int:
         """Return the per-meal dish limit, resolving int or dict."""
@@ -158,6 +184,8 @@ class SolverConfig:
             raise ValueError("num_days must be >= 1")
         if self.max_solutions < 1 or self.max_solutions > 3:
             raise ValueError("max_solutions must be between 1 and 3")
+        if self.decomposition not in ("monolithic", "per_day"):
+            raise ValueError("decomposition must be 'monolithic' or 'per_day'")
         if not 0 <= self.calorie_buffer_pct < 1:
             raise ValueError("calorie_buffer_pct must be in [0, 1)")
         _validate_ratio_triplet(self.meal_calorie_ratio, "meal_calorie_ratio")
@@ -195,6 +223,69 @@ class PlanResult:
     daily_satiety_total: dict[int, float]
     totals: dict[str, float]
     picks: dict[int, dict[str, list[PlannedRecipe]]]
+    # Why the search ended: optimal, gap, stall or time_limit; alternatives
+    # taken from the main search's solutions report solution_pool.
+    stop_reason: str = ""
+    solve_seconds: float = 0.0
+
+
+@dataclass(frozen=True)
+class SwapSuggestion:
+    recipe_id: str
+    name: str
+    servings: int
+    # Change in the solver objective against the dish being replaced
+    # (scaled units, negative = better).
+    score_delta: int
+    nutrients: dict[str, float]
+
+
+@dataclass(frozen=True)
+class PlanConflict:
+    """One hard constraint behind an infeasible solve."""
+    # "daily_cap": a nutrient cap on one day; "daily_caps": a day's caps
+    # taken together; "slot_count": a slot's dish count; "fixed_dish": a
+    # dish that must stay in its slot.
+    code: str
+    day_index: int
+    nutrients: tuple[str, ...] = ()
+    meal_type: str | None = None
+    recipe_ids: tuple[str, ...] = ()
+    # Lowest total the day can reach (daily_cap from the LP pre-check) or
+    # the fixed servings (fixed_dish), against the limit.  Unscaled.
+    actual: float | None = None
+    limit: float | None = None
+
+    def describe(self) -> str:
+        day = f"day {self.day_index + 1}"
+        if self.code == "daily_cap" and self.actual is not None:
+            return f"{day} {self.nutrients[0]} cannot go below {self.actual:.1f} (limit {self.limit:.1f})"
+        if self.code == "daily_cap":
+            return f"{day} {self.nutrients[0]} capped at {self.limit:.1f}"
+        if self.code == "daily_caps":
+            return f"{day} caps on {', '.join(self.nutrients)} cannot all be met"
+        if self.code == "slot_count":
+            return f"{day} {self.meal_type} needs at least {self.limit:.0f} dish{'es' if self.limit != 1 else ''}"
+        return f"{day} {self.meal_type} keeps dish {', '.join(self.recipe_ids)} ({self.actual:g} servings)"
+
+
+class InfeasiblePlanError(RuntimeError):
+    """No plan satisfies the hard constraints; ``conflicts`` names them."""
+
+    def __init__(self, message: str, conflicts: tuple[PlanConflict, ...] = ()) -> None:
+        super().__init__(message)
+        self.conflicts = tuple(conflicts)
+
+    @classmethod
+    def from_conflicts(cls, conflicts: list[PlanConflict] | tuple[PlanConflict, ...]) -> InfeasiblePlanError:
+        """Error naming ``conflicts``, which cannot all hold together."""
+        return cls(
+            "No feasible meal plan found: " + "; ".join(c.describe() for c in conflicts) + ".",
+            tuple(conflicts),
+        )
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return type(self), (str(self), self.conflicts)
 
 
 @dataclass(frozen=True)
@@ -239,6 +330,33 @@ class MealGenerationResult:
     entries: tuple[GeneratedMealPlanEntry, ...]
 
 
+@dataclass(frozen=True)
+class PreparedMealGeneration:
+    """DB-derived inputs for one solve.
+
+    Built by ``prepare_meal_plan_generation`` while a connection is held;
+    ``solve_prepared_generation`` then runs without one.
+    """
+
+    patient_id: str
+    week_start: str | None
+    inputs: SolverInputBundle
+    targets: dict[str, float]
+    hard_limit_keys: frozenset[str]
+    config: SolverConfig | None
+    recipes: tuple[SolverRecipe, ...]
+    fixed_assignments: tuple[FixedMealAssignment, ...] | None
+    # (day_index, meal_type) slots that stay empty, e.g. locked past meals.
+    closed_slots: frozenset[tuple[int, str]] = frozenset()
+    # Warm-start plan (see ``SolverConfig.stability_weight``); empty = none.
+    hint: tuple[FixedMealAssignment, ...] = ()
+    # "cp_sat" (falls back to greedy when it finds no plan) or "greedy".
+    engine: str = "cp_sat"
+    # Dish ids of the weeks before ``week_start``, last week first; the
+    # rolling-horizon planner extends this history week by week.
+    recent_weeks: tuple[frozenset[str], ...] = ()
+
+
 def _validate_ratio_triplet(values: dict[str, float], label: str) -> None:
     for meal in MEALS:
         if float(values.get(meal, 0)) <= 0:
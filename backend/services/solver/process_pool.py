@@ -0,0 +1,166 @@
+"""Dedicated worker processes for CP-SAT solves.
+
+Building the model is pure Python and holds the GIL, so solving inside the
+web process stalls every other request handled by that worker.  Solves are
+instead shipped to a small pool of spawned processes that import OR-Tools
+once at startup.  Only the ``solve_meal_plan`` arguments travel to the
+worker (targets, config and the already filtered ``SolverRecipe`` tuple), and
+a ``PlanResult`` list comes back.
+
+The machine's cores are split across the pool: each solve gets
+``cpu_count // SOLVER_PROCESSES`` CP-SAT search threads instead of a fixed 8,
+so concurrent solves no longer oversubscribe the CPU.  ``SOLVER_PROCESSES=0``
+solves in the calling process (scripts, tests).
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import replace
+from typing import Any
+
+from ...config import get_int_setting
+from .models import PlanResult, SolverConfig
+
+SOLVER_PROCESSES = get_int_setting("SOLVER_PROCESSES", 2)
+# Upper bound on CP-SAT search threads per solve.
+SOLVER_MAX_THREADS_PER_SOLVE = get_int_setting("SOLVER_MAX_THREADS_PER_SOLVE", 8)
+
+_executor: ProcessPoolExecutor | None = None
+_manager: Any = None
+_lock = threading.Lock()
+_solves = 0
+_active = 0
+_crashes = 0
+_solve_seconds_total = 0.0
+
+
+def threads_per_solve() -> int:
+    cores = os.cpu_count() or 1
+    return max(1, min(SOLVER_MAX_THREADS_PER_SOLVE, cores // max(1, SOLVER_PROCESSES)))
+
+
+def _warm_worker() -> None:
+    # Import OR-Tools and the solver module once per worker process.
+    from . import core
+
+    core._import_cp_model()
+
+
+def _noop() -> int:
+    return os.getpid()
+
+
+def _solve_in_worker(kwargs: dict[str, Any], progress: Any) -> list[PlanResult]:
+    from .core import solve_meal_plan
+
+    on_solution = None
+    if progress is not None:
+        def on_solution(objective: float, fraction: float) -> None:
+            progress.put((objective, fraction))
+
+    return solve_meal_plan(**kwargs, on_solution=on_solution)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=max(1, SOLVER_PROCESSES),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+        return _executor
+
+
+def _get_manager() -> Any:
+    global _manager
+    with _lock:
+        if _manager is None:
+            _manager = multiprocessing.get_context("spawn").Manager()
+        return _manager
+
+
+def start_solver_pool() -> None:
+    """Spawn and warm every worker so the first request does not pay for it."""
+    if SOLVER_PROCESSES <= 0:
+        return
+    executor = _get_executor()
+    pids = {future.result() for future in [executor.submit(_noop) for _ in range(SOLVER_PROCESSES)]}
+    print(f"[solver-pool] started processes={len(pids)} threads_per_solve={threads_per_solve()}")
+
+
+def shutdown_solver_pool() -> None:
+    global _executor, _manager
+    with _lock:
+        executor, _executor = _executor, None
+        manager, _manager = _manager, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+    if manager is not None:
+        manager.shutdown()
+
+
+def solve_in_pool(
+    *,
+    config: SolverConfig | None,
+    on_solution: Any = None,
+    **kwargs: Any,
+) -> list[PlanResult]:
+    """Run ``solve_meal_plan`` in a worker process (or inline if disabled)."""
+    global _executor, _solves, _active, _crashes, _solve_seconds_total
+    from .core import solve_meal_plan
+
+    config = replace(config or SolverConfig(), num_search_workers=threads_per_solve())
+    if SOLVER_PROCESSES <= 0:
+        return solve_meal_plan(config=config, on_solution=on_solution, **kwargs)
+
+    progress = _get_manager().Queue() if on_solution is not None else None
+    future = _get_executor().submit(_solve_in_worker, {**kwargs, "config": config}, progress)
+    started = time.monotonic()
+    with _lock:
+        _active += 1
+    try:
+        while progress is not None and not future.done():
+            try:
+                on_solution(*progress.get(timeout=0.25))
+            except queue.Empty:
+                pass
+        result = future.result()
+        while progress is not None:
+            try:
+                on_solution(*progress.get_nowait())
+            except queue.Empty:
+                break
+        return result
+    except BrokenProcessPool as exc:
+        # A worker died (e.g. OOM); start a fresh pool for the next solve.
+        with _lock:
+            _crashes += 1
+            broken, _executor = _executor, None
+        if broken is not None:
+            broken.shutdown(wait=False, cancel_futures=True)
+        raise RuntimeError("Solver worker crashed. Please try again.") from exc
+    finally:
+        with _lock:
+            _active -= 1
+            _solves += 1
+            _solve_seconds_total += time.monotonic() - started
+
+
+def solver_pool_stats() -> dict[str, Any]:
+    with _lock:
+        return {
+            "processes": max(0, SOLVER_PROCESSES),
+            "threadsPerSolve": threads_per_solve(),
+            "active": _active,
+            "solves": _solves,
+            "crashes": _crashes,
+            "solveSecondsTotal": round(_solve_seconds_total, 1),
+        }
@@ -0,0 +1,193 @@
+"""Candidate pruning for the CP-SAT model.
+
+Model size grows with ``days x slots x candidates``, so each meal pool is cut
+down to a budget before the model is built.  Instead of a random sample the
+pool keeps recipes that are both good and different:
+
+1. favourites and explicitly kept ids (fixed slots, hints) always stay;
+2. recipes are ranked on two axes - preference (profile weights, condition
+   and recency penalties; lower is better) and nutrient fit (distance of one
+   or two servings to the slot's share of the daily targets) - and whole
+   Pareto layers are kept until twice the budget is reached, which drops
+   recipes that are worse on both axes than many others;
+3. the survivors are clustered in normalised nutrient space and the best
+   recipe of each cluster is kept, so the pool still spans the calorie and
+   macro ranges the targets need.
+
+Mains and other dishes are pruned separately with half the budget each, as
+before, so multi-dish lunches can still be composed.
+"""
+from __future__ import annotations
+
+import random
+from typing import Iterable
+
+import numpy as np
+
+from .models import MAX_SERVINGS_PER_RECIPE, SolverConfig, SolverRecipe
+
+MIN_CANDIDATES_PER_POOL = 30
+MAX_CANDIDATES_PER_POOL = 120
+# Pool size per second of solve time per planned day; 7 days x 10 s -> 40.
+# Small diverse pools converge much faster than large ones, so the pool only
+# grows when the solve has time to search it.
+CANDIDATES_PER_DAY_SECOND = 28
+
+_FEATURES = ("calories", "protein", "carbs", "fat", "fiber", "sodium", "sugar")
+_FIT_NUTRIENTS = ("calories", "protein", "carbs")
+_KMEANS_ITERATIONS = 8
+
+
+def pool_budget(config: SolverConfig | None) -> int:
+    """Candidates per meal pool for the solve's time budget."""
+    if config is None:
+        return 80
+    budget = CANDIDATES_PER_DAY_SECOND * config.time_limit_seconds // max(1, config.num_days)
+    return max(MIN_CANDIDATES_PER_POOL, min(MAX_CANDIDATES_PER_POOL, budget))
+
+
+def _preference_scores(recipes: list[SolverRecipe], config: SolverConfig | None) -> np.ndarray:
+    if config is None:
+        return np.array([-1.0 if r.is_favourite else 0.0 for r in recipes])
+    scores = []
+    for r in recipes:
+        score = config.preference_weights.get(r.recipe_id, 0)
+        if not config.preference_weights and r.is_favourite:
+            score -= config.favourite_boost
+        score += config.condition_penalties.get(r.recipe_id, 0)
+        score += config.recency_penalties.get(r.recipe_id, 0)
+        scores.append(float(score))
+    return np.array(scores)
+
+
+def _fit_scores(features: np.ndarray, slot_targets: np.ndarray | None) -> np.ndarray:
+    if slot_targets is None:
+        return np.zeros(len(features))
+    fit_columns = [_FEATURES.index(n) for n in _FIT_NUTRIENTS]
+    per_serving = features[:, fit_columns]
+    best = None
+    for servings in range(1, MAX_SERVINGS_PER_RECIPE + 1):
+        miss = np.abs(per_serving * servings - slot_targets) / slot_targets
+        total = miss.sum(axis=1)
+        best = total if best is None else np.minimum(best, total)
+    return best
+
+
+def _pareto_layers(preference: np.ndarray, fit: np.ndarray, limit: int) -> np.ndarray:
+    """Indices of whole non-dominated layers until at least ``limit`` are kept."""
+    remaining = np.lexsort((fit, preference))
+    kept: list[int] = []
+    while len(remaining) and len(kept) < limit:
+        # Sorted by preference, a recipe is on the front when its fit beats
+        # every recipe before it.
+        fits = fit[remaining]
+        running_best = np.minimum.accumulate(np.concatenate(([np.inf], fits[:-1])))
+        on_front = fits < running_best
+        kept.extend(remaining[on_front].tolist())
+        remaining = remaining[~on_front]
+    return np.array(kept, dtype=int)
+
+
+def _kmeans_representatives(points: np.ndarray, rank: np.ndarray, k: int, seed: int) -> list[int]:
+    """Cluster ``points`` into ``k`` groups; return the best-ranked index of each."""
+    rng = np.random.default_rng(seed)
+    # k-means++ seeding keeps the extremes of the nutrient space.
+    centers = [points[rng.integers(len(points))]]
+    distances = ((points - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        total = distances.sum()
+        index = int(rng.choice(len(points), p=distances / total)) if total > 0 else int(rng.integers(len(points)))
+        centers.append(points[index])
+        distances = np.minimum(distances, ((points - points[index]) ** 2).sum(axis=1))
+    centers_arr = np.array(centers)
+
+    for _ in range(_KMEANS_ITERATIONS):
+        labels = ((points[:, None, :] - centers_arr[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+        for cluster in range(k):
+            members = points[labels == cluster]
+            if len(members):
+                centers_arr[cluster] = members.mean(axis=0)
+
+    chosen: list[int] = []
+    for cluster in range(k):
+        members = np.flatnonzero(labels == cluster)
+        if len(members):
+            chosen.append(int(members[rank[members].argmin()]))
+    return chosen
+
+
+def _prune_group(
+    recipes: list[SolverRecipe],
+    budget: int,
+    config: SolverConfig | None,
+    slot_targets: np.ndarray | None,
+) -> list[SolverRecipe]:
+    if len(recipes) <= budget:
+        return recipes
+    if budget <= 0:
+        return []
+
+    features = np.array([[getattr(r, n) for n in _FEATURES] for r in recipes], dtype=float)
+    preference = _preference_scores(recipes, config)
+    fit = _fit_scores(features, slot_targets)
+
+    survivors = _pareto_layers(preference, fit, 2 * budget)
+    if len(survivors) <= budget:
+        return [recipes[i] for i in survivors]
+
+    # Combined rank: best on both axes first.
+    order_pref = np.argsort(np.argsort(preference[survivors], kind="stable"), kind="stable")
+    order_fit = np.argsort(np.argsort(fit[survivors], kind="stable"), kind="stable")
+    rank = order_pref + order_fit
+
+    points = features[survivors]
+    scale = points.std(axis=0)
+    points = (points - points.mean(axis=0)) / np.where(scale > 0, scale, 1.0)
+
+    chosen = _kmeans_representatives(points, rank, budget, random.getrandbits(32))
+    if len(chosen) < budget:
+        # Empty clusters: top up with the best remaining recipes.
+        taken = set(chosen)
+        chosen.extend([i for i in np.argsort(rank, kind="stable").tolist() if i not in taken][:budget - len(chosen)])
+    return [recipes[survivors[i]] for i in chosen]
+
+
+def prune_pool(
+    recipes: list[SolverRecipe],
+    cap: int,
+    *,
+    config: SolverConfig | None = None,
+    slot_targets: dict[str, float] | None = None,
+    keep_ids: Iterable[str] = (),
+) -> list[SolverRecipe]:
+    """Trim a candidate pool to ``cap`` recipes (see module docstring).
+
+    ``slot_targets`` is the per-dish share of the daily calories, protein and
+    carbs for this pool; without it recipes are ranked on preference alone.
+    """
+    if len(recipes) <= cap:
+        return recipes
+
+    keep_ids = set(keep_ids)
+    pinned = [r for r in recipes if r.is_favourite or r.recipe_id in keep_ids]
+    main = [r for r in recipes if r.is_main_course and not (r.is_favourite or r.recipe_id in keep_ids)]
+    rest = [r for r in recipes if not r.is_main_course and not (r.is_favourite or r.recipe_id in keep_ids)]
+
+    # Reserve half the remaining budget for mains, half for sides/others;
+    # if one category cannot fill its half, the other gets the remainder.
+    budget = max(0, cap - len(pinned))
+    main_budget = min(len(main), budget // 2)
+    rest_budget = min(len(rest), budget - main_budget)
+    main_budget = min(len(main), budget - rest_budget)
+
+    targets = None
+    if slot_targets:
+        values = [float(slot_targets.get(n, 0) or 0) for n in _FIT_NUTRIENTS]
+        if all(v > 0 for v in values):
+            targets = np.array(values)
+
+    return (
+        pinned
+        + _prune_group(main, main_budget, config, targets)
+        + _prune_group(rest, rest_budget, config, targets)
+    )
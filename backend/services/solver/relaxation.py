@@ -0,0 +1,301 @@
+"""LP relaxation of the CP-SAT model, solved with GLOP before the search.
+
+The relaxation keeps the model's hard constraints - dish counts per slot,
+serving bounds, fixed dishes and the daily ``hard_limit_keys`` caps - with
+the pick variables relaxed to [0, 1].  It solves in milliseconds and is
+used twice:
+
+- feasibility: when GLOP proves the relaxation infeasible so is the model,
+  which CP-SAT would only report after its whole time limit.  Each day, and
+  each cap on it alone, is then checked to name the caps that cannot be met
+  (``InfeasiblePlanError``).  A feasible relaxation does not prove the
+  model feasible, and any other status (abnormal, not solved, ...) proves
+  nothing: the search then runs without the relaxed hint.
+- warm start: the relaxed solution is rounded (largest pick values per
+  slot) into a hint for the greedy planner, whose plan seeds CP-SAT.
+
+The objective has the model's nutrient, soft cap, variety, main course and
+satiety terms; preference weights count for every pick, as in the greedy
+planner.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Iterable
+
+from .models import (
+    MAX_SERVINGS_PER_RECIPE,
+    MEALS,
+    MIN_SERVINGS_PER_SELECTED,
+    FixedMealAssignment,
+    InfeasiblePlanError,
+    PlanConflict,
+    SolverConfig,
+    SolverRecipe,
+    from_int,
+    to_int,
+)
+from .swap import _NUTRIENTS, _recipe_weight
+
+Slot = tuple[int, str]
+
+# Pick values below this count as "not picked" when rounding.
+_PICK_EPSILON = 1e-6
+
+# pywraplp.Solver result statuses, for the log.
+_STATUS_NAMES = {
+    0: "optimal", 1: "feasible", 2: "infeasible", 3: "unbounded", 4: "abnormal", 5: "model_invalid", 6: "not_solved",
+}
+
+
+def _import_glop():
+    try:
+        from ortools.linear_solver import pywraplp
+    except Exception as exc:
+        raise RuntimeError(
+            "OR-Tools is not installed. Install: pip install ortools"
+        ) from exc
+    return pywraplp
+
+
+class _Relaxation:
+    """The relaxed model over ``days``.
+
+    ``caps`` are scaled daily limits.  With ``objective=False`` only the
+    constraints are built, for the feasibility checks of the diagnosis.
+    """
+
+    def __init__(
+        self,
+        pywraplp: Any,
+        candidates: dict[str, list[SolverRecipe]],
+        fixed: dict[Slot, list[FixedMealAssignment]],
+        closed: set[Slot] | frozenset[Slot],
+        targets: dict[str, float],
+        config: SolverConfig,
+        days: Iterable[int],
+        caps: dict[str, int],
+        *,
+        objective: bool = True,
+    ) -> None:
+        self.pywraplp = pywraplp
+        self.candidates = candidates
+        self.lp = lp = pywraplp.Solver.CreateSolver("GLOP")
+        inf = lp.infinity()
+        days = list(days)
+        recipes_by_id = {r.recipe_id: r for meal in MEALS for r in candidates[meal]}
+
+        goals = {}
+        soft_caps = {}
+        if objective:
+            goals = {n: to_int(targets[n]) for n in ("calories", "protein", "carbs") if to_int(targets[n]) > 0}
+            soft_caps = {
+                n: to_int(targets.get(n, 0)) for n in ("fat", "sodium", "sugar") if to_int(targets.get(n, 0)) > 0
+            }
+        nutrients = set(caps) | set(goals) | set(soft_caps)
+
+        # Day totals are variables tied to the servings by one equality
+        # each; fixed dishes make up the right-hand side.
+        self.totals: dict[tuple[str, int], Any] = {}
+        total_rows: dict[tuple[str, int], Any] = {}
+        fixed_use: dict[tuple[int, str], int] = {}
+        for day in days:
+            assignments = [a for (d, _), slot in fixed.items() if d == day for a in slot]
+            for a in assignments:
+                fixed_use[(day, a.recipe_id)] = fixed_use.get((day, a.recipe_id), 0) + 1
+            for n in nutrients:
+                base = sum(to_int(getattr(recipes_by_id[a.recipe_id], n)) * int(round(a.servings)) for a in assignments)
+                total = lp.NumVar(-inf, caps.get(n, inf), f"t_{n}_{day}")
+                row = lp.Constraint(base, base)
+                row.SetCoefficient(total, 1)
+                self.totals[(n, day)] = total
+                total_rows[(n, day)] = row
+
+        self.slots: dict[Slot, list[tuple[SolverRecipe, Any, Any]]] = {}
+        for day in days:
+            for meal in MEALS:
+                pool = candidates[meal]
+                if (day, meal) in fixed or (day, meal) in closed or not pool:
+                    continue
+                meal_max = config.get_max_recipes(meal)
+                meal_min = meal_max if meal_max <= len(pool) else min(1, len(pool))
+                count = lp.Constraint(meal_min, meal_max)
+                slot = []
+                for r in pool:
+                    x_var = lp.NumVar(0, 1, "")
+                    s_var = lp.NumVar(0, MAX_SERVINGS_PER_RECIPE, "")
+                    count.SetCoefficient(x_var, 1)
+                    low = lp.Constraint(0, inf)
+                    low.SetCoefficient(s_var, 1)
+                    low.SetCoefficient(x_var, -MIN_SERVINGS_PER_SELECTED)
+                    high = lp.Constraint(-inf, 0)
+                    high.SetCoefficient(s_var, 1)
+                    high.SetCoefficient(x_var, -MAX_SERVINGS_PER_RECIPE)
+                    for n in nutrients:
+                        total_rows[(n, day)].SetCoefficient(s_var, -to_int(getattr(r, n)))
+                    slot.append((r, x_var, s_var))
+                self.slots[(day, meal)] = slot
+
+        self.objective = lp.Objective()
+        self.objective.SetMinimization()
+        if objective:
+            self._build_objective(config, days, goals, soft_caps, fixed_use)
+
+    def _excess(self, terms: list[Any], constant: int, limit: int, weight: int) -> None:
+        """Penalise ``sum(terms) + constant`` above ``limit`` by ``weight``."""
+        lp = self.lp
+        if not terms or len(terms) + constant <= limit:
+            return
+        excess = lp.NumVar(0, lp.infinity(), "")
+        row = lp.Constraint(constant - limit, lp.infinity())
+        row.SetCoefficient(excess, 1)
+        for term in terms:
+            row.SetCoefficient(term, -1)
+        self.objective.SetCoefficient(excess, weight)
+
+    def _build_objective(
+        self,
+        config: SolverConfig,
+        days: list[int],
+        goals: dict[str, int],
+        soft_caps: dict[str, int],
+        fixed_use: dict[tuple[int, str], int],
+    ) -> None:
+        lp = self.lp
+        inf = lp.infinity()
+        objective = self.objective
+        for day in days:
+            for n, target in goals.items():
+                weight = max(1, int(round(1000 / target))) * 1000
+                pos = lp.NumVar(0, inf, "")
+                neg = lp.NumVar(0, inf, "")
+                row = lp.Constraint(target, target)
+                row.SetCoefficient(self.totals[(n, day)], 1)
+                row.SetCoefficient(pos, -1)
+                row.SetCoefficient(neg, 1)
+                objective.SetCoefficient(pos, weight)
+                objective.SetCoefficient(neg, weight)
+            for n, limit in soft_caps.items():
+                over = lp.NumVar(0, inf, "")
+                row = lp.Constraint(-limit, inf)
+                row.SetCoefficient(over, 1)
+                row.SetCoefficient(self.totals[(n, day)], -1)
+                objective.SetCoefficient(over, 5000)
+
+        picks: dict[tuple[int, str], list[Any]] = {}
+        for (day, meal), slot in self.slots.items():
+            for r, x_var, s_var in slot:
+                picks.setdefault((day, r.recipe_id), []).append(x_var)
+                objective.SetCoefficient(x_var, _recipe_weight(r.recipe_id, r.is_favourite, config))
+                objective.SetCoefficient(s_var, -to_int(r.protein + r.fiber))
+            if meal in ("lunch", "dinner") and config.get_max_recipes(meal) >= 2:
+                self._excess([x_var for r, x_var, _ in slot if r.is_main_course], 0, 1, 5000)
+
+        recipe_ids = {rid for _, rid in picks} | {rid for _, rid in fixed_use}
+        for rid in recipe_ids:
+            for day in days:
+                self._excess(picks.get((day, rid), []), fixed_use.get((day, rid), 0), 1, 50000)
+            if config.num_days >= 3:
+                for day in days[:-1]:
+                    window = picks.get((day, rid), []) + picks.get((day + 1, rid), [])
+                    constant = fixed_use.get((day, rid), 0) + fixed_use.get((day + 1, rid), 0)
+                    self._excess(window, constant, 1, 10000)
+
+    def solve(self) -> int:
+        """GLOP's result status (``pywraplp.Solver.OPTIMAL``, ``INFEASIBLE``, ...)."""
+        return self.lp.Solve()
+
+    def rounded_hint(self, config: SolverConfig) -> dict[Slot, list[FixedMealAssignment]]:
+        """Per slot, the dishes with the largest pick values and their
+        rounded servings."""
+        hint: dict[Slot, list[FixedMealAssignment]] = {}
+        for (day, meal), slot in self.slots.items():
+            ranked = sorted(slot, key=lambda item: -item[1].solution_value())
+            for r, x_var, s_var in ranked[:config.get_max_recipes(meal)]:
+                picked = x_var.solution_value()
+                if picked < _PICK_EPSILON:
+                    break
+                servings = int(round(s_var.solution_value() / picked))
+                hint.setdefault((day, meal), []).append(FixedMealAssignment(
+                    day_index=day,
+                    meal_type=meal,
+                    recipe_id=r.recipe_id,
+                    servings=max(MIN_SERVINGS_PER_SELECTED, min(MAX_SERVINGS_PER_RECIPE, servings)),
+                ))
+        return hint
+
+
+def _diagnose(
+    pywraplp: Any,
+    candidates: dict[str, list[SolverRecipe]],
+    fixed: dict[Slot, list[FixedMealAssignment]],
+    closed: set[Slot] | frozenset[Slot],
+    targets: dict[str, float],
+    config: SolverConfig,
+    caps: dict[str, int],
+) -> list[PlanConflict]:
+    """Days whose caps cannot be met, with each cap that fails on its own."""
+    conflicts: list[PlanConflict] = []
+    for day in range(config.num_days):
+        args = (pywraplp, candidates, fixed, closed, targets, config, [day])
+        if _Relaxation(*args, caps, objective=False).solve() != pywraplp.Solver.INFEASIBLE:
+            continue
+        fixed_ids = tuple(a.recipe_id for (d, _), slot in fixed.items() if d == day for a in slot)
+        day_conflicts = []
+        for nutrient, limit in sorted(caps.items()):
+            lowest = _Relaxation(*args, {nutrient: 10**9}, objective=False)
+            lowest.objective.SetCoefficient(lowest.totals[(nutrient, day)], 1)
+            if lowest.solve() != pywraplp.Solver.OPTIMAL:
+                continue
+            value = lowest.totals[(nutrient, day)].solution_value()
+            if value > limit + _PICK_EPSILON:
+                day_conflicts.append(PlanConflict(
+                    code="daily_cap",
+                    day_index=day,
+                    nutrients=(nutrient,),
+                    recipe_ids=fixed_ids,
+                    actual=round(from_int(value), 1),
+                    limit=from_int(limit),
+                ))
+        conflicts += day_conflicts or [PlanConflict(
+            code="daily_caps",
+            day_index=day,
+            nutrients=tuple(sorted(caps)),
+            recipe_ids=fixed_ids,
+        )]
+    return conflicts
+
+
+def relaxation_precheck(
+    candidates: dict[str, list[SolverRecipe]],
+    fixed: dict[Slot, list[FixedMealAssignment]],
+    closed: set[Slot] | frozenset[Slot],
+    targets: dict[str, float],
+    config: SolverConfig,
+    *,
+    hard_limit_keys: Iterable[str] = (),
+) -> dict[Slot, list[FixedMealAssignment]]:
+    """Solve the relaxation; return its rounded plan as a hint.
+
+    Raises ``InfeasiblePlanError`` naming the caps that cannot be met when
+    the relaxation is infeasible.  Returns an empty hint when GLOP ends with
+    any other non-optimal status.
+    """
+    pywraplp = _import_glop()
+    started = time.perf_counter()
+    caps = {n: to_int(targets.get(n, 0)) for n in hard_limit_keys if n in _NUTRIENTS}
+    caps = {n: limit for n, limit in caps.items() if limit > 0}
+    relaxation = _Relaxation(pywraplp, candidates, fixed, closed, targets, config, range(config.num_days), caps)
+    status = relaxation.solve()
+    print(
+        f"[solver] relaxation status={_STATUS_NAMES.get(status, status)} vars={relaxation.lp.NumVariables()} "
+        f"seconds={time.perf_counter() - started:.3f}"
+    )
+    if status == pywraplp.Solver.OPTIMAL:
+        return relaxation.rounded_hint(config)
+    if status != pywraplp.Solver.INFEASIBLE:
+        print("[solver] relaxation inconclusive, continuing without its hint")
+        return {}
+
+    conflicts = _diagnose(pywraplp, candidates, fixed, closed, targets, config, caps)
+    raise InfeasiblePlanError.from_conflicts(conflicts)
@@ -0,0 +1,211 @@
+"""Single-slot "swap dish" search.
+
+Replacing one dish does not need a CP-SAT solve: the rest of the week is
+fixed, so the neighbourhood is just every eligible recipe at every serving
+count in that one slot.  Each neighbour is scored with the day-level terms of
+the solver objective (``core._build_objective``) - nutrient deviation, soft
+caps, same-day and two-day repeats, preference, condition and recency
+penalties, main-course shaping and satiety - evaluated in one vectorised pass
+over the candidate matrix.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from typing import Iterable
+
+import numpy as np
+
+from .models import (
+    MAX_SERVINGS_PER_RECIPE,
+    MIN_SERVINGS_PER_SELECTED,
+    SCALE,
+    FixedMealAssignment,
+    SolverConfig,
+    SolverRecipe,
+    SwapSuggestion,
+    to_int,
+)
+
+_NUTRIENTS = ("calories", "protein", "carbs", "fat", "fiber", "sodium", "sugar", "cholesterol")
+_TARGET_NUTRIENTS = ("calories", "protein", "carbs")
+_SOFT_CAP_NUTRIENTS = ("fat", "sodium", "sugar")
+
+
+def _eligible(recipe: SolverRecipe, meal_type: str) -> bool:
+    if meal_type == "breakfast":
+        return "breakfast" in recipe.meal_types
+    return "lunch" in recipe.meal_types or "dinner" in recipe.meal_types
+
+
+def _recipe_weight(recipe_id: str, is_favourite: bool, config: SolverConfig) -> int:
+    if config.preference_weights:
+        weight = config.preference_weights.get(recipe_id, 0)
+    else:
+        weight = -config.favourite_boost if is_favourite else 0
+    weight += config.condition_penalties.get(recipe_id, 0)
+    return weight + config.recency_penalties.get(recipe_id, 0)
+
+
+def _slot_costs(
+    nutrients: np.ndarray,
+    base: np.ndarray,
+    targets: dict[str, float],
+    hard_limit_keys: Iterable[str],
+) -> tuple[np.ndarray, np.ndarray]:
+    """Nutrient cost and hard-cap feasibility of each row of ``nutrients``
+    (already multiplied by servings) added to the day's ``base`` totals."""
+    totals = (base + nutrients) * SCALE
+    cost = np.zeros(len(nutrients))
+    for nutrient in _TARGET_NUTRIENTS:
+        target = to_int(targets.get(nutrient, 0) or 0)
+        if target > 0:
+            weight = max(1, int(round(1000 / target))) * 1000
+            cost += weight * np.abs(totals[:, _NUTRIENTS.index(nutrient)] - target)
+    for nutrient in _SOFT_CAP_NUTRIENTS:
+        limit = to_int(targets.get(nutrient, 0) or 0)
+        if limit > 0:
+            cost += 5000 * np.maximum(0.0, totals[:, _NUTRIENTS.index(nutrient)] - limit)
+
+    feasible = np.ones(len(nutrients), dtype=bool)
+    for nutrient in hard_limit_keys:
+        limit = to_int(targets.get(nutrient, 0) or 0)
+        if nutrient not in _NUTRIENTS or limit <= 0:
+            continue
+        column = _NUTRIENTS.index(nutrient)
+        # A day already over its cap cannot be fixed by this slot alone.
+        if base[column] * SCALE <= limit:
+            feasible &= totals[:, column] <= limit
+    return cost, feasible
+
+
+def rank_swaps(
+    *,
+    recipes: Iterable[SolverRecipe],
+    targets: dict[str, float],
+    config: SolverConfig,
+    day_index: int,
+    meal_type: str,
+    week_plan: Iterable[FixedMealAssignment],
+    base_totals: dict[str, float],
+    current: FixedMealAssignment | None = None,
+    current_nutrients: dict[str, float] | None = None,
+    hard_limit_keys: Iterable[str] = (),
+    limit: int = 10,
+) -> list[SwapSuggestion]:
+    """Rank replacements for one dish in ``(day_index, meal_type)``.
+
+    ``week_plan`` holds the other dishes of the week and ``base_totals`` the
+    day's nutrients without the dish being replaced; ``current`` and
+    ``current_nutrients`` describe that dish so each suggestion reports its
+    objective change against it.
+    """
+    recipes_by_id = {r.recipe_id: r for r in recipes}
+    return rank_slot(
+        pool=[r for r in recipes_by_id.values() if _eligible(r, meal_type)],
+        recipes_by_id=recipes_by_id,
+        targets=targets,
+        config=config,
+        day_index=day_index,
+        meal_type=meal_type,
+        week_plan=week_plan,
+        base_totals=base_totals,
+        current=current,
+        current_nutrients=current_nutrients,
+        hard_limit_keys=hard_limit_keys,
+        limit=limit,
+    )
+
+
+def rank_slot(
+    *,
+    pool: list[SolverRecipe],
+    recipes_by_id: dict[str, SolverRecipe],
+    targets: dict[str, float],
+    config: SolverConfig,
+    day_index: int,
+    meal_type: str,
+    week_plan: Iterable[FixedMealAssignment],
+    base_totals: dict[str, float],
+    current: FixedMealAssignment | None = None,
+    current_nutrients: dict[str, float] | None = None,
+    hard_limit_keys: Iterable[str] = (),
+    limit: int = 10,
+) -> list[SwapSuggestion]:
+    """``rank_swaps`` over an already eligible candidate ``pool``.
+
+    Recipes already in the slot (and ``current``) are skipped;
+    ``recipes_by_id`` resolves the slot's other dishes.
+    """
+    hard_limit_keys = tuple(hard_limit_keys)
+    week_plan = list(week_plan)
+    in_slot = {a.recipe_id for a in week_plan if a.day_index == day_index and a.meal_type == meal_type}
+    excluded = in_slot | ({current.recipe_id} if current else set())
+    pool = [r for r in pool if r.recipe_id not in excluded]
+    if not pool:
+        return []
+
+    usage: dict[int, Counter[str]] = {}
+    for assignment in week_plan:
+        usage.setdefault(assignment.day_index, Counter())[assignment.recipe_id] += 1
+    windows = (
+        [(day_index - 1, day_index), (day_index, day_index + 1)]
+        if config.num_days >= 3 else []
+    )
+
+    def variety_cost(recipe_id: str) -> int:
+        cost = 50000 * min(1, usage.get(day_index, Counter())[recipe_id])
+        for window in windows:
+            if any(usage.get(day, Counter())[recipe_id] for day in window):
+                cost += 10000
+        return cost
+
+    base = np.array([float(base_totals.get(n, 0) or 0) for n in _NUTRIENTS])
+    per_serving = np.array([[getattr(r, n) for n in _NUTRIENTS] for r in pool], dtype=float)
+    fixed_cost = np.array([
+        variety_cost(r.recipe_id) + _recipe_weight(r.recipe_id, r.is_favourite, config)
+        for r in pool
+    ], dtype=float)
+
+    slot_has_main = any(rid in recipes_by_id and recipes_by_id[rid].is_main_course for rid in in_slot)
+    shape_mains = meal_type in ("lunch", "dinner") and config.get_max_recipes(meal_type) >= 2 and slot_has_main
+    if shape_mains:
+        fixed_cost += np.array([5000.0 if r.is_main_course else 0.0 for r in pool])
+
+    satiety = np.array([to_int(r.protein + r.fiber) for r in pool], dtype=float)
+
+    best_cost = np.full(len(pool), np.inf)
+    best_servings = np.zeros(len(pool), dtype=int)
+    for servings in range(MIN_SERVINGS_PER_SELECTED, MAX_SERVINGS_PER_RECIPE + 1):
+        cost, feasible = _slot_costs(per_serving * servings, base, targets, hard_limit_keys)
+        cost = np.where(feasible, cost + fixed_cost - satiety * servings, np.inf)
+        better = cost < best_cost
+        best_cost = np.where(better, cost, best_cost)
+        best_servings = np.where(better, servings, best_servings)
+
+    reference = 0.0
+    if current is not None:
+        added = np.array([[float((current_nutrients or {}).get(n, 0) or 0) for n in _NUTRIENTS]])
+        current_recipe = recipes_by_id.get(current.recipe_id)
+        cost, _ = _slot_costs(added, base, targets, ())
+        reference = float(cost[0]) + variety_cost(current.recipe_id) + _recipe_weight(
+            current.recipe_id, bool(current_recipe and current_recipe.is_favourite), config,
+        )
+        reference -= float(added[0][_NUTRIENTS.index("protein")] + added[0][_NUTRIENTS.index("fiber")]) * SCALE
+        if shape_mains and current_recipe is not None and current_recipe.is_main_course:
+            reference += 5000
+
+    finite = np.flatnonzero(np.isfinite(best_cost))
+    if not len(finite):
+        return []
+    top = finite[np.argsort(best_cost[finite], kind="stable")[:limit]]
+    suggestions = []
+    for index in top.tolist():
+        servings = int(best_servings[index])
+        suggestions.append(SwapSuggestion(
+            recipe_id=pool[index].recipe_id,
+            name=pool[index].name,
+            servings=servings,
+            score_delta=int(round(best_cost[index] - reference)),
+            nutrients={n: round(float(v) * servings, 1) for n, v in zip(_NUTRIENTS, per_serving[index])},
+        ))
+    return suggestions
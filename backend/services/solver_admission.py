@@ -0,0 +1,170 @@
+"""Admission control for meal-plan solves.
+
+At most ``SOLVER_MAX_CONCURRENT`` solves run at once per instance; up to
+``SOLVER_MAX_WAITING`` more may wait for a slot.  Anything beyond that is
+refused immediately with ``SolverBusy`` (429 + Retry-After) instead of
+piling more CP-SAT work onto a saturated machine.  Waiting solves are
+admitted by tier first (paid before free) and then in arrival order.
+
+A request reserves its place with ``reserve()`` before doing any DB work, so
+a rejection is cheap, then calls ``Ticket.wait()`` right before solving and
+``Ticket.release()`` when done.  Background jobs use ``Ticket.on_admit()``
+instead of blocking a thread in ``wait()``.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import math
+import threading
+import time
+from typing import Any, Callable
+
+from ..config import get_int_setting
+from .solver.process_pool import SOLVER_PROCESSES
+
+SOLVER_MAX_CONCURRENT = get_int_setting("SOLVER_MAX_CONCURRENT", max(1, SOLVER_PROCESSES))
+SOLVER_MAX_WAITING = get_int_setting("SOLVER_MAX_WAITING", 16)
+
+TIER_PRIORITY = {"paid": 0, "free": 1}
+
+
+class SolverBusy(Exception):
+    """Raised when the solver is saturated and the wait queue is full."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Meal planner is busy. Please try again shortly.")
+        self.retry_after = retry_after
+
+
+class Ticket:
+    def __init__(self, controller: SolverAdmission, priority: int, seq: int) -> None:
+        self._controller = controller
+        self.priority = priority
+        self.seq = seq
+        self.reserved_at = time.monotonic()
+        self.admitted = False
+        self.released = False
+        self._on_admit: Callable[[], None] | None = None
+
+    def wait(self) -> None:
+        self._controller._wait(self)
+
+    def on_admit(self, callback: Callable[[], None]) -> None:
+        """Call ``callback`` once the ticket is admitted (now if it already is)."""
+        self._controller._set_on_admit(self, callback)
+
+    def release(self) -> None:
+        self._controller._release(self)
+
+    def __lt__(self, other: Ticket) -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class SolverAdmission:
+    def __init__(self, max_concurrent: int, max_waiting: int) -> None:
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_waiting = max(0, max_waiting)
+        self._cond = threading.Condition()
+        self._queue: list[Ticket] = []
+        self._seq = itertools.count()
+        self._active = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._solve_total = 0.0
+        self._solves = 0
+
+    def reserve(self, tier: str | None) -> Ticket:
+        priority = TIER_PRIORITY.get(str(tier or "free"), TIER_PRIORITY["free"])
+        with self._cond:
+            if len(self._queue) >= self.max_waiting and self._active >= self.max_concurrent:
+                self._rejected += 1
+                raise SolverBusy(self._retry_after_locked())
+            ticket = Ticket(self, priority, next(self._seq))
+            heapq.heappush(self._queue, ticket)
+            callbacks = self._admit_locked()
+        for callback in callbacks:
+            callback()
+        return ticket
+
+    def _admit_locked(self) -> list[Callable[[], None]]:
+        """Admit waiting tickets; returns their ``on_admit`` callbacks, which
+        the caller runs after releasing the lock."""
+        callbacks = []
+        while self._queue and self._active < self.max_concurrent:
+            ticket = heapq.heappop(self._queue)
+            ticket.admitted = True
+            self._active += 1
+            self._admitted += 1
+            waited = time.monotonic() - ticket.reserved_at
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            ticket.reserved_at = time.monotonic()
+            if ticket._on_admit is not None:
+                callbacks.append(ticket._on_admit)
+        self._cond.notify_all()
+        return callbacks
+
+    def _wait(self, ticket: Ticket) -> None:
+        with self._cond:
+            while not ticket.admitted:
+                self._cond.wait()
+
+    def _set_on_admit(self, ticket: Ticket, callback: Callable[[], None]) -> None:
+        with self._cond:
+            if not ticket.admitted:
+                ticket._on_admit = callback
+                return
+        callback()
+
+    def _release(self, ticket: Ticket) -> None:
+        with self._cond:
+            if ticket.released:
+                return
+            ticket.released = True
+            if ticket.admitted:
+                self._active -= 1
+                self._solves += 1
+                self._solve_total += time.monotonic() - ticket.reserved_at
+            else:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+            callbacks = self._admit_locked()
+        for callback in callbacks:
+            callback()
+
+    def _retry_after_locked(self) -> int:
+        avg_solve = self._solve_total / self._solves if self._solves else 5.0
+        rounds = (len(self._queue) + self._active) / self.max_concurrent
+        return max(1, math.ceil(avg_solve * rounds))
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            waiting_by_tier: dict[str, int] = {tier: 0 for tier in TIER_PRIORITY}
+            names = {priority: tier for tier, priority in TIER_PRIORITY.items()}
+            for ticket in self._queue:
+                waiting_by_tier[names.get(ticket.priority, "free")] += 1
+            return {
+                "maxConcurrent": self.max_concurrent,
+                "maxWaiting": self.max_waiting,
+                "active": self._active,
+                "waiting": len(self._queue),
+                "waitingByTier": waiting_by_tier,
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "waitTimeAvgMs": round(self._wait_total / self._admitted * 1000, 1) if self._admitted else 0.0,
+                "waitTimeMaxMs": round(self._wait_max * 1000, 1),
+            }
+
+
+_admission = SolverAdmission(SOLVER_MAX_CONCURRENT, SOLVER_MAX_WAITING)
+
+
+def get_solver_admission() -> SolverAdmission:
+    return _admission
+
+
+def solver_admission_stats() -> dict[str, Any]:
+    return _admission.stats()
@@ -0,0 +1,208 @@
+"""Background meal-plan solves.
+
+``/generate`` and ``/autofill`` can run for up to two minutes, which is longer
+than most proxies wait.  The job endpoints reserve a solver slot and do the
+DB reads inline and return a job id immediately.  Once the job's admission
+ticket is admitted (see ``solver_admission``) it runs on a small bounded
+thread pool, so concurrency and priority are the same as for the inline
+endpoints and no thread is parked while a job waits.  Job state lives in the ``solver_jobs`` table, so any
+instance can answer ``GET /api/mealplan/jobs/{id}``.  The worker holds no DB
+connection while the solver runs; it borrows one from the pool only to
+record progress and to persist the result.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from ..config import get_int_setting
+from ..db import get_pool
+from ..utils import parse_json
+from .solver_admission import SOLVER_MAX_CONCURRENT, Ticket
+
+# Threads running admitted job solves.  Jobs only reach the pool once
+# admitted, so more threads than SOLVER_MAX_CONCURRENT would sit idle.
+SOLVER_JOB_WORKERS = get_int_setting("SOLVER_JOB_WORKERS", max(1, SOLVER_MAX_CONCURRENT))
+# Minimum interval between progress writes for one job.
+SOLVER_JOB_PROGRESS_SECONDS = get_int_setting("SOLVER_JOB_PROGRESS_SECONDS", 2)
+# A queued/running job not updated for this long is reported as lost
+# (e.g. the instance running it was stopped).
+SOLVER_JOB_STALE_SECONDS = get_int_setting("SOLVER_JOB_STALE_SECONDS", 3600)
+
+ProgressFn = Callable[[float, float], None]
+
+
+_executor: ThreadPoolExecutor | None = None
+_lock = threading.Lock()
+_pending = 0
+_submitted = 0
+_completed = 0
+_failed = 0
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, SOLVER_JOB_WORKERS), thread_name_prefix="solver-job"
+            )
+        return _executor
+
+
+def _update_job(job_id: str, assignments: str, params: tuple[Any, ...] = ()) -> None:
+    with get_pool().connection() as conn:
+        conn.execute(
+            f"UPDATE solver_jobs SET {assignments}, updated_at = NOW() WHERE id = ?",
+            (*params, job_id),
+        )
+        conn.commit()
+
+
+class _ProgressReporter:
+    """Solver callback that records the best objective, throttled per job."""
+
+    def __init__(self, job_id: str) -> None:
+        self.job_id = job_id
+        self._written_at = 0.0
+        self._latest: tuple[float, float] | None = None
+
+    def __call__(self, objective: float, progress: float) -> None:
+        self._latest = (objective, progress)
+        if time.monotonic() - self._written_at >= SOLVER_JOB_PROGRESS_SECONDS:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._latest is None:
+            return
+        objective, progress = self._latest
+        self._written_at = time.monotonic()
+        try:
+            _update_job(self.job_id, "objective = ?, progress = ?", (objective, round(progress, 3)))
+        except Exception as exc:  # progress is best-effort
+            print(f"[jobs] progress_write_failed job_id={self.job_id} detail={exc}")
+
+
+def _run_job(
+    job_id: str,
+    ticket: Ticket,
+    solve: Callable[[ProgressFn], Any],
+    finish: Callable[[Any, Any], dict],
+) -> None:
+    global _pending, _completed, _failed
+    started = time.monotonic()
+    try:
+        _update_job(job_id, "status = 'running', started_at = NOW()")
+        reporter = _ProgressReporter(job_id)
+        solved = solve(reporter)
+        reporter.flush()
+        with get_pool().connection() as conn:
+            response = finish(conn, solved)
+        _update_job(
+            job_id,
+            "status = 'succeeded', progress = 1, result = ?, finished_at = NOW()",
+            (json.dumps(response, default=str),),
+        )
+        with _lock:
+            _completed += 1
+        print(f"[jobs] succeeded job_id={job_id} seconds={time.monotonic() - started:.1f}")
+    except Exception as exc:
+        # HTTPException-style errors keep their status; anything else is a 500.
+        status_code = int(getattr(exc, "status_code", 500))
+        detail = getattr(exc, "detail", None) or str(exc) or exc.__class__.__name__
+        with _lock:
+            _failed += 1
+        print(f"[jobs] failed job_id={job_id} status={status_code} detail={detail}")
+        try:
+            _update_job(
+                job_id,
+                "status = 'failed', error = ?, finished_at = NOW()",
+                (json.dumps({"statusCode": status_code, "detail": detail}, default=str),),
+            )
+        except Exception as write_exc:
+            print(f"[jobs] failure_write_failed job_id={job_id} detail={write_exc}")
+    finally:
+        ticket.release()
+        with _lock:
+            _pending -= 1
+
+
+def submit_solver_job(
+    conn: Any,
+    *,
+    kind: str,
+    user_id: str,
+    week_start: str | None,
+    ticket: Ticket,
+    solve: Callable[[ProgressFn], Any],
+    finish: Callable[[Any, Any], dict],
+) -> str:
+    """Record a queued job and schedule it; returns the job id.
+
+    The job takes ownership of ``ticket`` and releases it when done.
+    ``solve(progress)`` runs on the job pool once the ticket is admitted,
+    without a DB connection.
+    ``finish(conn, solved)`` then persists the result on a pooled connection
+    and returns the JSON payload stored as the job result.
+    """
+    global _pending, _submitted
+    job_id = uuid.uuid4().hex
+    conn.execute(
+        "INSERT INTO solver_jobs (id, user_id, kind, week_start) VALUES (?, ?, ?, ?)",
+        (job_id, user_id, kind, week_start),
+    )
+    conn.commit()
+    with _lock:
+        _pending += 1
+        _submitted += 1
+    ticket.on_admit(lambda: _get_executor().submit(_run_job, job_id, ticket, solve, finish))
+    print(f"[jobs] queued job_id={job_id} kind={kind} user_id={user_id} week_start={week_start}")
+    return job_id
+
+
+def get_solver_job(conn: Any, job_id: str) -> dict[str, Any] | None:
+    row = conn.execute(
+        """
+        SELECT id, user_id, kind, week_start, status, progress, objective, result, error,
+               created_at, started_at, finished_at,
+               (status IN ('queued', 'running') AND updated_at < NOW() - make_interval(secs => ?)) AS stale
+        FROM solver_jobs
+        WHERE id = ?
+        """,
+        (SOLVER_JOB_STALE_SECONDS, job_id),
+    ).fetchone()
+    if not row:
+        return None
+    status = row["status"]
+    error = parse_json(row["error"], None)
+    if row["stale"]:
+        status = "failed"
+        error = {"statusCode": 503, "detail": "Solver job was interrupted. Please try again."}
+    return {
+        "jobId": row["id"],
+        "userId": row["user_id"],
+        "kind": row["kind"],
+        "weekStart": row["week_start"],
+        "status": status,
+        "progress": row["progress"],
+        "objective": row["objective"],
+        "result": parse_json(row["result"], None),
+        "error": error,
+        "createdAt": row["created_at"],
+        "startedAt": row["started_at"],
+        "finishedAt": row["finished_at"],
+    }
+
+
+def solver_job_stats() -> dict[str, Any]:
+    with _lock:
+        return {
+            "pending": _pending,
+            "submitted": _submitted,
+            "completed": _completed,
+            "failed": _failed,
+        }
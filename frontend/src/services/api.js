@@ -153,11 +153,30 @@ export async function validateAutofillPlan(userId, weekStart, settings, threshol
   });
 }
 
+// Solves run as background jobs; poll until the job finishes and return its
+// result, or throw the same shape of error request() would have thrown.
+async function waitForPlanJob(submitted, intervalMs = 1000) {
+  if (!submitted.jobId) return submitted;
+  for (;;) {
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    const job = await request(`/mealplan/jobs/${submitted.jobId}`);
+    if (job.status === "succeeded") return job.result;
+    if (job.status === "failed") {
+      const detail = job.error?.detail;
+      const error = new Error((typeof detail === "string" ? detail : detail?.error) || "Meal plan job failed");
+      error.status = job.error?.statusCode ?? 500;
+      error.payload = { detail };
+      throw error;
+    }
+  }
+}
+
 export async function autofillPlan(userId, weekStart, settings, thresholds, allowConstraintRelaxation = false) {
-  return request(`/mealplan/${userId}/autofill`, {
+  const submitted = await request(`/mealplan/${userId}/autofill/jobs`, {
     method: "POST",
     body: JSON.stringify({ weekStart, settings, thresholds, allowConstraintRelaxation }),
   });
+  return waitForPlanJob(submitted);
 }
 
 export async function removeDishFromPlan(userId, entryId) {
@@ -182,10 +201,17 @@ export async function clearDayMealPlan(userId, weekStart, dayIndex) {
 }
 
 export async function generateMealPlan(userId, { weekStart, numDays = 7, timeLimitSeconds = 10, dayIndex, maxDishesPerSlot, nutrientLimits } = {}) {
-  return request(`/mealplan/${userId}/generate`, {
+  const submitted = await request(`/mealplan/${userId}/generate/jobs`, {
     method: "POST",
     body: JSON.stringify({ weekStart, numDays, timeLimitSeconds, dayIndex: dayIndex ?? null, maxDishesPerSlot: maxDishesPerSlot ?? 1, nutrientLimits: nutrientLimits ?? null }),
   });
+  try {
+    return await waitForPlanJob(submitted);
+  } catch (err) {
+    // An infeasible solve is a normal outcome for callers, as with the old inline endpoint.
+    if (err.status === 422) return { success: false, error: err.message };
+    throw err;
+  }
 }
 
 export async function hasRecentData(userId) {
@@ -0,0 +1,117 @@
+"""Compare the monolithic weekly model with its faster variants.
+
+Solves synthetic weeks (no database needed) with the single weekly model,
+the per-day decomposition (``decomposition="per_day"``) and the two-stage
+solve (``two_stage=True``), using the same random seeds for each, and
+prints wall time and the plan objective:
+
+    python scripts/bench_solver_decompose.py --runs 3
+
+Both plans are scored with the greedy planner's objective over the full
+recipe list, so the numbers are comparable even though the two engines
+prune their pools differently.  Per-day solves run ``SOLVER_PROCESSES`` at
+a time; on a single core they run one after another.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.services.solver import SolverConfig, normalize_recipe  # noqa: E402
+from backend.services.solver.core import _split_pools, solve_meal_plan  # noqa: E402
+from backend.services.solver.decompose import solve_decomposed  # noqa: E402
+from backend.services.solver.greedy import _Planner  # noqa: E402
+from backend.services.solver.models import MEALS  # noqa: E402
+
+TARGETS = {"calories": 2000, "protein": 90, "carbs": 250, "fat": 70, "sodium": 2300, "sugar": 50, "fiber": 30}
+CATEGORIES = ["Breakfast", "Main Course", "Side Dish", "Soup", "Salad", "Dessert", "Appetizer"]
+
+
+def _recipes(count: int, seed: int):
+    rng = random.Random(seed)
+    return [
+        normalize_recipe({
+            "id": str(i + 1),
+            "name": f"Recipe {i + 1}",
+            "category": rng.choice(CATEGORIES),
+            "calories": rng.uniform(120, 750),
+            "protein": rng.uniform(3, 50),
+            "carbs": rng.uniform(5, 95),
+            "fat": rng.uniform(2, 40),
+            "fiber": rng.uniform(0, 14),
+            "sodium": rng.uniform(40, 1400),
+            "sugar": rng.uniform(0, 35),
+        })
+        for i in range(count)
+    ]
+
+
+def _run(config: SolverConfig, recipes, seed: int) -> tuple[float, float]:
+    random.seed(seed)
+    solve = solve_decomposed if config.decomposition == "per_day" else solve_meal_plan
+    started = time.perf_counter()
+    plan = solve(patient_id="bench", targets=TARGETS, recipes=recipes, config=config)[0]
+    seconds = time.perf_counter() - started
+
+    breakfast, lunch_dinner = _split_pools(recipes)
+    candidates = {"breakfast": breakfast, "lunch": lunch_dinner, "dinner": lunch_dinner}
+    planner = _Planner(candidates, {}, set(), TARGETS, config, ())
+    picks = {
+        (day, meal): [(planner.recipes_by_id[p.recipe_id], int(p.servings)) for p in plan.picks[day][meal]]
+        for day in range(config.num_days)
+        for meal in MEALS
+    }
+    return seconds, planner.cost(picks)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--recipes", type=int, default=400)
+    parser.add_argument("--dishes-per-slot", type=int, default=3)
+    parser.add_argument("--time-limit", type=int, default=10)
+    parser.add_argument("--max-time", type=int, default=120)
+    args = parser.parse_args()
+
+    recipes = _recipes(args.recipes, seed=11)
+    base = SolverConfig(
+        num_days=7,
+        time_limit_seconds=args.time_limit,
+        max_recipes_per_meal=args.dishes_per_slot,
+        max_time_seconds=args.max_time,
+    )
+    configs = {
+        "monolithic": base,
+        "per_day": replace(base, decomposition="per_day"),
+        "two_stage": replace(base, two_stage=True),
+    }
+
+    results: dict[str, list[tuple[float, float]]] = {label: [] for label in configs}
+    for run in range(args.runs):
+        for label, config in configs.items():
+            seconds, objective = _run(config, recipes, seed=run)
+            results[label].append((seconds, objective))
+            print(f"run={run} {label:<10} seconds={seconds:6.2f} objective={objective:14.0f}")
+
+    for label, rows in results.items():
+        print(
+            f"{label:<10} median_seconds={statistics.median(r[0] for r in rows):6.2f} "
+            f"median_objective={statistics.median(r[1] for r in rows):14.0f}"
+        )
+    for label in ("per_day", "two_stage"):
+        deltas = [(v[1] - m[1]) / max(1.0, abs(m[1])) for m, v in zip(results["monolithic"], results[label])]
+        print(
+            f"objective change ({label} vs monolithic): "
+            f"median={statistics.median(deltas):+.2%} worst={max(deltas):+.2%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
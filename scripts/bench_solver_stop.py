@@ -0,0 +1,96 @@
+"""Compare solve time and objective with and without the anytime stop policy.
+
+Solves synthetic weeks (no database needed) with the stop rules disabled
+(fixed time limit) and with the ``SolverConfig`` defaults, using the same
+random seeds for both, and prints wall time, objective and stop reason:
+
+    python scripts/bench_solver_stop.py --runs 5
+
+Multi-threaded CP-SAT is not deterministic, so compare medians over several
+runs rather than single pairs.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.services.solver import SolverConfig, normalize_recipe  # noqa: E402
+from backend.services.solver.core import solve_meal_plan  # noqa: E402
+
+TARGETS = {"calories": 2000, "protein": 90, "carbs": 250, "fat": 70, "sodium": 2300, "sugar": 50, "fiber": 30}
+CATEGORIES = ["Breakfast", "Main Course", "Side Dish", "Soup", "Salad", "Dessert", "Appetizer"]
+
+
+def _recipes(count: int, seed: int):
+    rng = random.Random(seed)
+    return [
+        normalize_recipe({
+            "id": str(i + 1),
+            "name": f"Recipe {i + 1}",
+            "category": rng.choice(CATEGORIES),
+            "calories": rng.uniform(120, 750),
+            "protein": rng.uniform(3, 50),
+            "carbs": rng.uniform(5, 95),
+            "fat": rng.uniform(2, 40),
+            "fiber": rng.uniform(0, 14),
+            "sodium": rng.uniform(40, 1400),
+            "sugar": rng.uniform(0, 35),
+        })
+        for i in range(count)
+    ]
+
+
+def _run(config: SolverConfig, recipes, seed: int) -> tuple[float, float, str]:
+    random.seed(seed)
+    started = time.perf_counter()
+    plan = solve_meal_plan(patient_id="bench", targets=TARGETS, recipes=recipes, config=config)[0]
+    return time.perf_counter() - started, plan.objective_value, plan.stop_reason
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--recipes", type=int, default=400)
+    # Multi-dish weeks get the longest scaled time limits (up to 120 s).
+    parser.add_argument("--dishes-per-slot", type=int, default=3)
+    parser.add_argument("--time-limit", type=int, default=10)
+    parser.add_argument("--max-time", type=int, default=120)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    recipes = _recipes(args.recipes, seed=11)
+    anytime = SolverConfig(
+        num_days=7,
+        time_limit_seconds=args.time_limit,
+        max_recipes_per_meal=args.dishes_per_slot,
+        num_search_workers=args.workers,
+        max_time_seconds=args.max_time,
+    )
+    fixed = replace(anytime, stop_relative_gap=0.0, stop_stall_seconds=0.0)
+
+    results: dict[str, list[tuple[float, float, str]]] = {"fixed": [], "anytime": []}
+    for run in range(args.runs):
+        for label, config in (("fixed", fixed), ("anytime", anytime)):
+            seconds, objective, reason = _run(config, recipes, seed=run)
+            results[label].append((seconds, objective, reason))
+            print(f"run={run} {label:<8} seconds={seconds:6.2f} objective={objective:14.0f} reason={reason}")
+
+    for label, rows in results.items():
+        reasons = {r: sum(1 for row in rows if row[2] == r) for r in dict.fromkeys(row[2] for row in rows)}
+        print(
+            f"{label:<8} median_seconds={statistics.median(r[0] for r in rows):6.2f} "
+            f"median_objective={statistics.median(r[1] for r in rows):14.0f} reasons={reasons}"
+        )
+    deltas = [(a[1] - f[1]) / max(1.0, abs(f[1])) for f, a in zip(results["fixed"], results["anytime"])]
+    print(f"objective change (anytime vs fixed): median={statistics.median(deltas):+.2%} worst={max(deltas):+.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Benchmark the week-read endpoints with and without the managed indexes.
+
+Seeds ``--rows`` synthetic meal_plans rows (default 1,000,000) for users named
+``bench:N`` into the database at DATABASE_URL, then times ``get_meal_plan``
+and ``get_weekly_nutrients`` for random bench users twice: once with the
+meal_plans indexes dropped and once after ``ensure_indexes``.  Bench rows are
+deleted at the end unless ``--keep`` is given.
+
+Run against a scratch database only:
+
+    DATABASE_URL=postgresql://... python scripts/bench_week_reads.py --yes
+
+It ends with a Markdown table of the before/after p50 and p99, with the row
+count and server version, for the README or the commit message.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.db import MANAGED_INDEXES, _connect, ensure_indexes, init_db  # noqa: E402
+from backend.routers.mealplan import get_meal_plan, get_weekly_nutrients  # noqa: E402
+
+BENCH_PREFIX = "bench:"
+WEEK_START = "2026-03-02"
+
+
+def _seed(conn, rows: int, entries_per_week: int) -> int:
+    users = max(1, rows // entries_per_week)
+    conn.execute("DELETE FROM meal_plans WHERE user_id LIKE ?", (BENCH_PREFIX + "%",))
+    # One week per user; the remaining rows spread over earlier weeks so the
+    # (user_id, week_start) prefix is not unique.
+    conn.execute(
+        """
+        WITH recipe_ids AS (SELECT array_agg(id ORDER BY id) AS ids FROM recipes)
+        INSERT INTO meal_plans (user_id, week_start, day_index, meal_type, dish_id, recipe_id, servings, entry_order)
+        SELECT ? || (g / ?)::text,
+               CASE WHEN mod(g, ?) < ? THEN ? ELSE '2025-01-' || lpad((mod(g, 28) + 1)::text, 2, '0') END,
+               mod(g, 7),
+               (ARRAY['breakfast', 'lunch', 'dinner'])[mod(g, 3) + 1],
+               ids[mod(g, array_length(ids, 1)) + 1],
+               ids[mod(g, array_length(ids, 1)) + 1],
+               1,
+               mod(g / 7, 2)
+        FROM generate_series(0, ? - 1) AS g, recipe_ids
+        """,
+        (BENCH_PREFIX, entries_per_week, entries_per_week, entries_per_week // 2, WEEK_START, rows),
+    )
+    conn.commit()
+    return users
+
+
+def _drop_meal_plan_indexes(conn) -> None:
+    for name, table, _ in MANAGED_INDEXES:
+        if table == "meal_plans":
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+    conn.commit()
+
+
+def _time_reads(conn, users: int, samples: int) -> dict[str, list[float]]:
+    timings: dict[str, list[float]] = {"get_meal_plan": [], "get_weekly_nutrients": []}
+    rng = random.Random(7)
+    for _ in range(samples):
+        user_id = f"{BENCH_PREFIX}{rng.randrange(users)}"
+        started = time.perf_counter()
+        get_meal_plan(user_id, weekStart=WEEK_START, conn=conn)
+        timings["get_meal_plan"].append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        get_weekly_nutrients(user_id, weekStart=WEEK_START, conn=conn)
+        timings["get_weekly_nutrients"].append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def _report(label: str, timings: dict[str, list[float]]) -> dict[str, tuple[float, float]]:
+    """Print and return ``(p50, p99)`` in milliseconds per endpoint."""
+    percentiles = {}
+    for name, values in timings.items():
+        ordered = sorted(values)
+        p50 = statistics.median(ordered)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        print(f"{label:<8} {name:<22} p50={p50:8.2f}ms p99={p99:8.2f}ms")
+        percentiles[name] = (p50, p99)
+    return percentiles
+
+
+def _summary(rows: int, version: str, before: dict[str, tuple[float, float]], after: dict[str, tuple[float, float]]) -> None:
+    print(f"\n{rows:,} meal_plans rows, {version}\n")
+    print("| endpoint | p50 before | p50 after | p99 before | p99 after |")
+    print("|---|---|---|---|---|")
+    for name, (p50, p99) in before.items():
+        new_p50, new_p99 = after[name]
+        print(f"| `{name}` | {p50:.2f} ms | {new_p50:.2f} ms | {p99:.2f} ms | {new_p99:.2f} ms |")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--entries-per-week", type=int, default=42)
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded bench rows")
+    parser.add_argument("--yes", action="store_true", help="confirm DATABASE_URL is a scratch database")
+    args = parser.parse_args()
+    if not args.yes:
+        parser.error("this writes to DATABASE_URL; pass --yes to confirm it is a scratch database")
+
+    init_db()
+    conn = _connect()
+    try:
+        print(f"[bench] seeding {args.rows} meal_plans rows")
+        users = _seed(conn, args.rows, args.entries_per_week)
+
+        _drop_meal_plan_indexes(conn)
+        conn.execute("ANALYZE meal_plans")
+        conn.commit()
+        before = _report("before", _time_reads(conn, users, args.samples))
+
+        ensure_indexes(conn)
+        conn.execute("ANALYZE meal_plans")
+        conn.commit()
+        after = _report("after", _time_reads(conn, users, args.samples))
+        version = conn.execute("SELECT version() AS version").fetchone()["version"]
+        _summary(args.rows, version.split(",")[0], before, after)
+    finally:
+        if not args.keep:
+            conn.execute("DELETE FROM meal_plans WHERE user_id LIKE ?", (BENCH_PREFIX + "%",))
+            conn.commit()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
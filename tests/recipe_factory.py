@@ -0,0 +1,60 @@
+"""Synthetic solver recipes shared by the solver tests."""
+from __future__ import annotations
+
+import random
+
+from backend.services.solver import SolverRecipe, normalize_recipe
+
+CATEGORIES = ("Breakfast", "Main Course", "Side Dish", "Soup", "Salad")
+
+# Uniform ranges per nutrient; calories, protein, carbs and fat are always
+# drawn, the rest only when named in ``extra``.
+RANGES = {
+    "calories": (150, 800),
+    "protein": (5, 45),
+    "carbs": (10, 90),
+    "fat": (3, 35),
+    "fiber": (0, 12),
+    "sodium": (50, 1200),
+    "sugar": (0, 30),
+}
+BASE = ("calories", "protein", "carbs", "fat")
+
+
+def make_recipes(
+    count: int = 300,
+    seed: int = 0,
+    *,
+    categories: tuple[str, ...] = CATEGORIES,
+    calories: tuple[float, float] | None = None,
+    extra: tuple[str, ...] = (),
+    ranges: dict[str, tuple[float, float]] | None = None,
+    profiles: int = 0,
+) -> list[SolverRecipe]:
+    """``count`` recipes with ids ``"1"``.. and nutrients drawn uniformly.
+
+    ``calories`` and ``ranges`` override the default ranges.  With
+    ``profiles`` the recipes share that many nutrient profiles and cycle
+    through the categories, so every dish has equivalent alternatives.
+    """
+    rng = random.Random(seed)
+    bounds = {**RANGES, **(ranges or {})}
+    if calories is not None:
+        bounds["calories"] = calories
+    names = BASE + tuple(extra)
+
+    def draw() -> dict[str, float]:
+        return {name: rng.uniform(*bounds[name]) for name in names}
+
+    if profiles:
+        shared = [draw() for _ in range(profiles)]
+        rows = [(categories[i % len(categories)], shared[i % profiles]) for i in range(count)]
+    else:
+        rows = []
+        for _ in range(count):
+            category = rng.choice(categories)
+            rows.append((category, draw()))
+    return [
+        normalize_recipe({"id": str(i + 1), "name": f"Recipe {i + 1}", "category": category, **nutrients})
+        for i, (category, nutrients) in enumerate(rows)
+    ]
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from backend.db import ConnectionPool, PoolTimeout
+
+
+class FakeCursor:
+    def fetchone(self):
+        return {"?column?": 1}
+
+
+class FakeConnection:
+    """Stand-in for ``DBConnection`` exposing the attributes the pool reads."""
+
+    def __init__(self) -> None:
+        self.closed = False
+        self.broken = False
+        self.in_transaction = False
+        self.rollbacks = 0
+
+    def execute(self, sql, params=()):
+        return FakeCursor()
+
+    def rollback(self) -> None:
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def _pool(**kwargs) -> tuple[ConnectionPool, list[FakeConnection]]:
+    opened: list[FakeConnection] = []
+
+    def factory() -> FakeConnection:
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+
+    options = {"min_size": 0, "max_size": 2, "timeout_seconds": 0.05}
+    options.update(kwargs)
+    return ConnectionPool(factory, **options), opened
+
+
+def test_checkout_times_out_when_pool_is_exhausted():
+    pool, _ = _pool(max_size=1)
+    pool.getconn()
+
+    with pytest.raises(PoolTimeout):
+        pool.getconn()
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_returned_connection_is_reused():
+    pool, opened = _pool()
+    conn = pool.getconn()
+    pool.putconn(conn)
+
+    assert pool.getconn() is conn
+    assert len(opened) == 1
+
+
+def test_broken_connection_frees_its_slot():
+    pool, opened = _pool(max_size=1)
+    conn = pool.getconn()
+    conn.broken = True
+    pool.putconn(conn)
+
+    assert conn.closed
+    assert pool.stats()["size"] == 0
+    replacement = pool.getconn()
+    assert replacement is not conn
+    assert len(opened) == 2
+
+
+def test_closed_idle_connection_is_replaced_on_checkout():
+    pool, opened = _pool(max_size=1)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    conn.closed = True
+
+    replacement = pool.getconn()
+    assert replacement is not conn
+    assert pool.stats()["size"] == 1
+    assert pool.stats()["connectionsDiscarded"] == 1
+
+
+def test_open_transaction_is_rolled_back_on_return():
+    pool, _ = _pool()
+    conn = pool.getconn()
+    conn.in_transaction = True
+    pool.putconn(conn)
+
+    assert conn.rollbacks == 1
+    assert pool.getconn() is conn
+
+
+def test_idle_connections_above_min_size_expire():
+    pool, opened = _pool(min_size=1, max_size=3, max_idle_seconds=0.01)
+    conns = [pool.getconn() for _ in range(3)]
+    for conn in conns:
+        pool.putconn(conn)
+    time.sleep(0.02)
+
+    pool.getconn()
+    stats = pool.stats()
+    assert stats["size"] == 1
+    assert stats["inUse"] == 1
+    assert sum(conn.closed for conn in opened) == 2
+
+
+def test_fill_opens_min_size_connections():
+    pool, opened = _pool(min_size=2, max_size=3)
+    pool.fill()
+
+    stats = pool.stats()
+    assert len(opened) == 2
+    assert stats["size"] == 2
+    assert stats["idle"] == 2
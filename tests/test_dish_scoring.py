@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+from fastapi import HTTPException
+
+from backend.routers import dishes
+from backend.routers.dishes import _recipe_to_dish_row
+from backend.services.dish_scoring import DishScoreTable
+from backend.services.nutrient_calculator import build_ingredient_table, get_row_nutrients
+from backend.services.recipe_catalog import build_recipe_catalog
+from backend.services.recommendation_engine import get_warnings, score_dish
+
+LABELS = [None, "", "Suitable", "Caution", "Avoid", "moderation"]
+EMPTY_INGREDIENTS = build_ingredient_table("", [])
+
+
+def _dishes(count: int, seed: int = 3):
+    rng = random.Random(seed)
+    return [
+        _recipe_to_dish_row({
+            "id": str(i + 1),
+            "category": rng.choice(["Breakfast", "Main Course", "Soup", "Dessert", "Snack", ""]),
+            "calories": rng.uniform(100, 1600),
+            "protein": rng.uniform(5, 60),
+            "total_carbs": rng.uniform(10, 200),
+            "fat": rng.uniform(2, 80),
+            "fiber": rng.uniform(0, 30),
+            "sodium": rng.uniform(50, 3000),
+            "cholesterol": rng.uniform(0, 400),
+            "sugar": rng.uniform(0, 60),
+            "diabetes_category": rng.choice(LABELS),
+            "hypertension_category": rng.choice(LABELS),
+            "cholesterol_category": rng.choice(LABELS),
+        })
+        for i in range(count)
+    ]
+
+
+def _day_entries(rng: random.Random):
+    return [
+        {
+            "dish_id": str(rng.randint(1, 50)),
+            "servings": rng.choice([1, 1.5, 2]),
+            "ingredients": "{}",
+            "custom_ingredients": None,
+            "calories": rng.uniform(0, 1200),
+            "protein": rng.uniform(0, 60),
+            "carbs": rng.uniform(0, 150),
+            "fat": rng.uniform(0, 50),
+            "fiber": rng.uniform(0, 20),
+            "sodium": rng.uniform(0, 1800),
+            "cholesterol": rng.uniform(0, 250),
+            "sugar": rng.uniform(0, 40),
+        }
+        for _ in range(rng.randint(0, 4))
+    ]
+
+
+def test_batch_scores_match_score_dish():
+    rng = random.Random(5)
+    dishes = _dishes(300)
+    table = DishScoreTable(dishes)
+    conditions = ["High Blood Sugar", "High Cholesterol", "Hypertension", "Gout"]
+
+    for _ in range(40):
+        user_conditions = rng.sample(conditions, rng.randint(0, 3))
+        day_entries = _day_entries(rng)
+        week = [{"dish_id": rng.choice([str(i), f"r{i}"])} for i in rng.choices(range(1, 60), k=rng.randint(0, 20))]
+        favourites = {str(i) for i in rng.sample(range(1, 300), 10)}
+        meal = rng.choice(["breakfast", "lunch", "dinner", "snack"])
+        positions = sorted(rng.sample(range(len(dishes)), 120))
+
+        scores = table.score(positions, user_conditions, day_entries, meal, week, EMPTY_INGREDIENTS, favourite_ids=favourites)
+        warnings = table.warnings(scores.positions, user_conditions)
+
+        for i, pos in enumerate(positions):
+            dish = dishes[pos]
+            expected = score_dish(dish, user_conditions, day_entries, meal, week, EMPTY_INGREDIENTS, favourite_ids=favourites)
+            assert scores.score(i) == expected
+            assert warnings[i] == get_warnings(get_row_nutrients(dish), user_conditions, dish)
+            assert table.nutrients_at(pos) == get_row_nutrients(dish)
+
+
+def test_empty_selection_scores_nothing():
+    table = DishScoreTable(_dishes(5))
+
+    scores = table.score([], ["Hypertension"], [], "lunch", [], EMPTY_INGREDIENTS)
+
+    assert len(scores.total) == 0
+    assert table.warnings(scores.positions, ["Hypertension"]) == []
+
+
+def test_rank_pages_match_a_full_stable_sort():
+    table = DishScoreTable(_dishes(400))
+    positions = list(range(0, 400, 2))
+    scores = table.score(positions, ["Hypertension"], [], "lunch", [], EMPTY_INGREDIENTS)
+    # Scores are coarse, so many dishes tie; ties keep list order.
+    expected = sorted(range(len(positions)), key=lambda i: -scores.total[i])
+
+    assert list(table.rank(scores)) == expected
+    assert list(table.rank(scores, 5)) == expected[:5]
+
+    pages, after = [], None
+    while True:
+        page = list(table.rank(scores, 30, after))
+        if not page:
+            break
+        pages += page
+        after = (int(scores.total[page[-1]]), int(scores.positions[page[-1]]))
+    assert pages == expected
+
+
+class FakeConnection:
+    def execute(self, sql, params=()):
+        return self
+
+    def fetchall(self):
+        return []
+
+
+def test_recommend_returns_top_k_and_pages_for_paid_users(monkeypatch):
+    catalog = build_recipe_catalog("v1", [
+        {
+            "id": str(i + 1),
+            "category": "Main Course",
+            "calories": 200 + 7 * i,
+            "protein": 5 + i % 40,
+            "total_carbs": 30,
+            "fat": 10,
+            "sodium": 100 * (i % 12),
+        }
+        for i in range(120)
+    ])
+    tier = {"value": "free"}
+    monkeypatch.setattr(dishes, "get_recipe_catalog", lambda conn: catalog)
+    monkeypatch.setattr(dishes, "load_ingredient_cache", lambda conn: EMPTY_INGREDIENTS)
+    monkeypatch.setattr(dishes, "get_user_tier", lambda request, conn: tier["value"])
+    monkeypatch.setattr(
+        dishes, "_load_user_profile", lambda conn, uid: {"conditions": ["Hypertension"], "diet": "none", "allergies": []},
+    )
+
+    def recommend(**params):
+        defaults = dict(
+            day=0, mealType="lunch", filterMealType="true", filterDiet="true", filterAllergies="true",
+            filterConditions="true", search=None, weekStart="2026-03-02", dietValue=None, subCategory=None,
+            allergenValues=None, limit=None, cursor=None,
+        )
+        return dishes.recommend_dishes("u1", None, **{**defaults, **params}, conn=FakeConnection())
+
+    tier["value"] = "paid"
+    everything = recommend()["scored"]
+    totals = [item["score"]["total"] for item in everything]
+    assert totals == sorted(totals, reverse=True)
+    assert everything[0]["dish"]["id"] and everything[0]["nutrients"]
+
+    tier["value"] = "free"
+    free = recommend(limit=50, cursor="1:1")
+    assert free["scored"] == everything[:5]
+    assert free["nextCursor"] is None
+
+    tier["value"] = "paid"
+    pages, cursor = [], None
+    while True:
+        response = recommend(limit=25, cursor=cursor)
+        pages += response["scored"]
+        cursor = response["nextCursor"]
+        if cursor is None:
+            break
+    assert pages == everything
+
+    with pytest.raises(HTTPException):
+        recommend(limit=10, cursor="12:missing")
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import random
+
+import pytest
+
+from backend.routers.dishes import _recipe_to_dish_row
+from backend.services.eligibility import EligibilityIndex, catalog_eligibility
+from backend.services.recipe_catalog import build_recipe_catalog
+from backend.services.recommendation_engine import filter_dishes
+
+INGREDIENTS = ["chicken breast", "pork belly", "ham", "salmon", "tofu", "peanut butter", "milk", "egg", "rice", "spinach"]
+CATEGORIES = ["Breakfast", "Main Course", "Side Dish", "Soup", "Salad", "Dessert", "Snack", "Sauce", ""]
+LABELS = [None, "", "Suitable", "Caution", "Avoid", "moderation"]
+
+
+def _recipe_rows(count: int = 200, seed: int = 3):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": str(i + 1),
+            "name": f"Dish {i + 1}",
+            "category": rng.choice(CATEGORIES),
+            "ingredients": json.dumps({name: 100 for name in rng.sample(INGREDIENTS, rng.randint(1, 4))}),
+            "allergies": ", ".join(rng.sample(["Peanuts", "Dairy", "Gluten", "Shellfish"], rng.randint(0, 2))),
+            "dietary_habits": rng.choice(["", "", "vegetarian", "vegan"]),
+            "is_vegetarian": rng.random() < 0.3,
+            "is_vegan": rng.random() < 0.1,
+            "servings": rng.choice([1, 2, 4]),
+            "calories": rng.uniform(100, 1600),
+            "protein": rng.uniform(5, 60),
+            "total_carbs": rng.uniform(10, 200),
+            "fat": rng.uniform(2, 80),
+            "sodium": rng.uniform(50, 3000),
+            "cholesterol": rng.uniform(0, 400),
+            "sugar": rng.uniform(0, 60),
+            "diabetes_category": rng.choice(LABELS),
+            "hypertension_category": rng.choice(LABELS),
+            "cholesterol_category": rng.choice(LABELS),
+        }
+        for i in range(count)
+    ]
+
+
+def _profiles(seed: int = 11):
+    rng = random.Random(seed)
+    conditions = ["High Blood Sugar", "High Cholesterol", "Hypertension", "Gout"]
+    for _ in range(60):
+        yield {
+            "conditions": rng.sample(conditions, rng.randint(0, 2)),
+            "diet": rng.choice(["none", None, "Vegetarian", "vegan", "pescatarian", "halal", "keto"]),
+            "allergies": rng.sample(["peanut", "dairy", " Milk ", "", "pork", "nuts", "e"], rng.randint(0, 2)),
+        }
+
+
+OPTIONS = [
+    {},
+    {"filter_meal_type": False},
+    {"filter_diet": False, "filter_allergies": False},
+    {"filter_conditions": False, "sub_category": "Main"},
+    {"sub_category": "soup"},
+]
+
+
+@pytest.mark.parametrize("shape", ["candidate", "dish_row"])
+def test_index_matches_filter_dishes(shape):
+    catalog = build_recipe_catalog("v1", _recipe_rows())
+    if shape == "candidate":
+        dishes, index = list(catalog.dishes), catalog_eligibility(catalog)
+    else:
+        dishes = [_recipe_to_dish_row(row) for row in catalog.rows]
+        index = EligibilityIndex(dishes)
+
+    for profile in _profiles():
+        for meal in ("breakfast", "lunch", "dinner", "snack", "brunch"):
+            for options in OPTIONS:
+                expected = filter_dishes(dishes, profile, meal, {}, **options)
+                assert index.filter(dishes, profile, meal, **options) == expected, (profile, meal, options)
+
+
+def test_catalog_index_is_built_once_per_snapshot():
+    rows = _recipe_rows(20)
+    catalog = build_recipe_catalog("v1", rows)
+
+    assert catalog_eligibility(catalog) is catalog_eligibility(catalog)
+    assert catalog_eligibility(build_recipe_catalog("v2", rows)) is not catalog_eligibility(catalog)
+    with pytest.raises(ValueError):
+        catalog_eligibility(catalog).filter(list(catalog.dishes)[:5], {"conditions": []}, "lunch")
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import pytest
+
+from backend.services import nutrient_calculator
+from backend.services.nutrient_calculator import (
+    get_nutrients_from_ingredients,
+    invalidate_ingredient_cache,
+    load_ingredient_cache,
+)
+
+INGREDIENT_ROWS = [
+    {
+        "id": "egg", "calories": 155, "protein_g": 13, "carbs_g": 1.1, "fat_g": 11,
+        "fiber_g": 0, "sodium_mg": 124, "cholesterol_mg": 373, "sugar_g": 1.1,
+    },
+    {
+        "id": "rice", "calories": 130, "protein_g": 2.7, "carbs_g": 28, "fat_g": 0.3,
+        "fiber_g": 0.4, "sodium_mg": 1, "cholesterol_mg": 0, "sugar_g": 0.1,
+    },
+]
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeConnection:
+    def __init__(self, version: str = "v1") -> None:
+        self.version = version
+        self.ingredient_reads = 0
+
+    def execute(self, sql, params=()):
+        if "FROM meta" in sql:
+            return FakeCursor([{"value": self.version}])
+        self.ingredient_reads += 1
+        return FakeCursor(INGREDIENT_ROWS)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache(monkeypatch):
+    monkeypatch.setattr(nutrient_calculator, "CATALOG_VERSION_CHECK_SECONDS", 0)
+    invalidate_ingredient_cache()
+    yield
+    invalidate_ingredient_cache()
+
+
+def test_table_is_loaded_once_per_dataset_version():
+    conn = FakeConnection()
+    first = load_ingredient_cache(conn)
+    assert load_ingredient_cache(conn) is first
+    assert conn.ingredient_reads == 1
+
+    conn.version = "v2"
+    assert load_ingredient_cache(conn) is not first
+    assert conn.ingredient_reads == 2
+
+
+def test_nutrients_scale_per_100g_and_skip_unknown_ingredients():
+    table = load_ingredient_cache(FakeConnection())
+    nutrients = get_nutrients_from_ingredients({"egg": 50, "rice": "200", "salt": 3}, table)
+
+    assert nutrients["calories"] == 337.5
+    assert nutrients["protein"] == 11.9
+    assert nutrients["cholesterol"] == 186.5
+    assert get_nutrients_from_ingredients({}, table)["calories"] == 0.0
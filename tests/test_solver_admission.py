@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from backend.services.solver_admission import SolverAdmission, SolverBusy
+
+
+def test_requests_beyond_the_wait_queue_are_rejected():
+    admission = SolverAdmission(max_concurrent=1, max_waiting=1)
+    running = admission.reserve("free")
+    admission.reserve("free")
+
+    with pytest.raises(SolverBusy) as exc_info:
+        admission.reserve("paid")
+    assert exc_info.value.retry_after >= 1
+    assert admission.stats()["rejected"] == 1
+
+    running.release()
+    assert admission.stats()["active"] == 1
+    assert admission.stats()["waiting"] == 0
+
+
+def test_paid_tier_is_admitted_before_earlier_free_requests():
+    admission = SolverAdmission(max_concurrent=1, max_waiting=4)
+    running = admission.reserve("free")
+    free = admission.reserve("free")
+    paid = admission.reserve("paid")
+    assert admission.stats()["waitingByTier"] == {"paid": 1, "free": 1}
+
+    running.release()
+    assert paid.admitted and not free.admitted
+
+    paid.release()
+    assert free.admitted
+
+
+def test_wait_blocks_until_a_slot_frees():
+    admission = SolverAdmission(max_concurrent=1, max_waiting=1)
+    running = admission.reserve("paid")
+    queued = admission.reserve("free")
+    order: list[str] = []
+
+    def solve() -> None:
+        queued.wait()
+        order.append("queued")
+        queued.release()
+
+    worker = threading.Thread(target=solve)
+    worker.start()
+    order.append("running")
+    running.release()
+    worker.join(5)
+
+    assert order == ["running", "queued"]
+    assert admission.stats()["admitted"] == 2
+
+
+def test_releasing_an_unadmitted_ticket_leaves_the_queue():
+    admission = SolverAdmission(max_concurrent=1, max_waiting=1)
+    admission.reserve("paid")
+    queued = admission.reserve("free")
+    queued.release()
+    queued.release()
+
+    assert admission.stats()["waiting"] == 0
+    assert admission.stats()["active"] == 1
+
+
+def test_on_admit_runs_once_the_ticket_is_admitted():
+    admission = SolverAdmission(max_concurrent=1, max_waiting=1)
+    running = admission.reserve("paid")
+    queued = admission.reserve("free")
+    calls: list[str] = []
+
+    running.on_admit(lambda: calls.append("running"))
+    queued.on_admit(lambda: calls.append("queued"))
+    assert calls == ["running"]
+
+    running.release()
+    assert calls == ["running", "queued"]
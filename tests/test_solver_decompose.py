@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from backend.services.solver import PreparedMealGeneration, SolverConfig, core, greedy_meal_plan
+from backend.services import solver_admission
+from backend.services.solver import process_pool
+from backend.services.solver.decompose import _parallel_days
+from backend.services.solver.models import MEALS, FixedMealAssignment
+
+from recipe_factory import make_recipes
+
+TARGETS = {"calories": 2000, "protein": 90, "carbs": 250, "fat": 70, "sodium": 2300, "sugar": 50}
+
+
+def test_per_day_solves_each_day_and_repairs_repeats(monkeypatch):
+    days = []
+
+    def solve(**kwargs):
+        days.append(kwargs)
+        return greedy_meal_plan(**kwargs)
+
+    monkeypatch.setattr(process_pool, "solve_in_pool", solve)
+    random.seed(0)
+    # Few nutrient profiles shared by many dishes, so repeats can always be
+    # swapped for an equivalent dish.
+    recipes = make_recipes(300, 9, profiles=20)
+    breakfast = next(r for r in recipes if "breakfast" in r.meal_types)
+    prepared = PreparedMealGeneration(
+        patient_id="fm:1",
+        week_start="2026-03-02",
+        inputs=None,
+        targets=TARGETS,
+        hard_limit_keys=frozenset(),
+        config=SolverConfig(num_days=5, decomposition="per_day", time_limit_seconds=15),
+        recipes=tuple(recipes),
+        fixed_assignments=[
+            FixedMealAssignment(day_index=2, meal_type="breakfast", recipe_id=breakfast.recipe_id, servings=1),
+        ],
+    )
+
+    plan = core.solve_prepared_generation(prepared).selected_plan
+
+    assert plan.stop_reason == "per_day"
+    assert [kw["config"].num_days for kw in days] == [1] * 5
+    assert [len(kw["fixed_assignments"]) for kw in days] == [0, 0, 1, 0, 0]
+    # Neighbours of the fixed day steer away from its dish.
+    assert days[1]["config"].recency_penalties[breakfast.recipe_id] > 0
+    assert [p.recipe_id for p in plan.picks[2]["breakfast"]] == [breakfast.recipe_id]
+    for day in range(5):
+        ids = [p.recipe_id for meal in MEALS for p in plan.picks[day][meal]]
+        assert ids and len(ids) == len(set(ids))
+    for day in range(4):
+        today = {p.recipe_id for meal in MEALS for p in plan.picks[day][meal]}
+        tomorrow = {p.recipe_id for meal in MEALS for p in plan.picks[day + 1][meal]}
+        assert not today & tomorrow
+
+
+def test_unknown_decomposition_is_rejected():
+    with pytest.raises(ValueError):
+        SolverConfig(decomposition="per_meal")
+
+
+def test_parallel_days_stay_within_one_admission_slot(monkeypatch):
+    monkeypatch.setattr(process_pool, "SOLVER_PROCESSES", 8)
+    monkeypatch.setattr(solver_admission, "SOLVER_MAX_CONCURRENT", 2)
+    assert _parallel_days() == 4
+
+    monkeypatch.setattr(solver_admission, "SOLVER_MAX_CONCURRENT", 8)
+    assert _parallel_days() == 1
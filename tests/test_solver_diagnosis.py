@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import pytest
+
+from backend.routers import mealplan
+from backend.services.solver import (
+    FixedMealAssignment,
+    InfeasiblePlanError,
+    PlanConflict,
+    SolverConfig,
+    build_candidate_pools,
+    normalize_recipe,
+    solve_meal_plan,
+)
+from backend.services.solver.diagnosis import diagnose_infeasibility
+
+pytest.importorskip("ortools.sat.python.cp_model")
+
+TARGETS = {"calories": 2000, "protein": 90, "carbs": 250, "fat": 30, "sodium": 300}
+
+
+def _recipes():
+    return [
+        normalize_recipe({"id": "1", "name": "Oily", "category": "Breakfast", "calories": 400, "fat": 50, "sodium": 100}),
+        normalize_recipe({"id": "2", "name": "Salty", "category": "Breakfast", "calories": 400, "fat": 5, "sodium": 500}),
+        normalize_recipe({"id": "3", "name": "Main", "category": "Main Course", "calories": 600, "fat": 8, "sodium": 90}),
+    ]
+
+
+def test_integer_infeasibility_is_explained_by_assumptions():
+    # Half of each breakfast would meet both caps, so the LP pre-check passes.
+    with pytest.raises(InfeasiblePlanError) as raised:
+        solve_meal_plan(
+            patient_id="fm:1",
+            targets=TARGETS,
+            recipes=_recipes(),
+            config=SolverConfig(num_days=1, time_limit_seconds=5),
+            hard_limit_keys={"fat", "sodium"},
+            closed_slots={(0, "lunch"), (0, "dinner")},
+        )
+
+    assert {(c.code, c.meal_type, c.nutrients) for c in raised.value.conflicts} == {
+        ("slot_count", "breakfast", ()),
+        ("daily_cap", None, ("fat",)),
+        ("daily_cap", None, ("sodium",)),
+    }
+
+
+def test_fixed_dish_over_a_cap_is_in_the_conflict():
+    recipes = _recipes()
+    config = SolverConfig(num_days=3)
+    candidates = build_candidate_pools(recipes, config=config, targets=TARGETS)
+    fixed = {(1, "breakfast"): [FixedMealAssignment(1, "breakfast", "2", 1)]}
+
+    conflicts = diagnose_infeasibility(candidates, fixed, set(), TARGETS, config, hard_limit_keys={"sodium"})
+
+    assert {(c.code, c.day_index) for c in conflicts} == {("fixed_dish", 1), ("daily_cap", 1)}
+
+
+def test_autofill_error_lists_conflicts_as_violations():
+    error = InfeasiblePlanError.from_conflicts([
+        PlanConflict(code="daily_cap", day_index=2, nutrients=("sodium",), limit=300.0),
+        PlanConflict(code="fixed_dish", day_index=2, meal_type="lunch", recipe_ids=("42",), actual=2.0),
+    ])
+
+    http_error = mealplan._autofill_solver_error(error, "fm:1", "2026-03-02")
+
+    assert http_error.status_code == 422
+    violations = http_error.detail["violations"]
+    assert [v["code"] for v in violations] == ["daily_sodium_cap_exceeded", "infeasible_fixed_dish"]
+    assert violations[1]["recipeIds"] == ["42"]
+    assert violations[0]["message"] == "Day 3 sodium capped at 300.0."
+    assert violations[1]["message"] == "Day 3 lunch keeps dish 42 (2 servings)."
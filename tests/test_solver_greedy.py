@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import random
+
+from backend.services.solver import PreparedMealGeneration, SolverConfig, core, greedy_meal_plan
+from backend.services.solver.models import MEALS, FixedMealAssignment
+
+from recipe_factory import make_recipes
+
+TARGETS = {"calories": 2000, "protein": 90, "carbs": 250, "fat": 70, "sodium": 2300, "sugar": 50}
+
+
+def test_greedy_fills_open_slots_and_keeps_fixed_and_closed():
+    random.seed(0)
+    recipes = make_recipes(300, 5, extra=("fiber", "sodium", "sugar"))
+    breakfast = next(r for r in recipes if "breakfast" in r.meal_types)
+    fixed = [FixedMealAssignment(day_index=1, meal_type="breakfast", recipe_id=breakfast.recipe_id, servings=1)]
+
+    plan = greedy_meal_plan(
+        patient_id="fm:1",
+        targets=TARGETS,
+        recipes=recipes,
+        config=SolverConfig(num_days=3, max_recipes_per_meal={"lunch": 2, "dinner": 2}),
+        fixed_assignments=fixed,
+        closed_slots={(2, "dinner")},
+    )[0]
+
+    assert plan.stop_reason == "greedy"
+    assert [p.recipe_id for p in plan.picks[1]["breakfast"]] == [breakfast.recipe_id]
+    assert plan.picks[2]["dinner"] == []
+    for day in range(3):
+        assert len(plan.picks[day]["breakfast"]) == 1
+        assert len(plan.picks[day]["lunch"]) == 2
+        ids = [p.recipe_id for meal in MEALS for p in plan.picks[day][meal]]
+        assert len(ids) == len(set(ids))
+    assert plan.solve_seconds < 1.0
+
+
+def test_greedy_respects_hard_caps():
+    random.seed(1)
+    targets = dict(TARGETS, calories=1500)
+    plan = greedy_meal_plan(
+        patient_id="fm:1",
+        targets=targets,
+        recipes=make_recipes(300, 5, extra=("fiber", "sodium", "sugar")),
+        config=SolverConfig(num_days=2),
+        hard_limit_keys={"calories"},
+    )[0]
+
+    assert all(plan.daily_totals[day]["calories"] <= 1500 for day in range(2))
+
+
+def test_cp_sat_failure_falls_back_to_greedy(monkeypatch):
+    def fail(**kwargs):
+        raise RuntimeError("No feasible meal plan found.")
+
+    monkeypatch.setattr(core, "solve_in_pool", fail)
+    prepared = PreparedMealGeneration(
+        patient_id="fm:1",
+        week_start="2026-03-02",
+        inputs=None,
+        targets=TARGETS,
+        hard_limit_keys=frozenset(),
+        config=SolverConfig(num_days=1),
+        recipes=tuple(make_recipes(300, 5, extra=("fiber", "sodium", "sugar"))),
+        fixed_assignments=None,
+    )
+
+    result = core.solve_prepared_generation(prepared)
+
+    assert result.selected_plan.stop_reason == "greedy"
+    assert {entry.meal_type for entry in result.entries} == set(MEALS)
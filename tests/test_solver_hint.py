@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import pytest
+
+from backend.services.solver import SolverConfig
+from backend.services.solver.core import _load_plan_hint, solve_meal_plan
+from backend.services.solver.models import MEALS, FixedMealAssignment
+
+from recipe_factory import make_recipes
+
+TARGETS = {"calories": 2000, "protein": 90, "carbs": 250, "fat": 70, "sodium": 2300, "sugar": 50, "fiber": 30}
+
+
+class FakeRows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.params = None
+
+    def execute(self, sql, params=()):
+        self.params = params
+        return FakeRows(self.rows)
+
+
+def test_hint_prefers_this_week_per_slot_and_shifts_days():
+    conn = FakeConnection([
+        {"week_start": "2026-03-02", "day_index": 3, "meal_type": "lunch", "recipe_id": "10", "servings": 2},
+        {"week_start": "2026-02-23", "day_index": 3, "meal_type": "lunch", "recipe_id": "11", "servings": 1},
+        {"week_start": "2026-02-23", "day_index": 3, "meal_type": "dinner", "recipe_id": "12", "servings": 1},
+    ])
+
+    hint = _load_plan_hint(conn, "fm:1", "2026-03-02", num_days=1, first_day=3)
+
+    assert conn.params == ("fm:1", "2026-03-02", "2026-02-23", 3, 4)
+    assert sorted(hint, key=lambda a: a.meal_type) == [
+        FixedMealAssignment(day_index=0, meal_type="dinner", recipe_id="12", servings=1.0),
+        FixedMealAssignment(day_index=0, meal_type="lunch", recipe_id="10", servings=2.0),
+    ]
+
+
+def test_stability_weight_keeps_hinted_plan():
+    pytest.importorskip("ortools")
+    recipes = make_recipes(80, 3, calories=(150, 700), extra=("fiber", "sodium", "sugar"))
+    config = SolverConfig(num_days=2, time_limit_seconds=2, num_search_workers=2)
+    first = solve_meal_plan(patient_id="fm:1", targets=TARGETS, recipes=recipes, config=config)[0]
+    hint = [
+        FixedMealAssignment(day_index=day, meal_type=meal, recipe_id=pick.recipe_id, servings=pick.servings)
+        for day in range(2) for meal in MEALS for pick in first.picks[day][meal]
+    ]
+
+    second = solve_meal_plan(
+        patient_id="fm:1",
+        targets=TARGETS,
+        recipes=recipes,
+        config=SolverConfig(num_days=2, time_limit_seconds=2, num_search_workers=2, stability_weight=10**7),
+        hint=hint,
+    )[0]
+
+    for day in range(2):
+        for meal in MEALS:
+            assert {p.recipe_id for p in second.picks[day][meal]} == {p.recipe_id for p in first.picks[day][meal]}
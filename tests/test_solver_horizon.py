@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import random
+
+from backend.routers import mealplan
+from backend.services.solver import PreparedMealGeneration, SolverConfig, core, greedy_meal_plan
+from backend.services.solver.models import MEALS
+
+from recipe_factory import make_recipes
+
+TARGETS = {"calories": 2000, "protein": 90, "carbs": 250, "fat": 70, "sodium": 2300, "sugar": 50}
+
+
+def _prepared(num_days: int) -> PreparedMealGeneration:
+    return PreparedMealGeneration(
+        patient_id="fm:1",
+        week_start="2026-03-02",
+        inputs=None,
+        targets=TARGETS,
+        hard_limit_keys=frozenset(),
+        config=SolverConfig(num_days=num_days),
+        recipes=tuple(make_recipes(300, 7)),
+        fixed_assignments=None,
+        recent_weeks=(frozenset({"1", "2"}),),
+    )
+
+
+def test_rolling_horizon_commits_weeks_and_carries_state(monkeypatch):
+    windows = []
+
+    def solve(**kwargs):
+        windows.append(kwargs)
+        return greedy_meal_plan(**kwargs)
+
+    monkeypatch.setattr(core, "solve_in_pool", solve)
+    random.seed(0)
+
+    result = core.solve_prepared_generation(_prepared(16))
+
+    assert [w["config"].num_days for w in windows] == [14, 9, 2]
+    # The windows share one solve's time limit instead of each getting it.
+    budget = core._time_limit(SolverConfig(num_days=16))
+    assert budget // 3 - 1 <= windows[0]["config"].max_time_seconds <= budget // 3
+    assert all(w["config"].max_time_seconds <= budget for w in windows)
+    assert result.selected_plan.num_days == 16
+    assert {entry.day_index for entry in result.entries} == set(range(16))
+    # Week 1's dishes are "last week" for week 2; older history moves back.
+    first_week = {
+        pick.recipe_id for day in range(7) for meal in MEALS for pick in result.selected_plan.picks[day][meal]
+    }
+    second_penalties = windows[1]["config"].recency_penalties
+    assert all(second_penalties[rid] >= 150000 for rid in first_week)
+    assert windows[0]["config"].recency_penalties["1"] == 150000
+    assert windows[1]["config"].recency_penalties.get("1", 0) in (75000, 225000)
+    # The calorie deficit or surplus of week 1 shifts week 2's target.
+    shortfall = sum(2000 - result.selected_plan.daily_totals[day]["calories"] for day in range(7))
+    expected = 2000 + max(-200, min(200, shortfall / 7))
+    assert abs(windows[1]["targets"]["calories"] - expected) < 1e-6
+
+
+class FakeConnection:
+    def __init__(self) -> None:
+        self.statements: list[tuple[str, tuple]] = []
+
+    def execute(self, sql, params=()):
+        self.statements.append((sql, tuple(params)))
+        return self
+
+    def commit(self) -> None:
+        self.statements.append(("COMMIT", ()))
+
+
+def test_multi_week_plan_is_written_per_week_in_one_transaction(monkeypatch):
+    monkeypatch.setattr(core, "solve_in_pool", greedy_meal_plan)
+    monkeypatch.setattr(mealplan, "_is_slot_locked", lambda ws, day, meal: False)
+    monkeypatch.setattr(mealplan, "_recipe_id_for_dish", lambda conn, dish_id: dish_id)
+    random.seed(1)
+    result = core.solve_prepared_generation(_prepared(10))
+    conn = FakeConnection()
+
+    response = mealplan._write_generated_plan(
+        conn, "fm:1", {"week_start": "2026-03-02", "target_day": None, "num_days": 10}, result,
+    )
+
+    inserts = [params for sql, params in conn.statements if sql.startswith("INSERT")]
+    assert {(params[1], params[2]) for params in inserts} == (
+        {("2026-03-02", day) for day in range(7)} | {("2026-03-09", day) for day in range(3)}
+    )
+    assert [sql for sql, _ in conn.statements].count("COMMIT") == 1
+    assert conn.statements[-1][0] == "COMMIT"
+    assert response["weekStarts"] == ["2026-03-02", "2026-03-09"]
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from backend.services.profile_loader import UserProfile
+from backend.services.solver import inputs
+
+
+def _profile(**overrides):
+    values = dict(
+        patient_id="fm:1", source="user", conditions=["diabetes"], diet="none", allergies=[],
+        recommended_calories=2000, recommended_protein=90, recommended_carbs=250, recommended_fat=70,
+    )
+    values.update(overrides)
+    return UserProfile(**values)
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    calls = []
+
+    def build(catalog, profile, favourite_ids):
+        calls.append((catalog.version, profile.diet, favourite_ids))
+        return object()
+
+    monkeypatch.setattr(inputs, "_build_filtered_candidates", build)
+    monkeypatch.setattr(inputs, "SOLVER_INPUT_CACHE_SIZE", 2)
+    inputs.invalidate_solver_input_cache()
+    yield calls
+    inputs.invalidate_solver_input_cache()
+
+
+def test_repeat_loads_share_one_filtered_set(builds):
+    catalog = SimpleNamespace(version="v1")
+    first = inputs._filtered_candidates(catalog, _profile(), frozenset({"7"}))
+    # Another user with the same filter profile and favourites shares it.
+    again = inputs._filtered_candidates(catalog, _profile(patient_id="fm:2"), frozenset({"7"}))
+
+    assert again is first
+    assert len(builds) == 1
+
+
+def test_profile_favourite_and_dataset_changes_rebuild(builds):
+    inputs._filtered_candidates(SimpleNamespace(version="v1"), _profile(), frozenset())
+    inputs._filtered_candidates(SimpleNamespace(version="v1"), _profile(), frozenset({"7"}))
+    inputs._filtered_candidates(SimpleNamespace(version="v1"), _profile(diet="vegan"), frozenset())
+    inputs._filtered_candidates(SimpleNamespace(version="v2"), _profile(), frozenset())
+
+    assert len(builds) == 4
+    # Entries from the old dataset are dropped once a new one is seen.
+    assert inputs.solver_input_cache_stats()["entries"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(builds):
+    catalog = SimpleNamespace(version="v1")
+    for favourites in ({"1"}, {"2"}, {"1"}, {"3"}, {"1"}, {"2"}):
+        inputs._filtered_candidates(catalog, _profile(), frozenset(favourites))
+
+    assert [call[2] for call in builds] == [frozenset({"1"}), frozenset({"2"}), frozenset({"3"}), frozenset({"2"})]
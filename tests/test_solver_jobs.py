@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+
+from backend.services import solver_jobs
+from backend.services.solver_admission import SolverAdmission
+from backend.services.solver_jobs import submit_solver_job
+
+
+class FakeConnection:
+    def __init__(self) -> None:
+        self.statements: list[tuple[str, tuple]] = []
+        self.lock = threading.Lock()
+
+    def execute(self, sql, params=()):
+        with self.lock:
+            self.statements.append((" ".join(sql.split()), tuple(params)))
+        return self
+
+    def commit(self) -> None:
+        pass
+
+    def updates(self) -> list[tuple[str, tuple]]:
+        return [stmt for stmt in self.statements if stmt[0].startswith("UPDATE solver_jobs")]
+
+
+class FakePool:
+    def __init__(self, conn: FakeConnection) -> None:
+        self.conn = conn
+
+    @contextmanager
+    def connection(self):
+        yield self.conn
+
+
+@pytest.fixture()
+def conn(monkeypatch):
+    fake = FakeConnection()
+    monkeypatch.setattr(solver_jobs, "get_pool", lambda: FakePool(fake))
+    return fake
+
+
+@pytest.fixture()
+def admission():
+    return SolverAdmission(max_concurrent=1, max_waiting=4)
+
+
+def _wait_for_jobs() -> None:
+    deadline = time.monotonic() + 5
+    while solver_jobs.solver_job_stats()["pending"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_job_solves_then_persists_and_records_result(conn, admission):
+    calls: list[str] = []
+
+    def solve(progress):
+        calls.append("solve")
+        progress(12.5, 0.5)
+        return "plan"
+
+    def finish(job_conn, solved):
+        calls.append(f"finish:{solved}")
+        return {"success": True, "added": 3}
+
+    job_id = submit_solver_job(
+        conn,
+        kind="autofill",
+        user_id="fm:1",
+        week_start="2026-03-02",
+        ticket=admission.reserve("paid"),
+        solve=solve,
+        finish=finish,
+    )
+    _wait_for_jobs()
+
+    assert calls == ["solve", "finish:plan"]
+    assert conn.statements[0][0].startswith("INSERT INTO solver_jobs")
+    updates = conn.updates()
+    assert "status = 'running'" in updates[0][0]
+    assert any(params[:2] == (12.5, 0.5) for _, params in updates)
+    final_sql, final_params = updates[-1]
+    assert "status = 'succeeded'" in final_sql
+    assert json.loads(final_params[0]) == {"success": True, "added": 3}
+    assert final_params[-1] == job_id
+    assert admission.stats()["active"] == 0
+
+
+def test_failed_job_keeps_http_status(conn, admission):
+    class Rejected(Exception):
+        status_code = 422
+        detail = "No feasible meal plan found."
+
+    def solve(progress):
+        raise Rejected()
+
+    submit_solver_job(
+        conn,
+        kind="generate",
+        user_id="fm:1",
+        week_start=None,
+        ticket=admission.reserve("free"),
+        solve=solve,
+        finish=lambda c, s: {},
+    )
+    _wait_for_jobs()
+
+    final_sql, final_params = conn.updates()[-1]
+    assert "status = 'failed'" in final_sql
+    assert json.loads(final_params[0]) == {"statusCode": 422, "detail": "No feasible meal plan found."}
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import pytest
+
+from backend.services.solver import FixedMealAssignment, SolverConfig, normalize_recipe
+from backend.services.solver.core import (
+    _apply_constraints,
+    _build_objective,
+    _create_decision_variables,
+    build_candidate_pools,
+    solve_meal_plan,
+)
+
+cp_model = pytest.importorskip("ortools.sat.python.cp_model")
+
+TARGETS = {"calories": 2000, "protein": 90, "carbs": 250, "fat": 70, "sodium": 2300, "sugar": 50}
+
+
+def _recipes():
+    return [
+        normalize_recipe({"id": str(i), "name": f"R{i}", "category": category, "calories": 300 + i, "protein": 20})
+        for i, category in enumerate(["Breakfast", "Main Course", "Soup", "Side Dish", "Breakfast, Main Course"])
+    ]
+
+
+def test_day_totals_are_shared_between_hard_limits_and_objective():
+    model = cp_model.CpModel()
+    mv = _create_decision_variables(model, build_candidate_pools(_recipes()), 2)
+    _apply_constraints(model, mv, TARGETS, SolverConfig(num_days=2), {"calories", "fat"})
+    _build_objective(model, mv, TARGETS, SolverConfig(num_days=2))
+
+    names = [v.name for v in model.Proto().variables]
+    assert names.count("day0_calories") == 1
+    assert names.count("day1_fat") == 1
+    assert mv.day_total("calories", 0) is mv.day_total("calories", 0)
+    # The breakfast-only recipe fills at most one slot a day, so it gets no term.
+    assert sorted(n for n in names if n.startswith("sameday_")) == [
+        "sameday_1_0", "sameday_1_1", "sameday_2_0", "sameday_2_1",
+        "sameday_3_0", "sameday_3_1", "sameday_4_0", "sameday_4_1",
+    ]
+
+
+def test_fixed_and_closed_slots_get_no_variables():
+    pools = build_candidate_pools(_recipes())
+    fixed = {(0, "lunch"): [FixedMealAssignment(day_index=0, meal_type="lunch", recipe_id="1", servings=2)]}
+    model = cp_model.CpModel()
+    mv = _create_decision_variables(model, pools, 2, fixed=fixed, closed={(0, "breakfast")})
+
+    assert set(mv.slot_x) == {(0, "dinner"), (1, "breakfast"), (1, "lunch"), (1, "dinner")}
+    assert mv.fixed_totals[("calories", 0)] == 2 * 3010
+    assert mv.usage("1", (0,), ["lunch", "dinner"])[1] == 1
+
+
+def test_solve_keeps_fixed_dishes_and_leaves_closed_slots_empty():
+    recipes = [
+        normalize_recipe({"id": str(i), "name": f"R{i}", "category": category, "calories": 500 + 10 * i, "protein": 25, "carbs": 60, "fat": 15})
+        for i, category in enumerate(["Breakfast", "Breakfast", "Main Course", "Soup", "Main Course", "Side Dish"])
+    ]
+    plan = solve_meal_plan(
+        patient_id="fm:1",
+        targets=TARGETS,
+        recipes=recipes,
+        config=SolverConfig(num_days=2, time_limit_seconds=5, num_search_workers=1),
+        fixed_assignments=[FixedMealAssignment(day_index=0, meal_type="lunch", recipe_id="2", servings=2)],
+        closed_slots={(1, "breakfast")},
+    )[0]
+
+    assert [(p.recipe_id, p.servings) for p in plan.picks[0]["lunch"]] == [("2", 2.0)]
+    assert plan.picks[1]["breakfast"] == []
+    assert plan.daily_totals[0]["calories"] == sum(p.nutrients["calories"] for m in plan.picks[0].values() for p in m)
+
+
+def test_max_solutions_returns_distinct_plans():
+    recipes = [
+        normalize_recipe({"id": str(i), "name": f"R{i}", "category": "Breakfast" if i < 6 else "Main Course",
+                          "calories": 350 + 25 * i, "protein": 20 + i, "carbs": 50, "fat": 12})
+        for i in range(18)
+    ]
+    config = SolverConfig(num_days=2, time_limit_seconds=3, num_search_workers=2, max_solutions=3, min_solution_difference=2)
+    plans = solve_meal_plan(patient_id="fm:1", targets=TARGETS, recipes=recipes, config=config)
+
+    assert len(plans) == 3
+    pick_sets = [
+        {(day, meal, p.recipe_id) for day in range(2) for meal, picks in plan.picks[day].items() for p in picks}
+        for plan in plans
+    ]
+    for i in range(3):
+        assert isinstance(plans[i].objective_value, float)
+        for j in range(i + 1, 3):
+            assert len(pick_sets[i] - pick_sets[j]) >= 2
+
+
+def test_two_stage_picks_dishes_then_tunes_servings():
+    # Single servings of these dishes reach under half the calorie target.
+    config = SolverConfig(num_days=2, time_limit_seconds=2, num_search_workers=2, two_stage=True)
+    plan = solve_meal_plan(patient_id="fm:1", targets=TARGETS, recipes=_recipes(), config=config)[0]
+
+    servings = [p.servings for day in range(2) for picks in plan.picks[day].values() for p in picks]
+    assert len(servings) == 6
+    assert max(servings) == 2
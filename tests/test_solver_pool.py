@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import pytest
+
+from backend.services.solver import SolverConfig
+from backend.services.solver import process_pool
+
+from recipe_factory import CATEGORIES, make_recipes
+
+pytest.importorskip("ortools")
+
+RECIPES = dict(categories=(*CATEGORIES, "Dessert"), calories=(150, 700), extra=("fiber", "sodium", "sugar"))
+TARGETS = {"calories": 2000, "protein": 90, "carbs": 250, "fat": 70, "sodium": 2300, "sugar": 50, "fiber": 30}
+
+
+@pytest.fixture()
+def pool(monkeypatch):
+    monkeypatch.setattr(process_pool, "SOLVER_PROCESSES", 1)
+    yield
+    process_pool.shutdown_solver_pool()
+
+
+def test_threads_are_partitioned_across_processes(monkeypatch):
+    monkeypatch.setattr(process_pool.os, "cpu_count", lambda: 8)
+    monkeypatch.setattr(process_pool, "SOLVER_PROCESSES", 4)
+    assert process_pool.threads_per_solve() == 2
+    monkeypatch.setattr(process_pool, "SOLVER_PROCESSES", 16)
+    assert process_pool.threads_per_solve() == 1
+
+
+def test_solve_runs_in_worker_and_forwards_progress(pool):
+    seen: list[tuple[float, float]] = []
+    plans = process_pool.solve_in_pool(
+        patient_id="fm:1",
+        targets=TARGETS,
+        recipes=make_recipes(120, 1, **RECIPES),
+        config=SolverConfig(num_days=2, time_limit_seconds=2),
+        on_solution=lambda objective, fraction: seen.append((objective, fraction)),
+    )
+
+    assert plans[0].num_days == 2
+    assert seen and seen[-1][0] == plans[0].objective_value
+    assert process_pool.solver_pool_stats()["solves"] >= 1
+
+
+def test_solver_errors_cross_the_process_boundary(pool):
+    with pytest.raises(ValueError):
+        process_pool.solve_in_pool(
+            patient_id="fm:1",
+            targets={"calories": 0},
+            recipes=make_recipes(10, 1, **RECIPES),
+            config=SolverConfig(num_days=1, time_limit_seconds=1),
+        )
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import random
+from dataclasses import replace
+
+from backend.services.solver import SolverConfig
+from backend.services.solver.pruning import pool_budget, prune_pool
+
+from recipe_factory import make_recipes
+
+CATEGORIES = ("Main Course", "Side Dish", "Soup")
+RANGES = {"calories": (100, 900), "protein": (2, 60), "carbs": (5, 100), "fat": (2, 40)}
+
+
+def test_pool_budget_follows_time_per_day():
+    assert pool_budget(SolverConfig(num_days=7, time_limit_seconds=20)) == 80
+    assert pool_budget(SolverConfig(num_days=7, time_limit_seconds=2)) == 30
+    assert pool_budget(SolverConfig(num_days=1, time_limit_seconds=5)) == 120
+
+
+def test_prune_keeps_pinned_ids_and_spans_calories():
+    recipes = make_recipes(600, 2, categories=CATEGORIES, ranges=RANGES)
+    random.seed(0)
+    kept = prune_pool(
+        recipes,
+        60,
+        config=SolverConfig(),
+        slot_targets={"calories": 450, "protein": 25, "carbs": 55},
+        keep_ids={"7", "8"},
+    )
+
+    ids = [r.recipe_id for r in kept]
+    assert len(ids) == len(set(ids)) == 60
+    assert {"7", "8"} <= set(ids)
+    assert any(r.is_main_course for r in kept) and any(not r.is_main_course for r in kept)
+    calories = sorted(r.calories for r in kept)
+    assert calories[0] < 300 and calories[-1] > 600
+
+
+def test_prune_drops_dominated_recipes():
+    recipes = [
+        replace(r, calories=1600, protein=3, carbs=220) if int(r.recipe_id) <= 50 else r
+        for r in make_recipes(400, 2, categories=CATEGORIES, ranges=RANGES)
+    ]
+    # Recipes 1-50 are penalised and far from the slot target.
+    config = SolverConfig(condition_penalties={str(i): 90000 for i in range(1, 51)})
+    random.seed(0)
+    kept = prune_pool(recipes, 40, config=config, slot_targets={"calories": 450, "protein": 25, "carbs": 55})
+
+    penalised = {str(i) for i in range(1, 51)}
+    assert not penalised & {r.recipe_id for r in kept}
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import pickle
+import random
+import time
+
+import pytest
+
+from backend.services.solver import (
+    FixedMealAssignment,
+    InfeasiblePlanError,
+    SolverConfig,
+    build_candidate_pools,
+    solve_meal_plan,
+)
+from backend.services.solver import relaxation
+from backend.services.solver.relaxation import relaxation_precheck
+
+from recipe_factory import make_recipes
+
+pytest.importorskip("ortools.linear_solver.pywraplp")
+
+TARGETS = {"calories": 2000, "protein": 90, "carbs": 250, "fat": 70, "sodium": 2300, "sugar": 50}
+
+
+def test_impossible_cap_is_named_without_a_search():
+    random.seed(0)
+    started = time.perf_counter()
+    with pytest.raises(InfeasiblePlanError) as raised:
+        solve_meal_plan(
+            patient_id="fm:1",
+            targets=dict(TARGETS, sodium=500),
+            recipes=make_recipes(200, 13, extra=("sodium",), ranges={"sodium": (200, 1200)}),
+            config=SolverConfig(num_days=2, time_limit_seconds=30),
+            hard_limit_keys={"sodium"},
+        )
+
+    assert time.perf_counter() - started < 5
+    conflicts = raised.value.conflicts
+    assert [(c.code, c.day_index, c.nutrients) for c in conflicts] == [
+        ("daily_cap", 0, ("sodium",)), ("daily_cap", 1, ("sodium",)),
+    ]
+    assert conflicts[0].actual > conflicts[0].limit == 500
+    assert "day 1 sodium cannot go below" in str(raised.value)
+    # Errors cross the solver process pool intact.
+    assert pickle.loads(pickle.dumps(raised.value)).conflicts == conflicts
+
+
+def test_fixed_dishes_over_the_cap_are_reported():
+    recipes = make_recipes(200, 13, extra=("sodium",), ranges={"sodium": (200, 1200)})
+    salty = max((r for r in recipes if "breakfast" in r.meal_types), key=lambda r: r.sodium)
+    config = SolverConfig(num_days=2)
+    candidates = build_candidate_pools(recipes, config=config, targets=TARGETS, keep_ids={salty.recipe_id})
+    fixed = {(1, "breakfast"): [FixedMealAssignment(1, "breakfast", salty.recipe_id, 2)]}
+    targets = dict(TARGETS, sodium=salty.sodium * 2)
+
+    with pytest.raises(InfeasiblePlanError) as raised:
+        relaxation_precheck(candidates, fixed, set(), targets, config, hard_limit_keys={"sodium"})
+
+    [conflict] = raised.value.conflicts
+    assert conflict.day_index == 1
+    assert conflict.recipe_ids == (salty.recipe_id,)
+
+
+def test_rounded_relaxation_fills_every_open_slot():
+    random.seed(1)
+    config = SolverConfig(num_days=3, max_recipes_per_meal={"lunch": 2})
+    candidates = build_candidate_pools(make_recipes(200, 13, extra=("sodium",), ranges={"sodium": (200, 1200)}), config=config, targets=TARGETS)
+
+    hint = relaxation_precheck(candidates, {}, {(2, "dinner")}, TARGETS, config)
+
+    assert (2, "dinner") not in hint
+    for day in range(3):
+        assert len(hint[(day, "breakfast")]) == 1
+        assert len(hint[(day, "lunch")]) == 2
+        assert all(1 <= a.servings <= 2 for a in hint[(day, "lunch")])
+
+
+def test_inconclusive_relaxation_is_not_reported_infeasible(monkeypatch):
+    from ortools.linear_solver import pywraplp
+
+    config = SolverConfig(num_days=2)
+    candidates = build_candidate_pools(make_recipes(200, 13, extra=("sodium",), ranges={"sodium": (200, 1200)}), config=config, targets=TARGETS)
+    monkeypatch.setattr(relaxation._Relaxation, "solve", lambda self: pywraplp.Solver.ABNORMAL)
+
+    hint = relaxation_precheck(candidates, {}, set(), dict(TARGETS, sodium=500), config, hard_limit_keys={"sodium"})
+
+    assert hint == {}
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import threading
+
+from backend.services.solver import SolverConfig
+from backend.services.solver.core import _StopPolicy
+
+
+class FakeSolver:
+    def __init__(self) -> None:
+        self.stopped = threading.Event()
+
+    def StopSearch(self) -> None:
+        self.stopped.set()
+
+
+def test_gap_target_stops_search():
+    policy = _StopPolicy(FakeSolver(), SolverConfig(stop_relative_gap=0.01, stop_stall_seconds=0))
+    assert policy.on_solution(1000.0, 900.0) is False
+    assert policy.on_solution(1000.0, 995.0) is True
+    assert policy.reason == "gap"
+
+
+def test_stall_watchdog_ignores_tiny_improvements():
+    solver = FakeSolver()
+    config = SolverConfig(stop_relative_gap=0, stop_stall_seconds=0.3, stop_min_improvement=0.01)
+    with _StopPolicy(solver, config) as policy:
+        policy.on_solution(1000.0, 0.0)
+        stalled_since = policy.last_improvement
+        policy.on_solution(999.5, 0.0)  # below the 1% threshold
+        assert policy.last_improvement == stalled_since
+        assert solver.stopped.wait(2)
+    assert policy.reason == "stall"
+
+
+def test_stall_watchdog_waits_for_first_solution():
+    solver = FakeSolver()
+    with _StopPolicy(solver, SolverConfig(stop_relative_gap=0, stop_stall_seconds=0.1)):
+        assert not solver.stopped.wait(0.4)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import random
+import time
+
+from backend.services.solver import SolverConfig, normalize_recipe, rank_swaps
+from backend.services.solver.models import FixedMealAssignment
+
+TARGETS = {"calories": 2000, "protein": 90, "carbs": 250, "fat": 70, "sodium": 2300, "sugar": 50}
+
+
+def _recipe(rid: str, calories: float, protein: float = 30, carbs: float = 80, category: str = "Main Course"):
+    return normalize_recipe({
+        "id": rid,
+        "name": f"Recipe {rid}",
+        "category": category,
+        "calories": calories,
+        "protein": protein,
+        "carbs": carbs,
+        "fat": 10,
+    })
+
+
+def _lunch(rid: str, day: int = 2) -> FixedMealAssignment:
+    return FixedMealAssignment(day_index=day, meal_type="lunch", recipe_id=rid)
+
+
+def test_swap_prefers_gap_filling_dish_over_repeats():
+    # Breakfast and dinner leave 900 kcal / 30 g protein / 90 g carbs for lunch.
+    base = {"calories": 1100, "protein": 60, "carbs": 160, "fat": 40}
+    recipes = [
+        _recipe("fit", 900, 30, 90),
+        _recipe("again", 900, 30, 90),
+        _recipe("small", 300, 10, 30),
+        _recipe("current", 1500, 5, 200),
+        _recipe("pancakes", 900, 30, 90, category="Breakfast"),
+    ]
+    week_plan = [FixedMealAssignment(day_index=2, meal_type="dinner", recipe_id="again")]
+
+    suggestions = rank_swaps(
+        recipes=recipes,
+        targets=TARGETS,
+        config=SolverConfig(),
+        day_index=2,
+        meal_type="lunch",
+        week_plan=week_plan,
+        base_totals=base,
+        current=_lunch("current"),
+        current_nutrients={"calories": 1500, "protein": 5, "carbs": 200, "fat": 10},
+    )
+
+    ids = [s.recipe_id for s in suggestions]
+    assert ids[0] == "fit"
+    assert ids.index("again") > ids.index("fit")
+    assert "current" not in ids and "pancakes" not in ids
+    assert suggestions[0].score_delta < 0
+    # Two servings of the small dish fill the gap better than one.
+    assert next(s for s in suggestions if s.recipe_id == "small").servings == 2
+
+
+def test_swap_respects_hard_caps():
+    recipes = [_recipe("heavy", 1200), _recipe("light", 500)]
+    suggestions = rank_swaps(
+        recipes=recipes,
+        targets=TARGETS,
+        config=SolverConfig(),
+        day_index=0,
+        meal_type="lunch",
+        week_plan=[],
+        base_totals={"calories": 1000},
+        hard_limit_keys={"calories"},
+    )
+
+    # Two servings of "light" reach the cap exactly; "heavy" always exceeds it.
+    assert [(s.recipe_id, s.servings) for s in suggestions] == [("light", 2)]
+
+
+def test_swap_ranks_large_catalog_quickly():
+    rng = random.Random(1)
+    recipes = [
+        _recipe(str(i), rng.uniform(150, 900), rng.uniform(5, 50), rng.uniform(10, 100))
+        for i in range(3000)
+    ]
+    week_plan = [_lunch(str(rng.randrange(3000)), day) for day in range(7) if day != 3]
+
+    started = time.perf_counter()
+    suggestions = rank_swaps(
+        recipes=recipes,
+        targets=TARGETS,
+        config=SolverConfig(),
+        day_index=3,
+        meal_type="lunch",
+        week_plan=week_plan,
+        base_totals={"calories": 1200, "protein": 50, "carbs": 150},
+        limit=5,
+    )
+
+    assert len(suggestions) == 5
+    assert time.perf_counter() - started < 1.0